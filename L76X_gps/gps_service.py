@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Event-driven GPS reader for the L76X module
+Blocks on the serial fd with poll(), reads whatever has arrived in one call,
+drops unwanted sentences by prefix and bad ones by checksum before pynmea2
+sees them, and publishes the latest fix as an immutable snapshot that any
+thread can read without touching the serial port.
+"""
+
+import os
+import time
+import select
+import logging
+import threading
+from typing import Callable, NamedTuple, Optional
+
+import serial
+import pynmea2
+
+logger = logging.getLogger(__name__)
+
+GPS_CONFIG = {
+    'port': '/dev/ttyTHS1',
+    'baud': 9600,
+    'sentence_types': (b'RMC', b'GGA'),  # after the two-letter talker ID (GP, GN, GL, ...)
+    'read_size': 4096,                   # bytes per os.read - everything the UART has buffered
+    'poll_timeout_ms': 1000,
+    'max_line': 256,                     # NMEA caps sentences at 82 chars - longer is line noise
+    'reopen_delay': 2.0                  # seconds between attempts when the port is gone
+}
+
+
+class GPSFix(NamedTuple):
+    """Latest position; replaced as a whole, never mutated"""
+    valid: bool = False
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    satellites: int = 0
+    fix_quality: int = 0
+    utc: Optional[object] = None   # datetime from the last RMC sentence
+    updated: float = 0.0           # time.time() of the last accepted sentence
+    fix_time: float = 0.0          # time.time() of the last valid RMC fix
+
+
+def nmea_checksum_ok(sentence: bytes) -> bool:
+    """XOR of the bytes between '$' and '*' must match the two hex digits after '*'"""
+    star = sentence.rfind(b'*')
+    if star < 1 or len(sentence) < star + 3:
+        return False
+    checksum = 0
+    for byte in sentence[1:star]:
+        checksum ^= byte
+    try:
+        return checksum == int(sentence[star + 1:star + 3], 16)
+    except ValueError:
+        return False
+
+
+class GPSService:
+    """Background GPS reader - call latest() from anywhere for the current fix"""
+
+    def __init__(self, port: Optional[str] = None, baud: Optional[int] = None,
+                 fix_callback: Optional[Callable[[float, float, float], None]] = None):
+        self.port = port or GPS_CONFIG['port']
+        self.baud = baud or GPS_CONFIG['baud']
+        # Called with (latitude, longitude, fix_time) for every valid RMC fix
+        self.fix_callback = fix_callback
+        self.sentence_types = frozenset(GPS_CONFIG['sentence_types'])
+
+        self.serial = None
+        self.running = False
+        self.thread = None
+        self._wake_read = self._wake_write = None  # stop() wakes the reader through this pipe
+
+        # Single writer (the reader thread) swaps the reference; readers need no lock
+        self._snapshot = GPSFix()
+
+        self.stats = {
+            'reads': 0,
+            'bytes': 0,
+            'sentences': 0,        # parsed and applied
+            'skipped': 0,          # not an RMC/GGA sentence
+            'checksum_errors': 0,
+            'parse_errors': 0,
+            'fixes': 0,
+            'reopens': 0
+        }
+
+    def latest(self) -> GPSFix:
+        return self._snapshot
+
+    def start(self):
+        if self.running:
+            return
+        if self._wake_read is None:
+            self._wake_read, self._wake_write = os.pipe()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name="GPSService")
+        self.thread.start()
+        logger.info(f"🛰️ GPS service started on {self.port}")
+
+    def stop(self):
+        """Safe to call more than once; start() works again afterwards"""
+        self.running = False
+        if self._wake_write is not None:
+            os.write(self._wake_write, b'x')
+        if self.thread is not None:
+            self.thread.join(timeout=GPS_CONFIG['poll_timeout_ms'] / 1000.0 + 1.0)
+            self.thread = None
+        self._close_port()
+        if self._wake_read is not None:
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+            self._wake_read = self._wake_write = None
+
+    # ---- serial port ------------------------------------------------------------
+
+    def _open_port(self) -> bool:
+        try:
+            # Non-blocking - poll() does the waiting, os.read takes what is there
+            self.serial = serial.Serial(self.port, self.baud, timeout=0)
+            return True
+        except (serial.SerialException, OSError) as e:
+            if not self.stats['reopens']:
+                logger.warning(f"⚠️ GPS port {self.port} unavailable ({e}) - retrying")
+            self.stats['reopens'] += 1
+            return False
+
+    def _close_port(self):
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            except Exception:
+                pass
+            self.serial = None
+
+    def _sleep(self, seconds: float):
+        """Interruptible wait - stop() wakes it through the pipe"""
+        select.select([self._wake_read], [], [], seconds)
+
+    def _run(self):
+        while self.running:
+            if self.serial is None and not self._open_port():
+                self._sleep(GPS_CONFIG['reopen_delay'])
+                continue
+            try:
+                self._read_loop(self.serial.fileno())
+            except (serial.SerialException, OSError) as e:
+                if self.running:
+                    logger.warning(f"⚠️ GPS read error ({e}) - reopening {self.port}")
+                self._close_port()
+
+    def _read_loop(self, fd: int):
+        poller = select.poll()
+        poller.register(fd, select.POLLIN | select.POLLERR | select.POLLHUP)
+        poller.register(self._wake_read, select.POLLIN)
+
+        pending = b''
+        while self.running:
+            events = poller.poll(GPS_CONFIG['poll_timeout_ms'])
+            readable = False
+            for event_fd, mask in events:
+                if event_fd == self._wake_read:
+                    return
+                if mask & select.POLLIN:
+                    readable = True
+                elif mask & (select.POLLERR | select.POLLHUP):
+                    raise OSError("serial port hung up")
+            if not readable:
+                continue
+
+            chunk = os.read(fd, GPS_CONFIG['read_size'])
+            if not chunk:
+                raise OSError("serial port closed")
+            self.stats['reads'] += 1
+            self.stats['bytes'] += len(chunk)
+
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            if len(pending) > GPS_CONFIG['max_line']:
+                pending = b''
+            for line in lines:
+                self._handle_sentence(line.strip())
+
+    # ---- sentences ----------------------------------------------------------------
+
+    def _handle_sentence(self, sentence: bytes):
+        # Cheap rejects first: '$' + talker ID + wanted type, then the checksum
+        if sentence[:1] != b'$' or sentence[3:6] not in self.sentence_types:
+            self.stats['skipped'] += 1
+            return
+        if not nmea_checksum_ok(sentence):
+            self.stats['checksum_errors'] += 1
+            return
+
+        try:
+            msg = pynmea2.parse(sentence.decode('ascii'), check=False)
+            now = time.time()
+            if msg.sentence_type == 'RMC':
+                snapshot = self._apply_rmc(msg, now)
+            else:
+                snapshot = self._snapshot._replace(
+                    satellites=int(msg.num_sats or 0), fix_quality=int(msg.gps_qual or 0), updated=now
+                )
+        except (pynmea2.ParseError, UnicodeDecodeError, ValueError, TypeError) as e:
+            self.stats['parse_errors'] += 1
+            logger.debug(f"GPS parse error ({e}): {sentence!r}")
+            return
+
+        self._snapshot = snapshot
+        self.stats['sentences'] += 1
+
+        if msg.sentence_type == 'RMC' and snapshot.valid:
+            self.stats['fixes'] += 1
+            if self.fix_callback:
+                try:
+                    self.fix_callback(snapshot.latitude, snapshot.longitude, snapshot.fix_time)
+                except Exception as e:
+                    logger.error(f"GPS fix callback error: {e}")
+
+    def _apply_rmc(self, msg, now: float) -> GPSFix:
+        previous = self._snapshot
+        if msg.status != 'A':
+            # No fix - keep the last known position, flagged invalid
+            return previous._replace(valid=False, updated=now)
+        try:
+            utc = msg.datetime
+        except (ValueError, TypeError, AttributeError):
+            utc = previous.utc
+        return previous._replace(valid=True, latitude=msg.latitude, longitude=msg.longitude,
+                                 utc=utc, updated=now, fix_time=now)
+
+    def get_stats(self):
+        fix = self._snapshot
+        return {
+            **self.stats,
+            'port_open': self.serial is not None,
+            'valid_fix': fix.valid,
+            'fix_age': time.time() - fix.fix_time if fix.fix_time else None
+        }
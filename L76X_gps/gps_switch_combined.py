@@ -1,142 +1,110 @@
 #!/usr/bin/env python3
 """
 Combined GPS and Switch Test
-Tests both GPS module and switch button together
+Tests both GPS module and switch button together. The services themselves
+(L76X_gps.gps_service, switch.switch_service) are importable - the detection
+client runs them in-process via runScripts/field_io.py. Run standalone as a
+sidecar it publishes the fix and switch state on the shared-memory state bus
+(runScripts/state_bus.py) and shows the detection client's latest detections
+- start the client with ARCIS_PANIC_SWITCH=0 ARCIS_GPS=0 so each record keeps one writer.
+The client then watches both records and treats presses and fixes as its own.
 """
 
-import serial
-import pynmea2
 import os
+import sys
 import time
 import threading
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from L76X_gps.gps_service import GPSService
+from switch.switch_service import SwitchService
+from runScripts.state_bus import StateBus
+
 # GPS Configuration
 GPS_PORT = '/dev/ttyTHS1'
 GPS_BAUD = 9600
 
 # Switch Configuration
-SWITCH_GPIO = 19
-SWITCH_PATH = f"/sys/class/gpio/gpio{SWITCH_GPIO}"
+SWITCH_GPIO = 19  # sysfs number - header pin 24 (see switch_service.bcm_to_sysfs for BCM pins)
 
 class GPSSwitchSystem:
-    def __init__(self):
+    def __init__(self, fix_callback=None, press_callback=None, bus=None):
         self.running = False
-        self.gps_serial = None
-        self.switch_setup = False
-        self.gps_data = {}
-        self.switch_pressed = False
+        # Called with (latitude, longitude, fix_time) for every valid RMC fix,
+        # e.g. RedisDetectionHandler.update_location for geo-indexed coordination
+        self.fix_callback = fix_callback
+        # Called with (switch event, latest GPS fix) on every debounced press
+        self.press_callback = press_callback
+        # Shared-memory state bus - this process is the only GPS/switch writer on it
+        self.bus = bus
+        self.gps = None
+        self.switch = None
         
     def setup_switch(self):
-        """Setup switch using sysfs"""
-        try:
-            if not os.path.exists(SWITCH_PATH):
-                with open("/sys/class/gpio/export", "w") as f:
-                    f.write(str(SWITCH_GPIO))
-            
-            with open(f"{SWITCH_PATH}/direction", "w") as f:
-                f.write("in")
-            
-            self.switch_setup = True
-            print("✅ Switch setup complete")
-            return True
-        except Exception as e:
-            print(f"❌ Switch setup failed: {e}")
-            return False
-    
-    def read_switch(self):
-        """Read switch state"""
-        if not self.switch_setup:
-            return False
-        try:
-            with open(f"{SWITCH_PATH}/value", "r") as f:
-                return int(f.read().strip()) == 0  # LOW when pressed
-        except:
+        """Setup the edge-triggered switch service (sysfs 'edge' + poll)"""
+        self.switch = SwitchService(SWITCH_GPIO)
+        if not self.switch.setup():
+            print("❌ Switch setup failed")
             return False
+        self.switch.subscribe(self.on_switch_event)
+        print("✅ Switch setup complete")
+        return True
     
     def setup_gps(self):
-        """Setup GPS serial connection"""
-        try:
-            self.gps_serial = serial.Serial(GPS_PORT, GPS_BAUD, timeout=1)
-            print("✅ GPS setup complete")
-            return True
-        except Exception as e:
-            print(f"❌ GPS setup failed: {e}")
-            return False
+        """Create the GPS service (the port is opened, and reopened, by its reader thread)"""
+        self.gps = GPSService(GPS_PORT, GPS_BAUD, fix_callback=self.on_fix)
+        print("✅ GPS setup complete")
+        return True
     
-    def gps_worker(self):
-        """GPS data reading worker thread"""
-        while self.running:
-            try:
-                if self.gps_serial and self.gps_serial.in_waiting > 0:
-                    line = self.gps_serial.readline().decode('ascii', errors='replace').strip()
-                    
-                    if line.startswith('$'):
-                        msg = pynmea2.parse(line)
-                        
-                        if hasattr(msg, 'sentence_type'):
-                            if msg.sentence_type == 'RMC':
-                                self.gps_data['status'] = msg.status
-                                self.gps_data['lat'] = msg.lat
-                                self.gps_data['lon'] = msg.lon
-                                self.gps_data['time'] = msg.datetime
-                            elif msg.sentence_type == 'GGA':
-                                self.gps_data['satellites'] = msg.num_sats
-                                self.gps_data['fix_quality'] = msg.gps_qual
-                                
-            except Exception as e:
-                pass
-            
-            time.sleep(0.1)
+    def on_fix(self, latitude, longitude, fix_time):
+        """Valid fix from the GPS reader thread"""
+        if self.bus:
+            self.bus.write_gps(self.gps.latest())
+        if self.fix_callback:
+            self.fix_callback(latitude, longitude, fix_time)
     
-    def switch_worker(self):
-        """Switch monitoring worker thread"""
-        last_state = False
-        
-        while self.running:
-            try:
-                current_state = self.read_switch()
-                
-                if current_state != last_state:
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    
-                    if current_state:
-                        print(f"🔴 [{timestamp}] SWITCH PRESSED")
-                        self.on_switch_pressed()
-                    else:
-                        print(f"🟢 [{timestamp}] SWITCH RELEASED")
-                    
-                    last_state = current_state
-                    
-            except Exception as e:
-                pass
-            
-            time.sleep(0.01)
+    def on_switch_event(self, event):
+        """Debounced press/release from the switch service (runs on its watcher thread)"""
+        if self.bus:
+            self.bus.write_switch(event.pressed, event.press_count, event.timestamp, event.monotonic)
+        timestamp = datetime.fromtimestamp(event.timestamp).strftime("%H:%M:%S")
+        if event.pressed:
+            print(f"🔴 [{timestamp}] SWITCH PRESSED")
+            self.on_switch_pressed(event)
+        else:
+            print(f"🟢 [{timestamp}] SWITCH RELEASED")
     
-    def on_switch_pressed(self):
+    def on_switch_pressed(self, event):
         """Action when switch is pressed"""
         # Print current GPS status
-        status = self.gps_data.get('status', 'V')
-        satellites = self.gps_data.get('satellites', 0)
+        fix = self.gps.latest()
         
-        if status == 'A':
-            lat = self.gps_data.get('lat', 'N/A')
-            lon = self.gps_data.get('lon', 'N/A')
-            print(f"📍 GPS Position: {lat}, {lon}")
+        if fix.valid:
+            print(f"📍 GPS Position: {fix.latitude:.6f}, {fix.longitude:.6f}")
         else:
-            print(f"🛰️ GPS Status: Searching... ({satellites} satellites)")
+            print(f"🛰️ GPS Status: Searching... ({fix.satellites} satellites)")
+        
+        if self.press_callback:
+            self.press_callback(event, fix)
     
     def status_worker(self):
         """Status display worker"""
         while self.running:
             try:
-                status = self.gps_data.get('status', 'V')
-                satellites = self.gps_data.get('satellites', 0)
-                switch_state = "PRESSED" if self.read_switch() else "RELEASED"
+                fix = self.gps.latest()
+                switch_state = "PRESSED" if self.switch.is_pressed() else "RELEASED"
+                
+                gps_status = "🟢 GPS FIX" if fix.valid else f"🔴 SEARCHING ({fix.satellites} sats)"
                 
-                gps_status = "🟢 GPS FIX" if status == 'A' else f"🔴 SEARCHING ({satellites} sats)"
+                detection_status = ""
+                detections = self.bus.read_detections() if self.bus else None
+                if detections:
+                    weapons = sum(1 for det in detections.detections if det[3])
+                    detection_status = f" | Detections: {len(detections.detections)} ({weapons} weapons)"
                 
-                print(f"\r📊 Status: {gps_status} | Switch: {switch_state}", end="", flush=True)
+                print(f"\r📊 Status: {gps_status} | Switch: {switch_state}{detection_status}", end="", flush=True)
                 
             except:
                 pass
@@ -157,12 +125,9 @@ class GPSSwitchSystem:
         self.running = True
         
         # Start worker threads
-        gps_thread = threading.Thread(target=self.gps_worker, daemon=True)
-        switch_thread = threading.Thread(target=self.switch_worker, daemon=True)
+        self.gps.start()
+        self.switch.start()
         status_thread = threading.Thread(target=self.status_worker, daemon=True)
-        
-        gps_thread.start()
-        switch_thread.start()
         status_thread.start()
         
         print("✅ All systems running")
@@ -180,18 +145,17 @@ class GPSSwitchSystem:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.gps_serial:
-            self.gps_serial.close()
+        if self.gps:
+            self.gps.stop()
         
-        if self.switch_setup:
-            try:
-                with open("/sys/class/gpio/unexport", "w") as f:
-                    f.write(str(SWITCH_GPIO))
-            except:
-                pass
+        if self.switch:
+            self.switch.stop()
+        
+        if self.bus:
+            self.bus.close()
         
         print("✅ Cleanup complete")
 
 if __name__ == "__main__":
-    system = GPSSwitchSystem()
+    system = GPSSwitchSystem(bus=StateBus())
     system.start()
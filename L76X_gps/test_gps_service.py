@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test Script for the event-driven GPS service
+Replays NMEA through a pseudo-terminal in place of the L76X UART
+"""
+
+import os
+import sys
+import time
+import tty
+
+import pytest
+
+pytest.importorskip("serial")
+pytest.importorskip("pynmea2")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gps_service import GPSService, nmea_checksum_ok
+
+
+def with_checksum(body):
+    checksum = 0
+    for byte in body.encode('ascii'):
+        checksum ^= byte
+    return f"${body}*{checksum:02X}\r\n".encode('ascii')
+
+
+RMC = with_checksum("GNRMC,123519.00,A,3203.2490,N,03446.5710,E,0.02,,191026,,,A")
+RMC_NO_FIX = with_checksum("GNRMC,123520.00,V,,,,,,,191026,,,N")
+GGA = with_checksum("GNGGA,123519.00,3203.2490,N,03446.5710,E,1,08,0.9,45.0,M,17.8,M,,")
+GSV = with_checksum("GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45")
+BAD_CHECKSUM = RMC.replace(b'*', b'0*', 1)
+
+
+def open_replay():
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    return master, slave
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_checksum():
+    assert nmea_checksum_ok(RMC.strip())
+    assert not nmea_checksum_ok(BAD_CHECKSUM.strip())
+    assert not nmea_checksum_ok(b'$GNRMC,no,checksum')
+
+
+def test_replay_updates_snapshot():
+    master, slave = open_replay()
+    fixes = []
+    service = GPSService(os.ttyname(slave), 9600, fix_callback=lambda *fix: fixes.append(fix))
+    service.start()
+    try:
+        stream = GSV + BAD_CHECKSUM + b'garbage without newline' + b'\n' + GGA + RMC
+        # Split mid-sentence - the reader must reassemble across reads
+        os.write(master, stream[:50])
+        time.sleep(0.05)
+        os.write(master, stream[50:])
+
+        assert wait_for(lambda: service.latest().valid)
+        fix = service.latest()
+        assert abs(fix.latitude - 32.05415) < 1e-4
+        assert abs(fix.longitude - 34.776183) < 1e-4
+        assert fix.satellites == 8 and fix.fix_quality == 1
+        assert len(fixes) == 1
+
+        stats = service.get_stats()
+        assert stats['skipped'] == 2           # GSV and the garbage line
+        assert stats['checksum_errors'] == 1
+        assert stats['sentences'] == 2
+
+        # Losing the fix keeps the last position but marks it invalid
+        os.write(master, RMC_NO_FIX)
+        assert wait_for(lambda: not service.latest().valid)
+        assert service.latest().latitude == fix.latitude
+    finally:
+        service.stop()
+        os.close(master)
+        os.close(slave)
+
+
+def test_stop_wakes_blocked_reader():
+    master, slave = open_replay()
+    service = GPSService(os.ttyname(slave), 9600)
+    service.start()
+    time.sleep(0.1)
+    started = time.time()
+    service.stop()
+    # Woken through the pipe, not by the poll timeout
+    assert time.time() - started < 0.5
+    os.close(master)
+    os.close(slave)
+
+
+def test_stop_twice_and_restart():
+    master, slave = open_replay()
+    service = GPSService(os.ttyname(slave), 9600)
+    try:
+        service.stop()               # never started
+        service.start()
+        service.stop()
+        service.stop()               # shutdown paths may call it again
+        service.start()              # a fresh wake pipe
+        os.write(master, RMC)
+        assert wait_for(lambda: service.latest().valid)
+    finally:
+        service.stop()
+        os.close(master)
+        os.close(slave)
+
+
+def run_tests():
+    print("🚀 GPS SERVICE TESTS")
+    test_checksum()
+    test_replay_updates_snapshot()
+    test_stop_wakes_blocked_reader()
+    test_stop_twice_and_restart()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,758 @@
+# asyncio Redis Detection Handler for ARCIS System
+#
+# Same keys, payloads and public methods as RedisManager / RedisDetectionHandler,
+# built on redis.asyncio: the subscriber, heartbeat and reconnect loops are tasks
+# on one event loop instead of OS threads, and Redis I/O overlaps with inference.
+import asyncio
+import random
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from redis_system.redis_config import (
+    REDIS_CONFIG, REDIS_KEYS, REDIS_INDEXES, CACHE_TTL, EVENT_BUS_CONFIG, SUPERVISOR_CONFIG,
+    DETECTION_HISTORY_LENGTH, LATENCY_SAMPLE_SIZE, PUBLISH_DETECTION_LUA, NEARBY_DEVICES_LUA, GEO_CONFIG,
+    GEO_KEYS, alarm_channel, create_frame_hash, detection_meta, aggregate_script_args, queue_location_writes,
+    queue_detection_writes, latency_summary, scripting_unavailable
+)
+from redis_system.event_coalescing import EventCoalescer, detection_event_data
+from redis_system.coordination_index import CoordinationWindow, coordination_analysis
+from redis_system.serialization import SERIALIZATION_CONFIG, get_serializer, decode_event
+from redis_system.compact_layout import cache_slot, pack_detection_rows, unpack_detection_rows, history_entry
+
+logger = logging.getLogger(__name__)
+
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+
+class AsyncRedisManager:
+    """redis.asyncio counterpart of RedisManager (coroutine methods, same key layout)"""
+
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+        self.redis_client = None
+        self.event_client = None
+        self.raw_client = None
+        self.connected = False
+        self.connection_attempts = 0
+
+        self.serializer = get_serializer()
+        self.event_serializer = get_serializer(SERIALIZATION_CONFIG['device_events'])
+        self.publish_script = None
+        self.nearby_devices_script = None
+        self.scripts_enabled = {'publish_detection': True, 'nearby_devices': True}
+        self.location = None  # (lat, lon, fix_time), rewritten after reconnects
+
+        # Write-behind buffer - detection events and the latest status while disconnected
+        self.write_buffer = deque(maxlen=SUPERVISOR_CONFIG['write_buffer_size'])
+        self.pending_status = {}
+        self.buffered_writes = 0
+        self.dropped_writes = 0
+        self.flushed_writes = 0
+
+        self.stream_key = f"{REDIS_KEYS['detections']}stream"
+        self.stream_group = f"arcis:bus:{device_id}"
+        self.stream_last_id = None
+        self.stream_events_consumed = 0
+
+        self.latency_samples = {}
+
+    async def connect(self) -> bool:
+        """Connect (or reconnect) and register the device"""
+        try:
+            if self.redis_client is None:
+                self.redis_client = aioredis.Redis(connection_pool=aioredis.ConnectionPool(**REDIS_CONFIG))
+                # Events are always read undecoded - peers may publish JSON or msgpack
+                self.event_client = aioredis.Redis(connection_pool=aioredis.ConnectionPool(
+                    **{**REDIS_CONFIG, 'decode_responses': False}
+                ))
+                self.raw_client = self.event_client
+                self.publish_script = self.event_client.register_script(PUBLISH_DETECTION_LUA)
+                self.nearby_devices_script = self.redis_client.register_script(NEARBY_DEVICES_LUA)
+
+            await self.redis_client.ping()
+            self.connected = True
+            self.connection_attempts = 0
+            logger.info(f"✅ Redis (asyncio) connected for {self.device_id}")
+
+            await self.update_device_status({
+                'device_id': self.device_id,
+                'status': 'online',
+                'capabilities': 'weapon_detection,alarm_system'
+            })
+            if self.location is not None:
+                await self._write_location()
+            await self._flush_write_buffer()
+            return self.connected
+
+        except CONNECTION_ERRORS as e:
+            self.connection_attempts += 1
+            self.connected = False
+            logger.warning(f"❌ Redis (asyncio) connection failed (attempt {self.connection_attempts}): {e}")
+            return False
+
+        except redis.ResponseError as e:
+            # Server reachable but refusing (LOADING, MISCONF, ACL) - back off like a connection failure
+            self.connection_attempts += 1
+            self.connected = False
+            logger.error(f"❌ Redis (asyncio) rejected the connection setup: {e}")
+            return False
+
+    def _mark_disconnected(self, error: Exception):
+        if self.connected:
+            logger.warning(f"⚠️ Redis connection lost ({error}) - reconnecting in background")
+        self.connected = False
+
+    def _handle_error(self, error: Exception, message: str):
+        if isinstance(error, CONNECTION_ERRORS):
+            self._mark_disconnected(error)
+        else:
+            logger.error(f"{message}: {error}")
+
+    async def supervise(self, stop: asyncio.Event):
+        """Health checks while connected, jittered exponential backoff reconnects otherwise"""
+        while not stop.is_set():
+            if self.connected:
+                delay = SUPERVISOR_CONFIG['health_check_interval']
+                try:
+                    started = time.perf_counter()
+                    await self.redis_client.ping()
+                    self._record_latency('health_check', started)
+                except Exception as e:
+                    self._mark_disconnected(e)
+                    delay = 0
+            elif await self.connect():
+                continue
+            else:
+                cap = min(SUPERVISOR_CONFIG['backoff_max'],
+                          SUPERVISOR_CONFIG['backoff_base'] * (2 ** min(self.connection_attempts, 16)))
+                delay = random.uniform(0, cap)
+
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _record_latency(self, operation: str, started: float):
+        samples = self.latency_samples.get(operation)
+        if samples is None:
+            samples = self.latency_samples[operation] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        samples.append((time.perf_counter() - started) * 1000.0)
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        return latency_summary(self.latency_samples)
+
+    def _buffer_detection(self, channel: str, history_key: str, payload: Any, history_payload: Any, meta):
+        if len(self.write_buffer) == self.write_buffer.maxlen:
+            self.dropped_writes += 1
+        self.write_buffer.append((channel, history_key, payload, history_payload, meta))
+        self.buffered_writes += 1
+
+    async def _flush_write_buffer(self):
+        """Replay buffered writes in one pipeline after (re)connecting"""
+        events = list(self.write_buffer)
+        self.write_buffer.clear()
+        status, self.pending_status = self.pending_status, {}
+        if not events and not status:
+            return
+
+        try:
+            started = time.perf_counter()
+            if events:
+                pipe = self.event_client.pipeline(transaction=False)
+                for channel, history_key, payload, history_payload, meta in events:
+                    queue_detection_writes(pipe, self.device_id, self.stream_key, channel, history_key,
+                                           payload, history_payload, meta)
+                await pipe.execute()
+            if status:
+                await self._write_device_hash(status)
+            self._record_latency('flush_write_buffer', started)
+            self.flushed_writes += len(events)
+            logger.info(f"📤 Flushed {len(events)} buffered detection events to Redis")
+        except Exception as e:
+            # At-least-once, like RedisManager - a partly applied pipeline may repeat events
+            self.write_buffer.extendleft(reversed(events))
+            self.pending_status = {**status, **self.pending_status}
+            self._handle_error(e, "Failed to flush Redis write buffer")
+
+    def get_connection_stats(self) -> Dict[str, Any]:
+        return {
+            'connected': self.connected,
+            'connection_attempts': self.connection_attempts,
+            'buffered_now': len(self.write_buffer),
+            'buffered_total': self.buffered_writes,
+            'dropped': self.dropped_writes,
+            'flushed': self.flushed_writes
+        }
+
+    async def publish_detection(self, detection_data: Dict[str, Any]) -> bool:
+        """Publish a detection event (stream/channel, history, counter) in one round trip
+
+        True when written, or queued in the write-behind buffer while Redis is unreachable.
+        """
+        try:
+            event = {
+                'device_id': self.device_id,
+                'timestamp': time.time(),
+                'detection_id': f"{self.device_id}_{int(time.time())}",
+                **detection_data
+            }
+            payload = self.event_serializer.dumps(event)
+            history_payload = self.event_serializer.dumps(history_entry(event))
+            channel = f"{REDIS_KEYS['detections']}events"
+            history_key = f"{REDIS_KEYS['detections']}{self.device_id}:history"
+            meta = detection_meta(event)
+
+            if not self.connected:
+                self._buffer_detection(channel, history_key, payload, history_payload, meta)
+                return True
+
+            started = time.perf_counter()
+            try:
+                await self._write_detection(channel, history_key, payload, history_payload, meta)
+            except CONNECTION_ERRORS as e:
+                self._mark_disconnected(e)
+                self._buffer_detection(channel, history_key, payload, history_payload, meta)
+                return True
+            self._record_latency('publish_detection', started)
+
+            logger.info(f"📡 Published detection event: {event['detection_id']}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to publish detection: {e}")
+            return False
+
+    def _disable_script(self, name: str, error: Exception) -> bool:
+        """Turn off one script when the error means scripting is unavailable; False otherwise"""
+        if not scripting_unavailable(error):
+            return False
+        logger.warning(f"⚠️ Redis Lua scripting unavailable for {name} ({error}) - using plain commands")
+        self.scripts_enabled[name] = False
+        return True
+
+    async def _write_detection(self, channel: str, history_key: str, payload: Any, history_payload: Any, meta):
+        use_stream = EVENT_BUS_CONFIG['mode'] == 'streams'
+        use_pubsub = EVENT_BUS_CONFIG['legacy_publish'] or not use_stream
+
+        if self.scripts_enabled['publish_detection']:
+            try:
+                aggregate_keys, aggregate_args = aggregate_script_args(meta)
+                await self.publish_script(
+                    keys=[history_key, REDIS_INDEXES['detection_counts'], self.stream_key, *aggregate_keys],
+                    args=[channel, payload, DETECTION_HISTORY_LENGTH, CACHE_TTL['detection_event'],
+                          self.device_id, EVENT_BUS_CONFIG['stream_maxlen'] if use_stream else 0,
+                          '1' if use_pubsub else '0', history_payload, *aggregate_args]
+                )
+                return
+            except redis.ResponseError as e:
+                if not self._disable_script('publish_detection', e):
+                    raise
+
+        pipe = self.event_client.pipeline(transaction=True)
+        queue_detection_writes(pipe, self.device_id, self.stream_key, channel, history_key,
+                               payload, history_payload, meta)
+        await pipe.execute()
+
+    async def subscribe_to_detections(self, callback_func: Callable[[Dict[str, Any]], None],
+                                      stop: asyncio.Event):
+        """Deliver other devices' events to callback_func until stop is set; resumes after reconnects"""
+        while not stop.is_set():
+            if not self.connected:
+                await asyncio.sleep(1.0)
+                continue
+            try:
+                if EVENT_BUS_CONFIG['mode'] == 'streams':
+                    await self._consume_detection_stream(callback_func, stop)
+                else:
+                    await self._subscribe_pubsub(callback_func, stop)
+            except Exception as e:
+                self._handle_error(e, "Detection subscriber error")
+                if self.connected:
+                    await asyncio.sleep(EVENT_BUS_CONFIG['reconnect_delay'])
+
+    async def _consume_detection_stream(self, callback_func, stop: asyncio.Event):
+        try:
+            await self.event_client.xgroup_create(self.stream_key, self.stream_group, id='$', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+        read_id = '0'  # our unacknowledged entries first
+        while not stop.is_set() and self.connected:
+            response = await self.event_client.xreadgroup(
+                self.stream_group, self.device_id, {self.stream_key: read_id},
+                count=EVENT_BUS_CONFIG['batch_count'], block=EVENT_BUS_CONFIG['block_ms']
+            )
+            entries = response[0][1] if response else []
+            if not entries:
+                read_id = '>'
+                continue
+
+            for entry_id, fields in entries:
+                self.stream_last_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                self.stream_events_consumed += 1
+                source_device = fields.get('device_id', fields.get(b'device_id'))
+                if isinstance(source_device, bytes):
+                    source_device = source_device.decode()
+                if source_device == self.device_id:
+                    continue
+                try:
+                    callback_func(decode_event(fields.get('data', fields.get(b'data'))))
+                except Exception as e:
+                    logger.error(f"Error processing detection event {self.stream_last_id}: {e}")
+
+            await self.event_client.xack(self.stream_key, self.stream_group, *[entry_id for entry_id, _ in entries])
+
+    async def _subscribe_pubsub(self, callback_func, stop: asyncio.Event):
+        pubsub = self.event_client.pubsub()
+        try:
+            await pubsub.subscribe(f"{REDIS_KEYS['detections']}events")
+            while not stop.is_set() and self.connected:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message['type'] == 'message':
+                    try:
+                        event_data = decode_event(message['data'])
+                        if event_data.get('device_id') != self.device_id:
+                            callback_func(event_data)
+                    except Exception as e:
+                        logger.error(f"Error processing detection event: {e}")
+        finally:
+            await pubsub.close()
+
+    async def subscribe_to_alarms(self, callback_func: Callable[[Dict[str, Any]], None], stop: asyncio.Event):
+        """Deliver alarms fanned out to this device's alarm channel until stop is set"""
+        while not stop.is_set():
+            if not self.connected:
+                await asyncio.sleep(1.0)
+                continue
+            pubsub = self.event_client.pubsub()
+            try:
+                await pubsub.subscribe(alarm_channel(self.device_id))
+                while not stop.is_set() and self.connected:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message['type'] == 'message':
+                        try:
+                            callback_func(decode_event(message['data']))
+                        except Exception as e:
+                            logger.error(f"Error processing alarm event: {e}")
+            except Exception as e:
+                self._handle_error(e, "Alarm subscriber error")
+                if self.connected:
+                    await asyncio.sleep(EVENT_BUS_CONFIG['reconnect_delay'])
+            finally:
+                await pubsub.close()
+
+    async def cache_inference_result(self, frame_hash: str, inference_result: Dict[str, Any]) -> bool:
+        if not self.connected:
+            return False
+        try:
+            now = time.time()
+            ttl = CACHE_TTL['inference_result']
+            slice_id, bucket, field = cache_slot(frame_hash, now, ttl)
+            cache_key = f"{REDIS_KEYS['inference_cache']}{slice_id}:{bucket}"
+            pipe = self.raw_client.pipeline(transaction=False)
+            pipe.hset(cache_key, field, pack_detection_rows(inference_result.get('timestamp', now),
+                                                            inference_result.get('detections', [])))
+            pipe.expire(cache_key, 2 * ttl)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            self._handle_error(e, "Failed to cache inference result")
+            return False
+
+    async def get_cached_inference(self, frame_hash: str) -> Optional[Dict[str, Any]]:
+        if not self.connected:
+            return None
+        try:
+            slice_id, bucket, field = cache_slot(frame_hash, time.time(), CACHE_TTL['inference_result'])
+            started = time.perf_counter()
+            pipe = self.raw_client.pipeline(transaction=False)
+            pipe.hget(f"{REDIS_KEYS['inference_cache']}{slice_id}:{bucket}", field)
+            pipe.hget(f"{REDIS_KEYS['inference_cache']}{slice_id - 1}:{bucket}", field)
+            cached_data = next((value for value in await pipe.execute() if value), None)
+            self._record_latency('get_cached_inference', started)
+            if not cached_data:
+                return None
+            timestamp, rows = unpack_detection_rows(cached_data)
+            return {'timestamp': timestamp, 'detections': rows}
+        except Exception as e:
+            self._handle_error(e, "Failed to get cached inference")
+            return None
+
+    async def update_device_status(self, status_data: Dict[str, Any]) -> bool:
+        """HSET + EXPIRE + registry score in one MULTI/EXEC round trip (kept for write-behind while down)"""
+        status_update = {'last_seen': time.time(), **status_data}
+        if not self.connected:
+            self.pending_status.update(status_update)
+            return False
+        try:
+            started = time.perf_counter()
+            await self._write_device_hash(status_update)
+            self._record_latency('update_device_status', started)
+            return True
+        except Exception as e:
+            if isinstance(e, CONNECTION_ERRORS):
+                self.pending_status.update(status_update)
+            self._handle_error(e, "Failed to update device status")
+            return False
+
+    async def _write_device_hash(self, mapping: Dict[str, Any]):
+        device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(device_key, mapping=mapping)
+        pipe.expire(device_key, CACHE_TTL['device_status'])
+        pipe.zadd(REDIS_INDEXES['devices'], {self.device_id: mapping['last_seen']})
+        await pipe.execute()
+
+    async def update_location(self, latitude: float, longitude: float, fix_time: Optional[float] = None) -> bool:
+        """Device hash fields + GEOADD in one MULTI/EXEC round trip"""
+        self.location = (latitude, longitude, fix_time or time.time())
+        if not self.connected:
+            return False
+        try:
+            await self._write_location()
+            return True
+        except Exception as e:
+            self._handle_error(e, "Failed to update device location")
+            return False
+
+    async def _write_location(self):
+        latitude, longitude, fix_time = self.location
+        device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(device_key, mapping={'latitude': latitude, 'longitude': longitude, 'fix_time': fix_time})
+        pipe.expire(device_key, CACHE_TTL['device_status'])
+        queue_location_writes(pipe, self.device_id, latitude, longitude, fix_time)
+        await pipe.execute()
+
+    async def get_nearby_devices(self, radius_m: Optional[float] = None) -> Optional[List[tuple]]:
+        """(device_id, distance_m) within radius_m, nearest first; None without a fix"""
+        if self.location is None or not self.connected:
+            return None
+        latitude, longitude, _ = self.location
+        radius_m = radius_m or GEO_CONFIG['radius_m']
+        cutoff = time.time() - CACHE_TTL['coordinates']
+        try:
+            started = time.perf_counter()
+            found = None
+            if self.scripts_enabled['nearby_devices']:
+                try:
+                    found = await self.nearby_devices_script(
+                        keys=[GEO_KEYS['positions'], GEO_KEYS['fixes']],
+                        args=[longitude, latitude, radius_m, cutoff, GEO_CONFIG['max_neighbours']]
+                    )
+                except redis.ResponseError as e:
+                    if not self._disable_script('nearby_devices', e):
+                        raise
+
+            if found is None:
+                found = await self.redis_client.geosearch(
+                    GEO_KEYS['positions'], longitude=longitude, latitude=latitude, radius=radius_m, unit='m',
+                    sort='ASC', count=GEO_CONFIG['max_neighbours'], withdist=True)
+                fix_times = await self.redis_client.zmscore(GEO_KEYS['fixes'],
+                                                            [item[0] for item in found]) if found else []
+                found = [item for item, fix_time in zip(found, fix_times)
+                         if fix_time is not None and fix_time >= cutoff]
+            self._record_latency('get_nearby_devices', started)
+            return [(device_id, float(distance)) for device_id, distance in found if device_id != self.device_id]
+        except Exception as e:
+            self._handle_error(e, "Failed to query nearby devices")
+            return None
+
+    async def get_located_devices(self) -> Optional[frozenset]:
+        """Ids of every device with a recent fix - None on failure"""
+        if not self.connected:
+            return None
+        try:
+            return frozenset(await self.redis_client.zrangebyscore(
+                GEO_KEYS['fixes'], time.time() - CACHE_TTL['coordinates'], '+inf'))
+        except Exception as e:
+            self._handle_error(e, "Failed to list located devices")
+            return None
+
+    async def cleanup(self):
+        try:
+            if self.connected and self.redis_client is not None:
+                await self._flush_write_buffer()
+                pipe = self.redis_client.pipeline(transaction=True)
+                pipe.delete(f"{REDIS_KEYS['device_status']}{self.device_id}")
+                pipe.zrem(REDIS_INDEXES['devices'], self.device_id)
+                pipe.zrem(GEO_KEYS['positions'], self.device_id)
+                pipe.zrem(GEO_KEYS['fixes'], self.device_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis cleanup error: {e}")
+        finally:
+            self.connected = False
+            clients = [self.redis_client]
+            for client in (self.event_client, self.raw_client):
+                if client is not None and client not in clients:
+                    clients.append(client)
+            for client in clients:
+                if client is not None:
+                    await client.aclose()
+            self.redis_client = None
+            self.event_client = None
+            self.raw_client = None
+
+
+class AsyncRedisDetectionHandler:
+    """asyncio counterpart of RedisDetectionHandler
+
+    Call ``await handler.start()`` from the event loop, then
+    ``await handler.process_detection_with_redis(frame, detections, vm_inference_func)``
+    per frame. vm_inference_func is a blocking callable; it runs in the default
+    executor only after a cache miss, and publishing/caching are background
+    tasks that never hold up the returned detections.
+    """
+
+    def __init__(self, device_id: str, device_config: Dict[str, Any],
+                 telemetry_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+                 detection_type: Optional[Any] = None,
+                 alarm_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.device_id = device_id
+        self.device_config = device_config
+        self.redis_manager = AsyncRedisManager(device_id)
+        self.telemetry_provider = telemetry_provider
+        self.detection_type = detection_type
+        self.alarm_callback = alarm_callback
+        self.last_alarm = None
+
+        self.last_coordination = None
+        self.inference_cache_hits = 0
+        self.inference_cache_misses = 0
+        self.remote_detections = CoordinationWindow(active_window=30.0, retention=60.0)
+        self.last_redis_heartbeat = 0
+        self.heartbeat_interval = 30
+        self.nearby_devices = None   # neighbour ids once this device has a fix
+        self.distant_devices = None  # ids with a fix outside the radius - the only ones excluded
+        self.last_nearby_refresh = 0.0
+
+        self.coalescer = EventCoalescer()
+
+        self._stop = None
+        self._tasks = set()
+
+    @property
+    def redis_connected(self) -> bool:
+        return self.redis_manager.connected
+
+    async def start(self) -> bool:
+        """Connect and start the subscriber, heartbeat and supervisor tasks"""
+        self._stop = asyncio.Event()
+        if 'latitude' in self.device_config and 'longitude' in self.device_config:
+            self.redis_manager.location = (self.device_config['latitude'], self.device_config['longitude'],
+                                           time.time())
+        connected = await self.redis_manager.connect()
+        self._spawn(self.redis_manager.supervise(self._stop))
+        self._spawn(self.redis_manager.subscribe_to_detections(self._handle_remote_detection, self._stop))
+        self._spawn(self.redis_manager.subscribe_to_alarms(self._handle_alarm, self._stop))
+        self._spawn(self._heartbeat_loop())
+        if not connected:
+            logger.warning("⚠️ Operating without Redis - limited coordination, reconnecting in background")
+        return connected
+
+    def _spawn(self, coroutine):
+        """Run a background task and keep a reference until it finishes"""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def update_location(self, latitude: float, longitude: float, fix_time: Optional[float] = None) -> bool:
+        self.last_nearby_refresh = 0.0
+        return await self.redis_manager.update_location(latitude, longitude, fix_time)
+
+    async def _refresh_nearby_devices(self):
+        if self.redis_manager.location is None:
+            self.nearby_devices = None
+            self.distant_devices = None
+            return
+        nearby = await self.redis_manager.get_nearby_devices()
+        located = await self.redis_manager.get_located_devices() if nearby is not None else None
+        if located is not None:
+            self.nearby_devices = frozenset(device_id for device_id, _ in nearby)
+            self.distant_devices = located - self.nearby_devices - {self.device_id}
+            self.last_nearby_refresh = time.time()
+
+    def _count_active_remote(self, now: float) -> int:
+        if self.distant_devices is None:
+            return self.remote_detections.active_count(now)
+        return self.remote_detections.active_count_excluding(self.distant_devices, now)
+
+    def _handle_alarm(self, alarm_event: Dict[str, Any]):
+        if alarm_event.get('source_device') == self.device_id:
+            return
+        self.last_alarm = alarm_event
+        logger.info(f"🚨 Nearby alarm from {alarm_event.get('source_device')}: {alarm_event.get('alarm_code')}")
+        if self.alarm_callback:
+            self.alarm_callback(alarm_event)
+
+    def _handle_remote_detection(self, event_data: Dict[str, Any]):
+        remote_device = event_data.get('device_id', 'unknown')
+        if self.distant_devices is not None and remote_device in self.distant_devices:
+            return
+        self.remote_detections.update(remote_device, {
+            'objects': event_data.get('objects', []),
+            'confidence': event_data.get('max_confidence', 0),
+            'timestamp': event_data.get('timestamp', time.time()),
+            'detection_id': event_data.get('detection_id', 'unknown')
+        })
+        self.remote_detections.expire(time.time())
+
+    async def _heartbeat_loop(self):
+        while not self._stop.is_set():
+            if self.redis_connected and time.time() - self.last_redis_heartbeat > self.heartbeat_interval:
+                status_data = {
+                    'status': 'active',
+                    'cache_hits': self.inference_cache_hits,
+                    'cache_misses': self.inference_cache_misses,
+                    'remote_detections_count': len(self.remote_detections)
+                }
+                if self.telemetry_provider:
+                    for key, value in self.telemetry_provider().items():
+                        if value is not None:
+                            status_data[key] = int(value) if isinstance(value, bool) else value
+                if await self.redis_manager.update_device_status(status_data):
+                    self.last_redis_heartbeat = time.time()
+            if self.redis_connected and time.time() - self.last_nearby_refresh > GEO_CONFIG['refresh_interval']:
+                await self._refresh_nearby_devices()
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=GEO_CONFIG['refresh_interval'])
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _frame_hash(frame) -> str:
+        import cv2
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        return create_frame_hash(buffer.tobytes())
+
+    async def process_detection_with_redis(self, frame, detections: List[Any], vm_inference_func=None,
+                                           frame_hash: Optional[str] = None) -> List[Any]:
+        """Cache lookup first, inference only on a miss; publish/cache writes happen in the background
+
+        frame_hash: MD5 of the q85 JPEG when the caller already encoded the frame.
+        Without vm_inference_func the detections are fresh results - no lookup, and
+        they are cached only under a given frame_hash.
+        """
+        if vm_inference_func is None:
+            if frame_hash is not None and self.redis_connected:
+                self._spawn(self.redis_manager.cache_inference_result(frame_hash, {
+                    'timestamp': time.time(),
+                    'detections': [list(detection) for detection in detections],
+                    'device_id': self.device_id
+                }))
+            self._coordinate(detections)
+            return detections
+
+        loop = asyncio.get_running_loop()
+
+        # The lookup is one LAN round trip; the VM call it saves is a full inference
+        cached_result = None
+        use_cache = self.redis_connected
+        if use_cache:
+            if frame_hash is None:
+                frame_hash = await loop.run_in_executor(None, self._frame_hash, frame)
+            cached_result = await self.redis_manager.get_cached_inference(frame_hash)
+
+        if cached_result and time.time() - cached_result.get('timestamp', 0) < 30:
+            detections = self._rows_to_detections(cached_result.get('detections', []))
+            self.inference_cache_hits += 1
+        else:
+            detections = await loop.run_in_executor(None, vm_inference_func, frame)
+            self.inference_cache_misses += 1
+            if use_cache:
+                self._spawn(self.redis_manager.cache_inference_result(frame_hash, {
+                    'timestamp': time.time(),
+                    'detections': [list(detection) for detection in detections],
+                    'device_id': self.device_id
+                }))
+
+        self._coordinate(detections)
+        return detections
+
+    def _coordinate(self, detections: List[Any]):
+        weapon_detections = [d for d in detections if d.is_weapon and d.confidence >= 0.4]
+        if weapon_detections:
+            self._publish_detection_event(weapon_detections, detections)
+            self.last_coordination = self._analyze_coordinated_response()
+        else:
+            self.last_coordination = None
+
+    def _rows_to_detections(self, rows: List[Any]) -> List[Any]:
+        if self.detection_type is None:
+            return rows
+        return [self.detection_type.from_row(row) for row in rows]
+
+    def _publish_detection_event(self, weapon_detections: List[Any], all_detections: List[Any]):
+        """Coalesced like the threaded handler; the write itself is a background task"""
+        max_confidence = max(det.confidence for det in weapon_detections)
+        objects = frozenset(det.label for det in weapon_detections)
+        now = time.time()
+
+        reason = self.coalescer.observe(objects, max_confidence, now)
+        if reason is None:
+            return
+
+        self.coalescer.in_flight = True
+        self._spawn(self._publish_event(objects, max_confidence, now, reason, detection_event_data(
+            objects, max_confidence, weapon_detections, all_detections, self.device_config, reason,
+            self.coalescer.suppressed_since_emit)))
+
+    async def _publish_event(self, objects: frozenset, max_confidence: float, now: float, reason: str,
+                             detection_event: Dict[str, Any]):
+        """State only advances once the event is out - a failed publish retries on a later frame"""
+        try:
+            if await self.redis_manager.publish_detection(detection_event):
+                self.coalescer.published(objects, max_confidence, now, reason)
+        finally:
+            self.coalescer.in_flight = False
+
+    def _analyze_coordinated_response(self) -> Dict[str, Any]:
+        current_time = time.time()
+        return coordination_analysis(1 + self._count_active_remote(current_time), current_time)
+
+    def active_remote_count(self) -> int:
+        return self._count_active_remote(time.time())
+
+    def get_coordination_status(self) -> Dict[str, Any]:
+        total_requests = self.inference_cache_hits + self.inference_cache_misses
+        return {
+            'device_id': self.device_id,
+            'redis_connected': self.redis_connected,
+            'active_remote_detections': len(self.remote_detections),
+            'remote_devices': self.remote_detections.devices(),
+            'nearby_devices': len(self.nearby_devices) if self.nearby_devices is not None else None,
+            'distant_devices': len(self.distant_devices) if self.distant_devices is not None else None,
+            'last_alarm': self.last_alarm,
+            'cache_performance': {
+                'hits': self.inference_cache_hits,
+                'misses': self.inference_cache_misses,
+                'hit_rate': (self.inference_cache_hits / total_requests * 100.0) if total_requests else 0.0
+            },
+            'last_heartbeat': self.last_redis_heartbeat,
+            'detection_events': self.coalescer.get_stats(),
+            'redis_latency_ms': self.redis_manager.get_latency_stats(),
+            'redis_connection': self.redis_manager.get_connection_stats(),
+            'pending_tasks': len(self._tasks)
+        }
+
+    async def cleanup(self):
+        """Stop background tasks, let in-flight writes finish, then close the connections"""
+        try:
+            if self._stop is not None:
+                self._stop.set()
+            if self._tasks:
+                await asyncio.wait(list(self._tasks), timeout=EVENT_BUS_CONFIG['block_ms'] / 1000.0 + 1.0)
+            for task in list(self._tasks):
+                task.cancel()
+            await self.redis_manager.cleanup()
+            logger.info(f"🧹 Async Redis detection handler cleanup completed for {self.device_id}")
+        except Exception as e:
+            logger.error(f"Async Redis detection handler cleanup error: {e}")
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Redis Load Benchmark for ARCIS System
+Spawns N simulated devices (full RedisDetectionHandler stacks: pools,
+supervisor, stream subscriber) against a local redis-server and measures
+ops/s and latency for heartbeat, inference cache set/get, detection publish,
+subscriber fan-out and get_all_devices. The JSON report can be compared
+against a previous run for regression tracking.
+
+Usage: python3 benchmark_redis_load.py [devices] [seconds_per_phase] [report.json] [baseline.json]
+       ARCIS_BENCH_REDIS_HOST / ARCIS_BENCH_REDIS_PORT / ARCIS_BENCH_REDIS_DB select the server
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import platform
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis
+
+from redis_system import redis_config
+from redis_system.redis_config import REDIS_CONFIG, LOCAL_REDIS_CONFIG, EVENT_BUS_CONFIG
+from redis_system.serialization import SERIALIZATION_CONFIG
+from redis_system.redis_detection_handler import RedisDetectionHandler
+
+BENCH_CONFIG = {
+    'host': os.environ.get('ARCIS_BENCH_REDIS_HOST', '127.0.0.1'),
+    'port': int(os.environ.get('ARCIS_BENCH_REDIS_PORT', '6379')),
+    'db': int(os.environ.get('ARCIS_BENCH_REDIS_DB', '15')),  # keep benchmark keys out of db 0
+    'publish_rate': 5.0,          # detection events per device per second (fan-out is N x N)
+    'cache_keys': 256,            # frame hashes per device for the cache-get phase
+    'settle_seconds': 2.0,        # wait for subscribers to drain after publishing
+    'regression_threshold': 0.10  # 10% worse ops/s or p95 than the baseline
+}
+
+class SimulatedDevice(RedisDetectionHandler):
+    """Detection handler that also timestamps remote events on arrival"""
+
+    def __init__(self, device_id: str):
+        self.delivery_ms = []
+        self.delivery_lock = threading.Lock()
+        super().__init__(device_id, {'device_name': device_id, 'device_type': 'benchmark'})
+
+    def _detection_subscriber(self):
+        """The handler's own subscriber, with each delivery timestamped before the real callback runs"""
+        subscribe = self.redis_manager.subscribe_to_detections
+
+        def timed_subscribe(callback_func):
+            def timed_callback(event_data):
+                received = time.time()
+                with self.delivery_lock:
+                    self.delivery_ms.append((received - event_data.get('timestamp', received)) * 1000.0)
+                callback_func(event_data)
+            return subscribe(timed_callback)
+
+        self.redis_manager.subscribe_to_detections = timed_subscribe
+        super()._detection_subscriber()
+
+    def drain_deliveries(self):
+        with self.delivery_lock:
+            samples, self.delivery_ms = self.delivery_ms, []
+        return samples
+
+
+def point_at_benchmark_server():
+    """Both tiers go to the benchmark server - never the production coordinator"""
+    for config in (REDIS_CONFIG, LOCAL_REDIS_CONFIG):
+        config.update(host=BENCH_CONFIG['host'], port=BENCH_CONFIG['port'], db=BENCH_CONFIG['db'])
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else None
+
+
+def summarize(latencies_ms, elapsed, errors=0):
+    ordered = sorted(latencies_ms)
+    return {
+        'ops': len(ordered),
+        'errors': errors,
+        'ops_per_sec': len(ordered) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(ordered, 0.50),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'max_ms': ordered[-1] if ordered else None
+    }
+
+
+def sample_result(device_id):
+    return {
+        'timestamp': time.time(),
+        'detections': [['pistol', random.uniform(0.5, 0.95), [80, 120, 220, 330], 'vm_google_vision']],
+        'device_id': device_id
+    }
+
+
+def sample_event(device_id):
+    confidence = random.uniform(0.5, 0.95)
+    return {
+        'objects': ['pistol'],
+        'max_confidence': confidence,
+        'detection_count': 1,
+        'all_detections': [{'class': 'pistol', 'confidence': confidence, 'box': [80, 120, 220, 330]}],
+        'coordinates': f"Benchmark Site {device_id[-1]}"
+    }
+
+
+def frame_hashes(device_id, count):
+    return [hashlib.md5(f"{device_id}:{i}".encode()).hexdigest() for i in range(count)]
+
+
+def run_phase(devices, name, operation, seconds, rate=None):
+    """One thread per device calls operation(device) for `seconds` (closed loop, or paced at `rate`/s)"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    start_gate = threading.Barrier(len(devices) + 1)
+
+    def worker(device):
+        local, failed = [], 0
+        interval = 1.0 / rate if rate else 0.0
+        start_gate.wait()
+        deadline = time.perf_counter() + seconds
+        next_call = time.perf_counter() + random.uniform(0, interval)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if interval and now < next_call:
+                time.sleep(min(next_call - now, deadline - now))
+                continue
+            started = time.perf_counter()
+            try:
+                if operation(device):
+                    local.append((time.perf_counter() - started) * 1000.0)
+                else:
+                    failed += 1
+            except Exception:
+                failed += 1
+            next_call += interval
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(device,), daemon=True, name=f"Bench{name}-{device.device_id}")
+               for device in devices]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, errors[0])
+
+
+def run_load_test(device_count=50, seconds=10.0):
+    point_at_benchmark_server()
+    probe = redis.Redis(**REDIS_CONFIG)
+    server = probe.info('server')
+
+    print(f"🧪 ARCIS Redis load benchmark - {device_count} devices, {seconds:.0f}s per phase")
+    print(f"   redis-server {server.get('redis_version')} at {BENCH_CONFIG['host']}:{BENCH_CONFIG['port']} "
+          f"db {BENCH_CONFIG['db']} | event bus: {EVENT_BUS_CONFIG['mode']}")
+
+    devices = [SimulatedDevice(f"bench{i:03d}") for i in range(device_count)]
+    try:
+        deadline = time.time() + 10.0
+        while time.time() < deadline and not all(device.redis_connected for device in devices):
+            time.sleep(0.1)
+        time.sleep(BENCH_CONFIG['settle_seconds'])  # stream groups created, first heartbeats sent
+
+        hashes = {device.device_id: frame_hashes(device.device_id, BENCH_CONFIG['cache_keys'])
+                  for device in devices}
+
+        results = {}
+        results['heartbeat'] = run_phase(devices, 'Heartbeat', lambda d: d.redis_manager.update_device_status(
+            {'status': 'active', 'cpu_usage': random.uniform(10, 90)}), seconds)
+        results['cache_set'] = run_phase(devices, 'CacheSet', lambda d: d.redis_manager.cache_inference_result(
+            random.choice(hashes[d.device_id]), sample_result(d.device_id)), seconds)
+        # Every hash cached in the current TTL slice, so misses in the get phase are real errors
+        for device in devices:
+            for frame_hash in hashes[device.device_id]:
+                device.redis_manager.cache_inference_result(frame_hash, sample_result(device.device_id))
+        results['cache_get'] = run_phase(devices, 'CacheGet', lambda d: d.redis_manager.get_cached_inference(
+            random.choice(hashes[d.device_id])) is not None, seconds)
+
+        for device in devices:
+            device.drain_deliveries()
+        stream_before = sum(device.redis_manager.stream_events_consumed for device in devices)
+        results['publish'] = run_phase(devices, 'Publish', lambda d: d.redis_manager.publish_detection(
+            sample_event(d.device_id)), seconds, rate=BENCH_CONFIG['publish_rate'])
+        time.sleep(BENCH_CONFIG['settle_seconds'])
+
+        deliveries = [sample for device in devices for sample in device.drain_deliveries()]
+        expected = results['publish']['ops'] * (device_count - 1)
+        fanout = summarize(deliveries, seconds + BENCH_CONFIG['settle_seconds'])
+        fanout['expected'] = expected
+        fanout['delivery_ratio'] = len(deliveries) / expected if expected else None
+        fanout['stream_entries_read'] = sum(device.redis_manager.stream_events_consumed
+                                            for device in devices) - stream_before
+        results['fanout'] = fanout
+
+        results['get_all_devices'] = run_phase(devices, 'ListDevices',
+                                               lambda d: len(d.redis_manager.get_all_devices()) > 0, seconds)
+
+        memory = probe.info('memory')
+        report = {
+            'meta': {
+                'timestamp': time.time(),
+                'devices': device_count,
+                'seconds_per_phase': seconds,
+                'publish_rate': BENCH_CONFIG['publish_rate'],
+                'redis_version': server.get('redis_version'),
+                'event_bus': EVENT_BUS_CONFIG['mode'],
+                'device_events_serializer': SERIALIZATION_CONFIG['device_events'],
+                'redis_tier': redis_config.REDIS_TIER,
+                'python': platform.python_version(),
+                'host': platform.node(),
+                'used_memory_bytes': memory.get('used_memory')
+            },
+            'results': results
+        }
+        print_report(report)
+        return report
+
+    finally:
+        for device in devices:
+            device.cleanup()
+        probe.close()
+
+
+def print_report(report):
+    print("=" * 78)
+    print(f"{'operation':<18}{'ops':>9}{'ops/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'err':>6}")
+    print("-" * 78)
+    for name, stats in report['results'].items():
+        cells = [f"{stats[key]:>9.2f}" if stats[key] is not None else f"{'-':>9}"
+                 for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')]
+        print(f"{name:<18}{stats['ops']:>9}{stats['ops_per_sec']:>11.1f}{''.join(cells)}{stats['errors']:>6}")
+    fanout = report['results'].get('fanout', {})
+    if fanout.get('delivery_ratio') is not None:
+        print(f"📡 fan-out: {fanout['ops']}/{fanout['expected']} deliveries "
+              f"({fanout['delivery_ratio'] * 100:.1f}%) - latency is publish timestamp to callback")
+    print("=" * 78)
+
+
+def compare_reports(report, baseline):
+    """Print per-operation deltas; returns the operations that regressed"""
+    threshold = BENCH_CONFIG['regression_threshold']
+    regressions = []
+
+    print(f"\n📈 Against baseline from {time.ctime(baseline['meta']['timestamp'])} "
+          f"({baseline['meta']['devices']} devices)")
+    print(f"{'operation':<18}{'ops/s':>12}{'p95 ms':>12}")
+    for name, stats in report['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous:
+            continue
+        throughput = (stats['ops_per_sec'] / previous['ops_per_sec'] - 1) if previous['ops_per_sec'] else 0.0
+        tail = (stats['p95_ms'] / previous['p95_ms'] - 1) if previous['p95_ms'] and stats['p95_ms'] else 0.0
+        # Paced phases have a fixed rate - only the closed-loop ones measure throughput
+        regressed = tail > threshold or (name not in ('publish', 'fanout') and throughput < -threshold)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<18}{throughput * 100:>+11.1f}%{tail * 100:>+11.1f}%{'  ⚠️ regression' if regressed else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    report_path = sys.argv[3] if len(sys.argv) > 3 else 'arcis_redis_benchmark.json'
+    baseline_path = sys.argv[4] if len(sys.argv) > 4 else None
+
+    report = run_load_test(device_count, seconds)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report written to {report_path}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare_reports(report, json.load(f))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Serialization Micro-Benchmark for ARCIS System
+Compares json, orjson and msgpack on the payloads devices actually send:
+detection events, inference cache entries and upload form fields
+"""
+
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.serialization import (
+    JsonSerializer, OrjsonSerializer, MsgpackSerializer, ORJSON_AVAILABLE, MSGPACK_AVAILABLE
+)
+from redis_system.compact_layout import pack_detection_rows, history_entry
+
+
+def sample_detections(count=5):
+    labels = ['pistol', 'knife', 'person', 'rifle', 'bag']
+    return [
+        {
+            'class': labels[i % len(labels)],
+            'confidence': 0.55 + i * 0.07,
+            'box': [80 + i * 10, 120 + i * 5, 220 + i * 10, 330 + i * 5],
+            'description': labels[i % len(labels)],
+            'source': 'vm_google_vision'
+        }
+        for i in range(count)
+    ]
+
+
+def sample_payloads():
+    """Representative payloads copied from the shapes used in the client and RedisManager"""
+    now = time.time()
+    detections = sample_detections()
+    return {
+        'detection_event': {
+            'device_id': 'jetson1',
+            'timestamp': now,
+            'detection_id': f"jetson1_{int(now)}",
+            'objects': ['pistol', 'knife'],
+            'max_confidence': 0.83,
+            'detection_count': 2,
+            'all_detections': detections,
+            'coordinates': 'Security Checkpoint Delta',
+            'device_type': 'jetson_nano'
+        },
+        'inference_cache': {
+            'timestamp': now,
+            'device_id': 'jetson1',
+            'result': {
+                'timestamp': now,
+                'detections': [[d['class'], d['confidence'], d['box'], d['source']] for d in detections],
+                'device_id': 'jetson1'
+            }
+        },
+        'system_metrics': {
+            'device_type': 'jetson_nano',
+            'device_id': 'jetson1',
+            'device_name': 'jetson',
+            'cpu_usage': 43.2,
+            'memory_usage': 61.5,
+            'temperature': 58.1,
+            'voltage': 5.08,
+            'network_strength': 84.3,
+            'under_voltage': False,
+            'sampled_at': now
+        },
+        'upload_metadata': {
+            'device_id': 'jetson1',
+            'device_name': 'jetson',
+            'device_type': 'jetson_nano',
+            'device_model': 'Jetson Nano',
+            'location': 'Security Checkpoint Delta',
+            'upload_method': 'simple_detection',
+            'image_format': 'full_resolution_jpeg',
+            'upload_reason': 'high_confidence_detection_70%+_coord_LOW',
+            'detected_objects': ['pistol']
+        }
+    }
+
+
+def available_serializers():
+    serializers = [JsonSerializer()]
+    if ORJSON_AVAILABLE:
+        serializers.append(OrjsonSerializer())
+    if MSGPACK_AVAILABLE:
+        serializers.append(MsgpackSerializer())
+    return serializers
+
+
+def bench(func, repeat=5, number=20000):
+    """Best-of-N microseconds per call"""
+    best = min(timeit.repeat(func, repeat=repeat, number=number))
+    return best / number * 1e6
+
+
+def run_benchmark(number=20000):
+    payloads = sample_payloads()
+    serializers = available_serializers()
+    results = []
+
+    print("🧪 ARCIS serialization benchmark")
+    print(f"   orjson: {'yes' if ORJSON_AVAILABLE else 'not installed'} | msgpack: {'yes' if MSGPACK_AVAILABLE else 'not installed'}")
+    print("=" * 72)
+    print(f"{'payload':<18}{'serializer':<10}{'dumps µs':>10}{'loads µs':>10}{'round µs':>10}{'bytes':>8}{'speedup':>9}")
+    print("-" * 72)
+
+    for payload_name, payload in payloads.items():
+        baseline = None
+        for serializer in serializers:
+            encoded = serializer.dumps(payload)
+            dumps_us = bench(lambda: serializer.dumps(payload), number=number)
+            loads_us = bench(lambda: serializer.loads(encoded), number=number)
+            round_us = dumps_us + loads_us
+            baseline = baseline or round_us
+            size = len(encoded.encode('utf-8') if isinstance(encoded, str) else encoded)
+
+            results.append({
+                'payload': payload_name,
+                'serializer': serializer.name,
+                'dumps_us': dumps_us,
+                'loads_us': loads_us,
+                'bytes': size
+            })
+            print(f"{payload_name:<18}{serializer.name:<10}{dumps_us:>10.2f}{loads_us:>10.2f}{round_us:>10.2f}{size:>8}{baseline / round_us:>8.1f}x")
+        print("-" * 72)
+
+    return results
+
+
+def compare_layouts():
+    """Stored value size: previous layout (full JSON) vs the compact one"""
+    payloads = sample_payloads()
+    serializer = available_serializers()[-1]
+    cache_result = payloads['inference_cache']['result']
+    event = payloads['detection_event']
+
+    def size(value):
+        return len(value.encode('utf-8') if isinstance(value, str) else value)
+
+    rows = [
+        ('inference_cache', size(JsonSerializer().dumps(payloads['inference_cache'])),
+         size(pack_detection_rows(cache_result['timestamp'], cache_result['detections']))),
+        ('detection_history', size(JsonSerializer().dumps(event)),
+         size(serializer.dumps(history_entry(event))))
+    ]
+
+    print(f"\n📦 Stored value size (compact layout, history via {serializer.name})")
+    print(f"{'value':<20}{'old bytes':>10}{'new bytes':>10}{'saved':>8}")
+    for name, old, new in rows:
+        print(f"{name:<20}{old:>10}{new:>10}{(1 - new / old) * 100:>7.0f}%")
+    return rows
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    run_benchmark(iterations)
+    compare_layouts()
@@ -0,0 +1,93 @@
+# Compact Redis Value Layout for ARCIS System
+#
+# Inference cache entries are binary-packed and grouped into small hashes
+# (time slice x hash prefix) sized for Redis' listpack encoding; detection
+# history keeps a short-key summary instead of the full event.
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+# Listpack limits for hashes (redis.conf defaults): 128 fields, 64-byte values.
+# 256 buckets per slice keeps a busy fleet around a dozen fields per bucket.
+# A packed entry is 7 bytes + (12 + label length) per detection, so a frame with
+# more than about three detections exceeds 64 bytes and Redis converts that
+# bucket to a hashtable - get_memory_report() shows the encodings actually in use.
+LISTPACK_VALUE_LIMIT = 64
+COMPACT_ENCODINGS = frozenset({'listpack', 'ziplist'})  # ziplist before Redis 7
+
+CACHE_LAYOUT = {
+    'bucket_chars': 2,    # leading hex chars of the frame hash that pick the bucket
+    'field_chars': 16     # hex chars kept as the field name (64-bit hash - ample for a 30 s window)
+}
+
+# Source strings are stored as a one-byte code; unknown sources fall back to 0 ('')
+SOURCES = ('', 'vm_google_vision', 'google_vision_sdk', 'google_vision', 'local')
+_SOURCE_CODES = {source: code for code, source in enumerate(SOURCES)}
+
+_HEADER = struct.Struct('<IHB')     # timestamp seconds, milliseconds, detection count
+_DETECTION = struct.Struct('<BHHHHHB')  # label length, confidence*10000, x1, y1, x2, y2, source code
+
+# Short history field names -> the event keys they stand for
+HISTORY_FIELDS = {
+    'id': 'detection_id',
+    't': 'timestamp',
+    'o': 'objects',
+    'c': 'max_confidence',
+    'n': 'detection_count',
+    's': 'coordinates'
+}
+
+
+def cache_slot(frame_hash: str, timestamp: float, ttl: int) -> Tuple[int, str, str]:
+    """(time slice, bucket, field) for a frame hash - a slice spans one TTL"""
+    bucket_chars = CACHE_LAYOUT['bucket_chars']
+    field = frame_hash[bucket_chars:bucket_chars + CACHE_LAYOUT['field_chars']]
+    return int(timestamp // ttl), frame_hash[:bucket_chars], field
+
+
+def _clamp_u16(value: Any) -> int:
+    return max(0, min(65535, int(value)))
+
+
+def pack_detection_rows(timestamp: float, rows: List[Any]) -> bytes:
+    """Pack [label, confidence, box, source] rows into a few bytes per detection"""
+    seconds = int(timestamp)
+    parts = [_HEADER.pack(seconds, int((timestamp - seconds) * 1000), min(len(rows), 255))]
+    for row in rows[:255]:
+        label, confidence, box, *rest = row
+        label_bytes = str(label).encode('utf-8')[:255]
+        source = _SOURCE_CODES.get(rest[0] if rest else '', 0)
+        x1, y1, x2, y2 = (list(box) + [0, 0, 0, 0])[:4]
+        parts.append(_DETECTION.pack(
+            len(label_bytes), _clamp_u16(round(float(confidence) * 10000)),
+            _clamp_u16(x1), _clamp_u16(y1), _clamp_u16(x2), _clamp_u16(y2), source
+        ))
+        parts.append(label_bytes)
+    return b''.join(parts)
+
+
+def unpack_detection_rows(data: bytes) -> Tuple[float, List[List[Any]]]:
+    """Inverse of pack_detection_rows -> (timestamp, rows)"""
+    seconds, millis, count = _HEADER.unpack_from(data, 0)
+    offset = _HEADER.size
+    rows = []
+    for _ in range(count):
+        label_len, confidence, x1, y1, x2, y2, source = _DETECTION.unpack_from(data, offset)
+        offset += _DETECTION.size
+        label = data[offset:offset + label_len].decode('utf-8')
+        offset += label_len
+        rows.append([label, confidence / 10000.0, [x1, y1, x2, y2],
+                     SOURCES[source] if source < len(SOURCES) else ''])
+    return seconds + millis / 1000.0, rows
+
+
+def history_entry(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Short-key summary kept in the per-device history list (no all_detections / device_id)"""
+    return {short: event[key] for short, key in HISTORY_FIELDS.items() if key in event}
+
+
+def expand_history_entry(entry: Dict[str, Any], device_id: Optional[str] = None) -> Dict[str, Any]:
+    """History summary back to the event key names"""
+    expanded = {HISTORY_FIELDS.get(key, key): value for key, value in entry.items()}
+    if device_id is not None:
+        expanded['device_id'] = device_id
+    return expanded
@@ -0,0 +1,108 @@
+# Expiry-Ordered Coordination Window for ARCIS System
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CoordinationWindow:
+    """Latest remote detection per device, expired incrementally
+
+    Two min-heaps hold (expires_at, seq, device_id): one for the coordination
+    window (counted devices) and one for retention (kept records). A device
+    that reports again gets a new seq; its older heap entries are skipped when
+    they surface (lazy deletion). Updates and expiry are O(log n) amortized,
+    the active-device count is O(1).
+    """
+
+    def __init__(self, active_window: float = 30.0, retention: float = 60.0):
+        self.active_window = active_window
+        self.retention = retention
+
+        self.entries: Dict[str, Dict[str, Any]] = {}  # device_id -> latest record
+        self.active = set()                            # devices inside active_window
+
+        self._current_seq: Dict[str, int] = {}
+        self._active_heap: List[Tuple[float, int, str]] = []
+        self._retention_heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+
+    def update(self, device_id: str, record: Dict[str, Any]):
+        """Store a device's latest detection (record must carry 'timestamp')"""
+        timestamp = record['timestamp']
+        seq = next(self._seq)
+
+        self.entries[device_id] = record
+        self._current_seq[device_id] = seq
+        self.active.add(device_id)
+
+        heapq.heappush(self._active_heap, (timestamp + self.active_window, seq, device_id))
+        heapq.heappush(self._retention_heap, (timestamp + self.retention, seq, device_id))
+
+    def expire(self, now: float) -> List[str]:
+        """Drop everything past its deadline; returns devices removed from retention"""
+        active_heap = self._active_heap
+        while active_heap and active_heap[0][0] < now:
+            _, seq, device_id = heapq.heappop(active_heap)
+            if self._current_seq.get(device_id) == seq:
+                self.active.discard(device_id)
+
+        removed = []
+        retention_heap = self._retention_heap
+        while retention_heap and retention_heap[0][0] < now:
+            _, seq, device_id = heapq.heappop(retention_heap)
+            if self._current_seq.get(device_id) == seq:
+                del self.entries[device_id]
+                del self._current_seq[device_id]
+                self.active.discard(device_id)
+                removed.append(device_id)
+        return removed
+
+    def active_count(self, now: Optional[float] = None) -> int:
+        """Devices with a detection inside the coordination window"""
+        if now is not None:
+            self.expire(now)
+        return len(self.active)
+
+    def active_count_within(self, devices, now: Optional[float] = None) -> int:
+        """Active devices that are also in `devices` (e.g. the geo neighbours) - O(smaller set)"""
+        if now is not None:
+            self.expire(now)
+        if len(devices) < len(self.active):
+            return sum(1 for device_id in devices if device_id in self.active)
+        return sum(1 for device_id in self.active if device_id in devices)
+
+    def active_count_excluding(self, devices, now: Optional[float] = None) -> int:
+        """Active devices that are not in `devices` (e.g. those known to be out of range)"""
+        if not devices:
+            return self.active_count(now)
+        return self.active_count(now) - self.active_count_within(devices)
+
+    def active_devices(self, now: Optional[float] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """(device_id, record) for every counted device - O(active), for on-demand detail"""
+        if now is not None:
+            self.expire(now)
+        return [(device_id, self.entries[device_id]) for device_id in self.active]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self.entries
+
+    def devices(self) -> List[str]:
+        return list(self.entries)
+
+
+def coordination_analysis(total_devices: int, now: float) -> Dict[str, Any]:
+    """Coordination level for this device plus the remote devices detecting with it"""
+    if total_devices >= 3:
+        level = 'HIGH'    # 3+ devices detecting
+    elif total_devices >= 2:
+        level = 'MEDIUM'  # 2 devices detecting
+    else:
+        level = 'LOW'     # Only this device
+    return {
+        'level': level,
+        'total_devices': total_devices,
+        'analysis_timestamp': now
+    }
@@ -0,0 +1,344 @@
+# Edge-to-Central Redis Replicator for ARCIS System
+#
+# In the edge tier (ARCIS_REDIS_TIER=edge) RedisManager talks to the Redis
+# server installed on the device by setup_redis.py, so detection caching and
+# coordination run at loopback latency and keep working while the uplink is
+# down. This replicator moves data between that local instance and the
+# central coordinator in the background:
+#
+#   outbound: this device's entries on the local detection stream -> central
+#             (XADD/PUBLISH + history + counter, one pipeline per batch), and
+#             the local device status hash -> central registry
+#   inbound:  other devices' entries on the central stream -> local stream,
+#             where the normal stream consumer picks them up
+#
+# The local stream is the replication log: a consumer group tracks what has
+# reached central, so a reconnect replays exactly the unacknowledged entries.
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import redis
+
+from redis_system.redis_config import (
+    REDIS_CONFIG, REDIS_KEYS, REDIS_INDEXES, CACHE_TTL, EVENT_BUS_CONFIG, SUPERVISOR_CONFIG,
+    DETECTION_HISTORY_LENGTH, detection_meta, queue_aggregate_writes, queue_location_writes
+)
+from redis_system.serialization import decode_event
+from redis_system.compact_layout import history_entry
+
+logger = logging.getLogger(__name__)
+
+REPLICATION_CONFIG = {
+    'batch_size': 200,          # stream entries per pipeline
+    'block_ms': 1000,           # XREAD/XREADGROUP wait for new entries
+    'status_interval': 10.0,    # seconds between device status pushes
+    'group': 'arcis:replicator'
+}
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _entry_ms(entry_id: Any) -> int:
+    return int(_text(entry_id).split('-', 1)[0])
+
+
+class EdgeReplicator:
+    """Batched, resumable replication between the edge Redis and the central coordinator"""
+
+    def __init__(self, manager):
+        self.manager = manager            # RedisManager connected to the local instance
+        self.device_id = manager.device_id
+        self.stream_key = manager.stream_key
+        self.inbound_cursor_key = f"arcis:edge:{self.device_id}:central_last_id"
+
+        self.central_client = None        # decoded replies - status and fleet reads
+        self.central_event_client = None  # undecoded replies, like the local event client
+        self.central_connected = False
+        self.connect_attempts = 0
+        self.lock = threading.Lock()
+
+        self.running = False
+        self.threads = []
+
+        # Stats
+        self.replicated_events = 0
+        self.inbound_events = 0
+        self.batches = 0
+        self.status_pushes = 0
+        self.reconnects = 0
+        self.last_lag_ms = None
+        self.max_lag_ms = 0.0
+        self.last_replicated_id = None
+        self.last_inbound_id = None
+
+    # ---- central connection -------------------------------------------------
+
+    def _connect_central(self) -> bool:
+        with self.lock:
+            if self.central_connected:
+                return True
+            try:
+                if self.central_client is None:
+                    self.central_client = redis.Redis(connection_pool=redis.ConnectionPool(**REDIS_CONFIG))
+                    # Undecoded like the local event client - payloads may be JSON or msgpack
+                    self.central_event_client = redis.Redis(connection_pool=redis.ConnectionPool(
+                        **{**REDIS_CONFIG, 'decode_responses': False}
+                    ))
+                self.central_client.ping()
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                self.connect_attempts += 1
+                if self.connect_attempts == 1:
+                    logger.warning(f"⚠️ Central Redis unreachable ({e}) - replicating when it returns")
+                return False
+
+            if self.connect_attempts:
+                self.reconnects += 1
+            self.connect_attempts = 0
+            self.central_connected = True
+            logger.info("🔗 Edge replicator connected to central Redis")
+
+        # Reconcile: the registry entry first, streams resume from their own cursors
+        self._push_status()
+        return True
+
+    def _central_lost(self, error: Exception):
+        with self.lock:
+            if self.central_connected:
+                logger.warning(f"⚠️ Central Redis lost ({error}) - buffering in local Redis")
+            self.central_connected = False
+
+    def _wait_for_central(self) -> bool:
+        """Connect with full-jitter backoff; False only when stopping"""
+        while self.running:
+            if self.central_connected or self._connect_central():
+                return True
+            cap = min(SUPERVISOR_CONFIG['backoff_max'],
+                      SUPERVISOR_CONFIG['backoff_base'] * (2 ** min(self.connect_attempts, 16)))
+            time.sleep(random.uniform(0, cap))
+        return False
+
+    # ---- lifecycle ------------------------------------------------------------
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for name, target in (('Out', self._outbound_worker), ('In', self._inbound_worker)):
+            thread = threading.Thread(target=target, daemon=True, name=f"EdgeReplicator{name}-{self.device_id}")
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"🔁 Edge replication started for {self.device_id}")
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout=REPLICATION_CONFIG['block_ms'] / 1000.0 + 1.0)
+        self.threads = []
+        if self.central_event_client is not None:
+            self.central_event_client.close()
+        if self.central_client is not None:
+            self.central_client.close()
+        self.central_connected = False
+
+    # ---- outbound -------------------------------------------------------------
+
+    def _ensure_outbound_group(self):
+        try:
+            # '0' - everything already in the local log still needs to reach central
+            self.manager.event_client.xgroup_create(
+                self.stream_key, REPLICATION_CONFIG['group'], id='0', mkstream=True
+            )
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _outbound_worker(self):
+        last_status_push = 0.0
+        while self.running:
+            if not self.manager.connected:
+                time.sleep(1.0)
+                continue
+            if not self._wait_for_central():
+                break
+            try:
+                self._ensure_outbound_group()
+                read_id = '0'  # unacknowledged batches from before the last disconnect
+                while self.running and self.central_connected and self.manager.connected:
+                    response = self.manager.event_client.xreadgroup(
+                        REPLICATION_CONFIG['group'], self.device_id, {self.stream_key: read_id},
+                        count=REPLICATION_CONFIG['batch_size'], block=REPLICATION_CONFIG['block_ms']
+                    )
+                    entries = response[0][1] if response else []
+                    if entries:
+                        self._replicate_batch(entries)
+                    elif read_id == '0':
+                        read_id = '>'
+
+                    if time.time() - last_status_push >= REPLICATION_CONFIG['status_interval']:
+                        self._push_status()
+                        last_status_push = time.time()
+
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                # Either side may have failed - a local outage is handled by the manager's
+                # supervisor, the central one is re-checked by _wait_for_central
+                self._central_lost(e)
+            except Exception as e:
+                logger.error(f"Edge replication error: {e}")
+                time.sleep(1.0)
+
+    def _replicate_batch(self, entries):
+        """Own entries go to central in one pipeline; the local ack follows the central write"""
+        use_stream = EVENT_BUS_CONFIG['mode'] == 'streams'
+        use_pubsub = EVENT_BUS_CONFIG['legacy_publish'] or not use_stream
+        channel = f"{REDIS_KEYS['detections']}events"
+        history_key = f"{REDIS_KEYS['detections']}{self.device_id}:history"
+
+        pipe = self.central_event_client.pipeline(transaction=False)
+        own = 0
+        for _, fields in entries:
+            # Inbound copies of other devices' events live in the same local stream - never echo them
+            if _text(fields.get('device_id', fields.get(b'device_id'))) != self.device_id:
+                continue
+            payload = fields.get('data', fields.get(b'data'))
+            if use_stream:
+                pipe.xadd(self.stream_key, {'device_id': self.device_id, 'data': payload},
+                          maxlen=EVENT_BUS_CONFIG['stream_maxlen'], approximate=True)
+            if use_pubsub:
+                pipe.publish(channel, payload)
+            event = decode_event(payload)
+            pipe.lpush(history_key, self.manager.event_serializer.dumps(history_entry(event)))
+            queue_aggregate_writes(pipe, self.device_id, detection_meta(event))
+            own += 1
+        if own:
+            pipe.ltrim(history_key, 0, DETECTION_HISTORY_LENGTH - 1)
+            pipe.expire(history_key, CACHE_TTL['detection_event'])
+            pipe.hincrby(REDIS_INDEXES['detection_counts'], self.device_id, own)
+            pipe.execute()
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        self.manager.event_client.xack(self.stream_key, REPLICATION_CONFIG['group'], *entry_ids)
+
+        # Lag = time from the local write (entry ID) to the central write, worst entry in the batch
+        lag_ms = time.time() * 1000 - _entry_ms(entry_ids[0])
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.last_replicated_id = _text(entry_ids[-1])
+        self.replicated_events += own
+        self.batches += 1
+
+    def _push_status(self):
+        """Copy the local device hash to the central registry (HSET + EXPIRE + ZADD, one transaction)
+
+        A GPS fix in the hash is also added to the central geo index.
+        """
+        try:
+            device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
+            status = self.manager.redis_client.hgetall(device_key)
+            if not status:
+                return
+            pipe = self.central_client.pipeline(transaction=True)
+            pipe.hset(device_key, mapping=status)
+            pipe.expire(device_key, CACHE_TTL['device_status'])
+            pipe.zadd(REDIS_INDEXES['devices'], {self.device_id: float(status.get('last_seen', time.time()))})
+            if 'latitude' in status and 'longitude' in status:
+                queue_location_writes(pipe, self.device_id, float(status['latitude']), float(status['longitude']),
+                                      float(status.get('fix_time', time.time())))
+            pipe.execute()
+            self.status_pushes += 1
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._central_lost(e)
+        except Exception as e:
+            logger.error(f"Device status replication error: {e}")
+
+    # ---- inbound --------------------------------------------------------------
+
+    def _inbound_worker(self):
+        while self.running:
+            if not self.manager.connected:
+                time.sleep(1.0)
+                continue
+            if not self._wait_for_central():
+                break
+            try:
+                cursor = self._inbound_cursor()
+                while self.running and self.central_connected and self.manager.connected:
+                    response = self.central_event_client.xread(
+                        {self.stream_key: cursor},
+                        count=REPLICATION_CONFIG['batch_size'], block=REPLICATION_CONFIG['block_ms']
+                    )
+                    entries = response[0][1] if response else []
+                    if not entries:
+                        continue
+                    cursor = self._copy_inbound(entries)
+
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                self._central_lost(e)
+            except Exception as e:
+                logger.error(f"Edge inbound replication error: {e}")
+                time.sleep(1.0)
+
+    def _inbound_cursor(self) -> str:
+        """Last central entry copied; on first start the central stream's current last entry
+
+        Saved before anything is read, so events published while the uplink drops
+        right after the first connect are still replayed on the next one.
+        """
+        cursor = self.manager.redis_client.get(self.inbound_cursor_key)
+        if cursor is not None:
+            return _text(cursor)
+        latest = self.central_event_client.xrevrange(self.stream_key, count=1)
+        cursor = _text(latest[0][0]) if latest else '0-0'
+        # NX - a cursor written meanwhile (another worker, an earlier run) wins
+        if not self.manager.redis_client.set(self.inbound_cursor_key, cursor, nx=True):
+            cursor = _text(self.manager.redis_client.get(self.inbound_cursor_key)) or cursor
+        return cursor
+
+    def _copy_inbound(self, entries) -> str:
+        """Append other devices' central entries to the local stream and advance the cursor"""
+        pipe = self.manager.event_client.pipeline(transaction=True)
+        copied = 0
+        for _, fields in entries:
+            source = _text(fields.get('device_id', fields.get(b'device_id')))
+            if source == self.device_id:
+                continue
+            pipe.xadd(self.stream_key, {'device_id': source, 'data': fields.get('data', fields.get(b'data'))},
+                      maxlen=EVENT_BUS_CONFIG['stream_maxlen'], approximate=True)
+            copied += 1
+
+        cursor = _text(entries[-1][0])
+        pipe.set(self.inbound_cursor_key, cursor)
+        pipe.execute()
+
+        self.inbound_events += copied
+        self.last_inbound_id = cursor
+        return cursor
+
+    # ---- reporting --------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        backlog: Optional[int] = None
+        try:
+            for group in self.manager.event_client.xinfo_groups(self.stream_key):
+                if _text(group.get('name')) == REPLICATION_CONFIG['group']:
+                    backlog = group.get('lag')  # entries not yet read by the replicator (Redis 7+)
+                    break
+        except Exception:
+            pass
+        return {
+            'central_connected': self.central_connected,
+            'replicated_events': self.replicated_events,
+            'inbound_events': self.inbound_events,
+            'batches': self.batches,
+            'status_pushes': self.status_pushes,
+            'reconnects': self.reconnects,
+            'last_lag_ms': self.last_lag_ms,
+            'max_lag_ms': self.max_lag_ms,
+            'backlog': backlog,
+            'last_replicated_id': self.last_replicated_id,
+            'last_inbound_id': self.last_inbound_id
+        }
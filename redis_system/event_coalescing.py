@@ -0,0 +1,85 @@
+# Outgoing Detection Event Coalescing for ARCIS System
+from typing import Any, Dict, List, Optional
+
+# Detection event coalescing - peers get state changes, not every frame
+EVENT_COALESCING_CONFIG = {
+    'heartbeat_interval': 2.0,   # max rate (s) for re-publishing an unchanged ongoing detection
+    'confidence_delta': 0.15,    # max-confidence jump that counts as a state change
+    'incident_gap': 5.0          # seconds without weapons before the next one is a new incident
+}
+
+
+class EventCoalescer:
+    """Decides which weapon frames become detection events (shared by the sync and asyncio handlers)
+
+    observe() is called for every weapon frame; published() only once the event
+    actually reached Redis, so a failed publish is retried on the next frame.
+    Callers that publish in the background set in_flight while a publish is
+    pending - frames seen meanwhile are suppressed instead of re-emitted.
+    """
+
+    def __init__(self, config: Optional[Dict[str, float]] = None):
+        self.config = config if config is not None else EVENT_COALESCING_CONFIG
+        self.last_published = None  # (objects frozenset, max_confidence, publish time)
+        self.last_weapon_frame_time = 0.0
+        self.emitted = 0
+        self.suppressed = 0
+        self.suppressed_since_emit = 0
+        self.emit_reasons: Dict[str, int] = {}
+        self.in_flight = False
+
+    def reason(self, objects: frozenset, max_confidence: float, now: float) -> Optional[str]:
+        """Why this weapon frame should be published, or None to suppress it (no state change)"""
+        config = self.config
+        last = self.last_published
+
+        if last is None or now - self.last_weapon_frame_time > config['incident_gap']:
+            return 'new_incident'
+
+        last_objects, last_confidence, last_time = last
+        if not objects <= last_objects:
+            return 'new_classes'
+        if abs(max_confidence - last_confidence) >= config['confidence_delta']:
+            return 'confidence_jump'
+        if now - last_time >= config['heartbeat_interval']:
+            return 'heartbeat'
+        return None
+
+    def observe(self, objects: frozenset, max_confidence: float, now: float) -> Optional[str]:
+        """reason() for a weapon frame, counting it as suppressed when there is none"""
+        reason = None if self.in_flight else self.reason(objects, max_confidence, now)
+        self.last_weapon_frame_time = now
+        if reason is None:
+            self.suppressed += 1
+            self.suppressed_since_emit += 1
+        return reason
+
+    def published(self, objects: frozenset, max_confidence: float, now: float, reason: str):
+        """Advance the state after a successful publish"""
+        self.last_published = (objects, max_confidence, now)
+        self.emitted += 1
+        self.suppressed_since_emit = 0
+        self.emit_reasons[reason] = self.emit_reasons.get(reason, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'emitted': self.emitted,
+            'suppressed': self.suppressed,
+            'emit_reasons': dict(self.emit_reasons)
+        }
+
+
+def detection_event_data(objects: frozenset, max_confidence: float, weapon_detections: List[Any],
+                         all_detections: List[Any], device_config: Dict[str, Any], reason: str,
+                         coalesced_frames: int) -> Dict[str, Any]:
+    """Event body handed to publish_detection (device_id/timestamp/detection_id are added there)"""
+    return {
+        'objects': list(objects),
+        'max_confidence': max_confidence,
+        'detection_count': len(weapon_detections),
+        'all_detections': [det.to_dict() for det in all_detections],
+        'coordinates': device_config.get('location', 'Unknown'),
+        'device_type': device_config.get('device_type', 'unknown'),
+        'emit_reason': reason,
+        'coalesced_frames': coalesced_frames
+    }
@@ -1,9 +1,16 @@
 # Redis Configuration for ARCIS Weapon Detection System
+import os
 import redis
-import json
 import time
+import random
 import logging
+import threading
+from collections import deque
 from typing import Dict, List, Optional, Any
+from redis_system.serialization import SERIALIZATION_CONFIG, get_serializer, decode_event
+from redis_system.compact_layout import (
+    COMPACT_ENCODINGS, cache_slot, pack_detection_rows, unpack_detection_rows, history_entry, expand_history_entry
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +26,18 @@ REDIS_CONFIG = {
     'health_check_interval': 30
 }
 
+# Deployment tier: 'central' = every call goes to REDIS_CONFIG['host'];
+# 'edge' = hot path on the device's own Redis (installed by setup_redis.py),
+# replicated to the central instance in the background (see edge_replicator.py)
+REDIS_TIER = os.environ.get('ARCIS_REDIS_TIER', 'central')
+
+LOCAL_REDIS_CONFIG = {
+    **REDIS_CONFIG,
+    'host': os.environ.get('ARCIS_LOCAL_REDIS_HOST', '127.0.0.1'),
+    'socket_connect_timeout': 1,
+    'socket_timeout': 3
+}
+
 # Redis Key Prefixes
 REDIS_KEYS = {
     'detections': 'arcis:detections:',
@@ -29,6 +48,35 @@ REDIS_KEYS = {
     'system_stats': 'arcis:stats:'
 }
 
+# Maintained indexes - listing/stats never scan the keyspace
+REDIS_INDEXES = {
+    'devices': 'arcis:index:devices',            # sorted set: device_id -> last_seen
+    'detection_counts': 'arcis:stats:detections'  # hash: device_id -> detections published
+}
+
+# Detection event bus
+EVENT_BUS_CONFIG = {
+    # 'streams' = XADD/XREADGROUP with replay after reconnect, 'pubsub' = fire-and-forget PUBLISH
+    'mode': os.environ.get('ARCIS_EVENT_BUS', 'streams'),
+    # Keep PUBLISHing on the legacy channel while pub/sub-only devices are still deployed
+    'legacy_publish': os.environ.get('ARCIS_EVENT_PUBSUB', '1') == '1',
+    'stream_maxlen': 10000,  # approximate (MAXLEN ~) trim - bounded history
+    'batch_count': 64,       # entries per XREADGROUP call
+    'block_ms': 2000,        # must stay below REDIS_CONFIG['socket_timeout']
+    'reconnect_delay': 2.0
+}
+
+# Connection supervisor and write-behind buffer
+SUPERVISOR_CONFIG = {
+    'health_check_interval': 5.0,  # seconds between PINGs while connected
+    'backoff_base': 0.5,           # first reconnect delay (s), doubled per failed attempt
+    'backoff_max': 30.0,           # reconnect delay cap (s); actual delay is jittered in [0, cap]
+    'write_buffer_size': 500       # detection events held while disconnected (oldest dropped)
+}
+
+# Set ARCIS_REDIS_LEGACY_SCAN=1 while older devices that do not maintain the indexes are still online
+LEGACY_SCAN = os.environ.get('ARCIS_REDIS_LEGACY_SCAN', '0') == '1'
+
 # Cache TTL (Time To Live) settings
 CACHE_TTL = {
     'inference_result': 30,  # 30 seconds - cache VM inference results
@@ -38,6 +86,161 @@ CACHE_TTL = {
     'coordinates': 600       # 10 minutes - GPS coordinates
 }
 
+# Device positions (GPS fixes) - coordination only counts devices within the radius
+GEO_CONFIG = {
+    'radius_m': float(os.environ.get('ARCIS_COORDINATION_RADIUS_M', '500')),
+    'refresh_interval': 5.0,   # seconds between neighbour lookups
+    'max_neighbours': 256      # GEOSEARCH COUNT - nearest first
+}
+
+GEO_KEYS = {
+    'positions': f"{REDIS_KEYS['coordinates']}devices",  # geo set: device_id -> lon/lat
+    'fixes': f"{REDIS_KEYS['coordinates']}fixes"         # zset: device_id -> fix time (lazy expiry)
+}
+
+# Write-time fleet aggregates, read back by get_fleet_stats() in one pipeline
+STATS_CONFIG = {
+    'bucket_seconds': 60,      # detection counters / device HLLs per minute
+    'bucket_ttl': 2 * 3600,    # longest dashboard window that can be answered
+    'info_refresh': 60.0       # INFO memory is cached for this long
+}
+
+STATS_KEYS = {
+    'detections': f"{REDIS_KEYS['system_stats']}det:",        # + bucket -> INCR counter
+    'devices': f"{REDIS_KEYS['system_stats']}devs:",          # + bucket -> HLL of detecting devices
+    'sites': f"{REDIS_KEYS['system_stats']}sites",            # zset: site -> detection events
+    'site_objects': f"{REDIS_KEYS['system_stats']}site_objects"  # zset: 'site|label' -> detections
+}
+
+
+def stats_bucket(timestamp: float) -> int:
+    return int(timestamp // STATS_CONFIG['bucket_seconds'])
+
+
+def detection_meta(event: Dict[str, Any]):
+    """(timestamp, site, objects) used for the aggregates - site is the reporting location"""
+    site = str(event.get('coordinates') or 'unknown').replace('|', '/')
+    return event['timestamp'], site, [str(label) for label in event.get('objects', [])]
+
+
+def aggregate_script_args(meta):
+    """KEYS/ARGV tails for the aggregate section of PUBLISH_DETECTION_LUA"""
+    timestamp, site, objects = meta
+    bucket = stats_bucket(timestamp)
+    keys = [f"{STATS_KEYS['detections']}{bucket}", f"{STATS_KEYS['devices']}{bucket}",
+            STATS_KEYS['sites'], STATS_KEYS['site_objects']]
+    return keys, [STATS_CONFIG['bucket_ttl'], site, *objects]
+
+
+def queue_aggregate_writes(pipe, device_id: str, meta):
+    """Plain-command equivalent of the aggregate section of PUBLISH_DETECTION_LUA"""
+    timestamp, site, objects = meta
+    bucket = stats_bucket(timestamp)
+    counter_key = f"{STATS_KEYS['detections']}{bucket}"
+    devices_key = f"{STATS_KEYS['devices']}{bucket}"
+    pipe.incr(counter_key)
+    pipe.expire(counter_key, STATS_CONFIG['bucket_ttl'])
+    pipe.pfadd(devices_key, device_id)
+    pipe.expire(devices_key, STATS_CONFIG['bucket_ttl'])
+    pipe.zincrby(STATS_KEYS['sites'], 1, site)
+    for label in objects:
+        pipe.zincrby(STATS_KEYS['site_objects'], 1, f"{site}|{label}")
+
+
+def queue_location_writes(pipe, device_id: str, latitude: float, longitude: float, fix_time: float):
+    """GEOADD + fix time for a device - shared by RedisManager and the edge replicator"""
+    pipe.geoadd(GEO_KEYS['positions'], [longitude, latitude, device_id])
+    pipe.zadd(GEO_KEYS['fixes'], {device_id: fix_time})
+
+
+def queue_detection_writes(pipe, device_id: str, stream_key: str, channel: str, history_key: str,
+                           payload: Any, history_payload: Any, meta):
+    """Plain-command equivalent of PUBLISH_DETECTION_LUA (script fallback and write-buffer replay)"""
+    use_stream = EVENT_BUS_CONFIG['mode'] == 'streams'
+    if use_stream:
+        pipe.xadd(stream_key, {'device_id': device_id, 'data': payload},
+                  maxlen=EVENT_BUS_CONFIG['stream_maxlen'], approximate=True)
+    if EVENT_BUS_CONFIG['legacy_publish'] or not use_stream:
+        pipe.publish(channel, payload)
+    pipe.lpush(history_key, history_payload)
+    pipe.ltrim(history_key, 0, DETECTION_HISTORY_LENGTH - 1)
+    pipe.expire(history_key, CACHE_TTL['detection_event'])
+    pipe.hincrby(REDIS_INDEXES['detection_counts'], device_id, 1)
+    queue_aggregate_writes(pipe, device_id, meta)
+
+
+def latency_summary(samples_by_operation: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """count / p50 / p95 / max (ms) per operation from its recent samples"""
+    stats = {}
+    for operation, samples in samples_by_operation.items():
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        count = len(ordered)
+        stats[operation] = {
+            'count': count,
+            'p50_ms': ordered[count // 2],
+            'p95_ms': ordered[min(count - 1, int(count * 0.95))],
+            'max_ms': ordered[-1]
+        }
+    return stats
+
+
+def alarm_channel(device_id: str) -> str:
+    """Per-device alarm channel used for radius-targeted alarm fan-out"""
+    return f"{REDIS_KEYS['alarms']}device:{device_id}"
+
+
+# Detections kept per device history list
+DETECTION_HISTORY_LENGTH = 100
+
+# Per-operation latency samples kept for get_latency_stats()
+LATENCY_SAMPLE_SIZE = 200
+
+# XADD/PUBLISH + LPUSH + LTRIM + EXPIRE + counter in one server-side call (one round trip).
+# ARGV[2] is the full event (stream/channel), ARGV[8] the short history summary.
+# Registered once per connection and invoked by SHA; redis-py reloads it on NOSCRIPT.
+PUBLISH_DETECTION_LUA = """
+if tonumber(ARGV[6]) > 0 then
+    redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[6], '*', 'device_id', ARGV[5], 'data', ARGV[2])
+end
+if ARGV[7] == '1' then
+    redis.call('PUBLISH', ARGV[1], ARGV[2])
+end
+redis.call('LPUSH', KEYS[1], ARGV[8])
+redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[3]) - 1)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+redis.call('HINCRBY', KEYS[2], ARGV[5], 1)
+-- Fleet aggregates: KEYS[4..7] = minute counter, minute device HLL, site rollup, site/object rollup
+redis.call('INCR', KEYS[4])
+redis.call('EXPIRE', KEYS[4], tonumber(ARGV[9]))
+redis.call('PFADD', KEYS[5], ARGV[5])
+redis.call('EXPIRE', KEYS[5], tonumber(ARGV[9]))
+redis.call('ZINCRBY', KEYS[6], 1, ARGV[10])
+for i = 11, #ARGV do
+    redis.call('ZINCRBY', KEYS[7], 1, ARGV[10] .. '|' .. ARGV[i])
+end
+return 1
+"""
+
+# Neighbours within a radius, nearest first; positions older than the cutoff are dropped
+# from both keys as they are found. KEYS: positions, fixes. ARGV: lon, lat, radius_m, cutoff, count
+NEARBY_DEVICES_LUA = """
+local found = redis.call('GEOSEARCH', KEYS[1], 'FROMLONLAT', ARGV[1], ARGV[2],
+                         'BYRADIUS', ARGV[3], 'm', 'ASC', 'COUNT', ARGV[5], 'WITHDIST')
+local nearby = {}
+for _, item in ipairs(found) do
+    local fix_time = redis.call('ZSCORE', KEYS[2], item[1])
+    if fix_time and tonumber(fix_time) >= tonumber(ARGV[4]) then
+        nearby[#nearby + 1] = item
+    else
+        redis.call('ZREM', KEYS[1], item[1])
+        redis.call('ZREM', KEYS[2], item[1])
+    end
+end
+return nearby
+"""
+
 class RedisManager:
     """Redis connection and operation manager for ARCIS system"""
     
@@ -48,27 +251,113 @@ class RedisManager:
         self.connection_attempts = 0
         self.max_retries = 5
         
+        # Edge tier needs the stream as its replication log
+        self.tier = REDIS_TIER
+        if self.tier == 'edge' and EVENT_BUS_CONFIG['mode'] != 'streams':
+            logger.warning("⚠️ Edge Redis tier requires ARCIS_EVENT_BUS=streams - using the central tier")
+            self.tier = 'central'
+        self.replicator = None
+        
+        # Pools survive reconnects; clients are thin wrappers around them
+        self.pool = None
+        self.event_pool = None
+        self.raw_client = None  # undecoded replies for binary-packed cache values
+        
+        # Supervisor: health checks while connected, jittered backoff reconnects otherwise
+        self.connected_event = threading.Event()
+        self.supervisor_wake = threading.Event()
+        self.supervisor_running = False
+        self.supervisor_thread = None
+        self.reconnects = 0
+        self.disconnects = 0
+        
+        # Write-behind buffer - detection events and the latest status while disconnected
+        self.write_buffer = deque(maxlen=SUPERVISOR_CONFIG['write_buffer_size'])
+        self.pending_status = {}
+        self.buffer_lock = threading.Lock()
+        self.buffered_writes = 0
+        self.dropped_writes = 0
+        self.flushed_writes = 0
+        
+        # Latest GPS fix (lat, lon, fix_time) - rewritten after every reconnect
+        self.location = None
+        
+        # INFO memory is refreshed at most every STATS_CONFIG['info_refresh'] seconds
+        self.memory_info = None
+        self.memory_info_time = 0.0
+        
+        # Cache/state values use the default serializer; device events may use msgpack
+        self.serializer = get_serializer()
+        self.event_serializer = get_serializer(SERIALIZATION_CONFIG['device_events'])
+        self.event_client = None
+        
+        # Write path: Lua script when the server allows it, MULTI/EXEC pipeline otherwise
+        self.publish_script = None
+        self.nearby_devices_script = None
+        # Per script - only an error meaning scripting is unavailable turns one off
+        self.scripts_enabled = {'publish_detection': True, 'nearby_devices': True}
+        
+        # Stream consumer state - the group remembers the last delivered ID server-side
+        self.stream_key = f"{REDIS_KEYS['detections']}stream"
+        self.stream_group = f"arcis:bus:{device_id}"
+        self.subscriber_running = False
+        self.alarm_subscriber_running = False
+        self.stream_last_id = None
+        self.stream_events_consumed = 0
+        self.stream_last_event_ms = None
+        
+        # Round-trip latency per operation (ms)
+        self.latency_samples = {}
+        self.latency_lock = threading.Lock()
+        
     def connect(self) -> bool:
-        """Establish Redis connection with retry logic"""
+        """Establish Redis connection (the supervisor calls this again after failures)"""
         try:
-            self.redis_client = redis.Redis(**REDIS_CONFIG)
+            if self.pool is None:
+                config = LOCAL_REDIS_CONFIG if self.tier == 'edge' else REDIS_CONFIG
+                self.pool = redis.ConnectionPool(**config)
+                self.redis_client = redis.Redis(connection_pool=self.pool)
+                
+                # Events are always read undecoded - a peer may publish msgpack even when this
+                # device writes JSON, and decode_event() tells the two apart per payload
+                self.event_pool = redis.ConnectionPool(**{**config, 'decode_responses': False})
+                self.event_client = redis.Redis(connection_pool=self.event_pool)
+                # Binary-packed cache values share the undecoded connection
+                self.raw_client = self.event_client
+                
+                # No round trip here - the script is loaded on first EVALSHA miss
+                self.publish_script = self.event_client.register_script(PUBLISH_DETECTION_LUA)
+                self.nearby_devices_script = self.redis_client.register_script(NEARBY_DEVICES_LUA)
             
             # Test connection
             self.redis_client.ping()
+            
             self.connected = True
+            if self.connection_attempts or self.disconnects:
+                self.reconnects += 1
             self.connection_attempts = 0
             
             logger.info(f"✅ Redis connected successfully for {self.device_id}")
             self._register_device()
-            return True
+            if self.location is not None:
+                self._write_location()
+            self._flush_write_buffer()
+            if self.connected:
+                # Releases the subscriber thread to (re)subscribe
+                self.connected_event.set()
+            return self.connected
             
-        except redis.ConnectionError as e:
+        except (redis.ConnectionError, redis.TimeoutError) as e:
             self.connection_attempts += 1
             self.connected = False
-            logger.warning(f"❌ Redis connection failed (attempt {self.connection_attempts}): {e}")
             
-            if self.connection_attempts >= self.max_retries:
-                logger.error(f"🚫 Redis connection failed after {self.max_retries} attempts - operating without Redis")
+            if self.connection_attempts < self.max_retries:
+                logger.warning(f"❌ Redis connection failed (attempt {self.connection_attempts}): {e}")
+            elif self.connection_attempts == self.max_retries:
+                logger.error(f"🚫 Redis connection failed after {self.max_retries} attempts - "
+                             f"operating without Redis, retrying in background")
+            else:
+                logger.debug(f"Redis reconnect attempt {self.connection_attempts} failed: {e}")
             
             return False
             
@@ -77,6 +366,156 @@ class RedisManager:
             self.connected = False
             return False
     
+    def _mark_disconnected(self, error: Exception):
+        """Flag the connection as down and wake the supervisor to start reconnecting"""
+        if self.connected:
+            self.disconnects += 1
+            logger.warning(f"⚠️ Redis connection lost ({error}) - reconnecting in background")
+        self.connected = False
+        self.connected_event.clear()
+        self.supervisor_wake.set()
+    
+    def _handle_error(self, error: Exception, message: str):
+        """Connection errors flip to disconnected (logged once); anything else is logged as before"""
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._mark_disconnected(error)
+        else:
+            logger.error(f"{message}: {error}")
+    
+    def start_supervisor(self):
+        """Start the background health-check / reconnect loop"""
+        if self.supervisor_running:
+            return
+        self.supervisor_running = True
+        self.supervisor_thread = threading.Thread(
+            target=self._supervise, daemon=True, name=f"RedisSupervisor-{self.device_id}"
+        )
+        self.supervisor_thread.start()
+    
+    def start_replicator(self):
+        """Edge tier only: start forwarding local events/status to the central instance"""
+        if self.tier != 'edge' or self.replicator is not None:
+            return
+        from redis_system.edge_replicator import EdgeReplicator
+        self.replicator = EdgeReplicator(self)
+        self.replicator.start()
+    
+    def _fleet_client(self):
+        """Client for fleet-wide reads - central in the edge tier when reachable, else the main client"""
+        if self.replicator is not None and self.replicator.central_connected:
+            return self.replicator.central_client
+        return self.redis_client
+    
+    def _fleet_event_client(self):
+        """Undecoded counterpart of _fleet_client() - pub/sub that must reach other devices"""
+        if self.replicator is not None and self.replicator.central_connected:
+            return self.replicator.central_event_client
+        return self.event_client
+    
+    def _reconnect_delay(self) -> float:
+        """Full-jitter exponential backoff - devices that lost Redis together do not retry together"""
+        cap = min(SUPERVISOR_CONFIG['backoff_max'],
+                  SUPERVISOR_CONFIG['backoff_base'] * (2 ** min(self.connection_attempts, 16)))
+        return random.uniform(0, cap)
+    
+    def _supervise(self):
+        while self.supervisor_running:
+            if self.connected:
+                # Sleep until the next health check, or until an operation reports a failure
+                self.supervisor_wake.wait(SUPERVISOR_CONFIG['health_check_interval'])
+                self.supervisor_wake.clear()
+                if not self.supervisor_running or not self.connected:
+                    continue
+                try:
+                    started = time.perf_counter()
+                    self.redis_client.ping()
+                    self._record_latency('health_check', started)
+                except Exception as e:
+                    self._mark_disconnected(e)
+            else:
+                if self.connect():
+                    continue
+                self.supervisor_wake.wait(self._reconnect_delay())
+                self.supervisor_wake.clear()
+    
+    def _buffer_detection(self, channel: str, history_key: str, payload: Any, history_payload: Any, meta):
+        with self.buffer_lock:
+            if len(self.write_buffer) == self.write_buffer.maxlen:
+                self.dropped_writes += 1
+            self.write_buffer.append((channel, history_key, payload, history_payload, meta))
+            self.buffered_writes += 1
+    
+    def _flush_write_buffer(self):
+        """Replay buffered writes in one pipeline per connection after (re)connecting"""
+        with self.buffer_lock:
+            events = list(self.write_buffer)
+            self.write_buffer.clear()
+            status = self.pending_status
+            self.pending_status = {}
+        
+        if not events and not status:
+            return
+        
+        try:
+            started = time.perf_counter()
+            if events:
+                pipe = self.event_client.pipeline(transaction=False)
+                for channel, history_key, payload, history_payload, meta in events:
+                    self._queue_detection_writes(pipe, channel, history_key, payload, history_payload, meta)
+                pipe.execute()
+            if status:
+                self._write_device_hash(f"{REDIS_KEYS['device_status']}{self.device_id}", status)
+            self._record_latency('flush_write_buffer', started)
+            
+            self.flushed_writes += len(events)
+            logger.info(f"📤 Flushed {len(events)} buffered detection events to Redis")
+            
+        except Exception as e:
+            # Put everything back (at-least-once) - a partly applied pipeline may repeat events
+            with self.buffer_lock:
+                self.write_buffer.extendleft(reversed(events))
+                self.pending_status = {**status, **self.pending_status}
+            self._handle_error(e, "Failed to flush Redis write buffer")
+    
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Supervisor and write-behind counters"""
+        with self.buffer_lock:
+            buffered_now = len(self.write_buffer)
+        return {
+            'tier': self.tier,
+            'connected': self.connected,
+            'reconnects': self.reconnects,
+            'disconnects': self.disconnects,
+            'connection_attempts': self.connection_attempts,
+            'buffered_now': buffered_now,
+            'buffered_total': self.buffered_writes,
+            'dropped': self.dropped_writes,
+            'flushed': self.flushed_writes
+        }
+    
+    def _record_latency(self, operation: str, started: float):
+        """Store one round-trip sample for an operation"""
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self.latency_lock:
+            samples = self.latency_samples.get(operation)
+            if samples is None:
+                samples = self.latency_samples[operation] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+            samples.append(elapsed_ms)
+    
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-operation Redis latency (ms) over the recent sample window"""
+        with self.latency_lock:
+            snapshot = {op: list(samples) for op, samples in self.latency_samples.items()}
+        return latency_summary(snapshot)
+    
+    def _write_device_hash(self, device_key: str, mapping: Dict[str, Any]):
+        """HSET + EXPIRE + registry score as one MULTI/EXEC round trip"""
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.hset(device_key, mapping=mapping)
+        pipe.expire(device_key, CACHE_TTL['device_status'])
+        pipe.zadd(REDIS_INDEXES['devices'], {self.device_id: mapping['last_seen']})
+        pipe.execute()
+    
     def _register_device(self):
         """Register this device in Redis"""
         try:
@@ -85,22 +524,25 @@ class RedisManager:
                 'device_id': self.device_id,
                 'status': 'online',
                 'last_seen': time.time(),
-                'capabilities': ['weapon_detection', 'alarm_system']
+                # Hash fields must be flat strings
+                'capabilities': 'weapon_detection,alarm_system'
             }
             
-            self.redis_client.hset(device_key, mapping=device_info)
-            self.redis_client.expire(device_key, CACHE_TTL['device_status'])
+            started = time.perf_counter()
+            self._write_device_hash(device_key, device_info)
+            self._record_latency('register_device', started)
             
             logger.info(f"📝 Device {self.device_id} registered in Redis")
             
         except Exception as e:
-            logger.error(f"Failed to register device in Redis: {e}")
+            self._handle_error(e, "Failed to register device in Redis")
     
     def publish_detection(self, detection_data: Dict[str, Any]) -> bool:
-        """Publish weapon detection event to Redis"""
-        if not self.connected:
-            return False
-            
+        """Publish weapon detection event to Redis
+        
+        Returns True when the event was written, or queued in the write-behind
+        buffer because Redis is currently unreachable.
+        """
         try:
             # Create detection event
             event = {
@@ -110,15 +552,28 @@ class RedisManager:
                 **detection_data
             }
             
-            # Publish to detection channel
-            channel = f"{REDIS_KEYS['detections']}events"
-            self.redis_client.publish(channel, json.dumps(event))
+            # Serialize once - the full event goes to the stream/channel, a short summary to the history
+            payload = self.event_serializer.dumps(event)
+            history_payload = self.event_serializer.dumps(history_entry(event))
             
-            # Store in detection history
+            channel = f"{REDIS_KEYS['detections']}events"
             history_key = f"{REDIS_KEYS['detections']}{self.device_id}:history"
-            self.redis_client.lpush(history_key, json.dumps(event))
-            self.redis_client.ltrim(history_key, 0, 99)  # Keep last 100 detections
-            self.redis_client.expire(history_key, CACHE_TTL['detection_event'])
+            meta = detection_meta(event)
+            
+            if not self.connected:
+                self._buffer_detection(channel, history_key, payload, history_payload, meta)
+                logger.debug(f"📥 Buffered detection event while disconnected: {event['detection_id']}")
+                return True
+            
+            # Publish + history write in a single round trip
+            started = time.perf_counter()
+            try:
+                self._write_detection(channel, history_key, payload, history_payload, meta)
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                self._mark_disconnected(e)
+                self._buffer_detection(channel, history_key, payload, history_payload, meta)
+                return True
+            self._record_latency('publish_detection', started)
             
             logger.info(f"📡 Published detection event: {event['detection_id']}")
             return True
@@ -127,124 +582,566 @@ class RedisManager:
             logger.error(f"Failed to publish detection: {e}")
             return False
     
+    def _disable_script(self, name: str, error: Exception) -> bool:
+        """Turn off one script when the error means scripting is unavailable; False otherwise"""
+        if not scripting_unavailable(error):
+            return False
+        logger.warning(f"⚠️ Redis Lua scripting unavailable for {name} ({error}) - using plain commands")
+        self.scripts_enabled[name] = False
+        return True
+    
+    def _write_detection(self, channel: str, history_key: str, payload: Any, history_payload: Any, meta):
+        """Publish an event, append it to the device history and update the aggregates (one round trip)"""
+        use_stream = EVENT_BUS_CONFIG['mode'] == 'streams'
+        use_pubsub = EVENT_BUS_CONFIG['legacy_publish'] or not use_stream
+        
+        if self.scripts_enabled['publish_detection']:
+            try:
+                aggregate_keys, aggregate_args = aggregate_script_args(meta)
+                self.publish_script(
+                    keys=[history_key, REDIS_INDEXES['detection_counts'], self.stream_key, *aggregate_keys],
+                    args=[channel, payload, DETECTION_HISTORY_LENGTH, CACHE_TTL['detection_event'],
+                          self.device_id, EVENT_BUS_CONFIG['stream_maxlen'] if use_stream else 0,
+                          '1' if use_pubsub else '0', history_payload, *aggregate_args]
+                )
+                return
+            except redis.ResponseError as e:
+                # Scripting disabled/blocked on this server - stay on the pipeline path
+                if not self._disable_script('publish_detection', e):
+                    raise
+        
+        pipe = self.event_client.pipeline(transaction=True)
+        self._queue_detection_writes(pipe, channel, history_key, payload, history_payload, meta)
+        pipe.execute()
+    
+    def _queue_detection_writes(self, pipe, channel: str, history_key: str, payload: Any,
+                                history_payload: Any, meta):
+        """Queue the plain-command equivalent of PUBLISH_DETECTION_LUA on a pipeline"""
+        queue_detection_writes(pipe, self.device_id, self.stream_key, channel, history_key,
+                               payload, history_payload, meta)
+    
     def subscribe_to_detections(self, callback_func):
-        """Subscribe to detection events from other devices"""
-        if not self.connected:
-            return None
-            
+        """Deliver detection events from other devices to callback_func (blocks the calling thread)
+        
+        Waits while Redis is unreachable and resubscribes after every reconnect.
+        """
+        self.subscriber_running = True
+        while self.subscriber_running:
+            if not self.connected_event.wait(timeout=1.0):
+                continue
+            if EVENT_BUS_CONFIG['mode'] == 'streams':
+                self._consume_detection_stream(callback_func)
+            else:
+                self._subscribe_pubsub(callback_func)
+        return None
+    
+    def _subscribe_pubsub(self, callback_func):
+        """Legacy pub/sub subscriber - events published while disconnected are lost"""
+        pubsub = None
         try:
-            pubsub = self.redis_client.pubsub()
+            pubsub = self.event_client.pubsub()
             channel = f"{REDIS_KEYS['detections']}events"
             pubsub.subscribe(channel)
             
             logger.info(f"👂 Subscribed to detection events on {channel}")
             
-            for message in pubsub.listen():
-                if message['type'] == 'message':
+            while self.subscriber_running and self.connected:
+                message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message['type'] == 'message':
                     try:
-                        event_data = json.loads(message['data'])
+                        event_data = decode_event(message['data'])
                         # Only process events from other devices
                         if event_data.get('device_id') != self.device_id:
                             callback_func(event_data)
                     except Exception as e:
                         logger.error(f"Error processing detection event: {e}")
-                        
-            return pubsub
             
         except Exception as e:
-            logger.error(f"Failed to subscribe to detections: {e}")
-            return None
+            self._handle_error(e, "Failed to subscribe to detections")
+            if self.connected:
+                time.sleep(EVENT_BUS_CONFIG['reconnect_delay'])
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+    
+    def subscribe_to_alarms(self, callback_func):
+        """Deliver alarms fanned out to this device's alarm channel (blocks the calling thread)
+        
+        See publish_alarm_state - devices within the sender's radius get them. Alarms
+        published while this device is disconnected are lost (plain pub/sub).
+        """
+        self.alarm_subscriber_running = True
+        channel = alarm_channel(self.device_id)
+        while self.alarm_subscriber_running:
+            if not self.connected_event.wait(timeout=1.0):
+                continue
+            client = self._fleet_event_client()
+            pubsub = None
+            try:
+                pubsub = client.pubsub()
+                pubsub.subscribe(channel)
+                logger.info(f"👂 Subscribed to nearby alarms on {channel}")
+                
+                # Resubscribe when the fleet client changes (edge tier: central up or down)
+                while (self.alarm_subscriber_running and self.connected
+                       and client is self._fleet_event_client()):
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message['type'] == 'message':
+                        try:
+                            callback_func(decode_event(message['data']))
+                        except Exception as e:
+                            logger.error(f"Error processing alarm event: {e}")
+            
+            except Exception as e:
+                if client is self.event_client:
+                    self._handle_error(e, "Failed to subscribe to alarms")
+                else:
+                    logger.warning(f"⚠️ Central alarm subscription lost ({e})")
+                time.sleep(EVENT_BUS_CONFIG['reconnect_delay'])
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+    
+    def _ensure_stream_group(self):
+        """Create this device's consumer group (new groups start at the stream tail)"""
+        try:
+            self.event_client.xgroup_create(self.stream_key, self.stream_group, id='$', mkstream=True)
+            logger.info(f"🆕 Created stream consumer group {self.stream_group}")
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+    
+    def _consume_detection_stream(self, callback_func):
+        """XREADGROUP consumer: replays unacknowledged entries, then reads new ones in batches
+        
+        Returns when the connection drops; the group keeps our position for the next session.
+        """
+        logger.info(f"👂 Consuming detection events from stream {self.stream_key}")
+        
+        try:
+            self._ensure_stream_group()
+            # '0' = our pending entries (delivered before a crash/disconnect but not acked)
+            read_id = '0'
+            
+            while self.subscriber_running and self.connected:
+                response = self.event_client.xreadgroup(
+                    self.stream_group, self.device_id, {self.stream_key: read_id},
+                    count=EVENT_BUS_CONFIG['batch_count'], block=EVENT_BUS_CONFIG['block_ms']
+                )
+                entries = response[0][1] if response else []
+                
+                if not entries:
+                    # Pending backlog drained - switch to never-delivered entries
+                    read_id = '>'
+                    continue
+                
+                self._dispatch_stream_entries(entries, callback_func)
+                
+                # Acknowledge the whole batch in one call
+                self.event_client.xack(self.stream_key, self.stream_group, *[entry_id for entry_id, _ in entries])
+                
+        except Exception as e:
+            self._handle_error(e, "Detection stream consumer error")
+            if self.connected:
+                time.sleep(EVENT_BUS_CONFIG['reconnect_delay'])
+    
+    def _dispatch_stream_entries(self, entries, callback_func):
+        """Decode a batch of stream entries and hand other devices' events to the callback"""
+        for entry_id, fields in entries:
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            self.stream_last_id = entry_id
+            self.stream_last_event_ms = int(entry_id.split('-', 1)[0])
+            self.stream_events_consumed += 1
+            
+            source_device = fields.get('device_id', fields.get(b'device_id'))
+            if isinstance(source_device, bytes):
+                source_device = source_device.decode()
+            if source_device == self.device_id:
+                continue
+            
+            try:
+                callback_func(decode_event(fields.get('data', fields.get(b'data'))))
+            except Exception as e:
+                logger.error(f"Error processing detection event {entry_id}: {e}")
+    
+    def stop_detection_consumer(self):
+        """Ask the subscriber loop to exit after its current blocking read"""
+        self.subscriber_running = False
+    
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Consumer position and lag for this device's group"""
+        stats = {
+            'mode': EVENT_BUS_CONFIG['mode'],
+            'last_id': self.stream_last_id,
+            'events_consumed': self.stream_events_consumed,
+            # Age of the newest consumed entry - how far behind real time this consumer is
+            'delay_ms': (time.time() * 1000 - self.stream_last_event_ms) if self.stream_last_event_ms else None,
+            'lag': None,
+            'pending': None
+        }
+        if not self.connected or EVENT_BUS_CONFIG['mode'] != 'streams':
+            return stats
+        
+        try:
+            for group in self.event_client.xinfo_groups(self.stream_key):
+                name = group.get('name')
+                if isinstance(name, bytes):
+                    name = name.decode()
+                if name == self.stream_group:
+                    # 'lag' (entries not yet delivered) needs Redis 7+
+                    stats['lag'] = group.get('lag')
+                    stats['pending'] = group.get('pending')
+                    break
+        except Exception as e:
+            logger.debug(f"Stream lag unavailable: {e}")
+        return stats
+    
+    def _cache_key(self, slice_id: int, bucket: str) -> str:
+        return f"{REDIS_KEYS['inference_cache']}{slice_id}:{bucket}"
     
     def cache_inference_result(self, frame_hash: str, inference_result: Dict[str, Any]) -> bool:
-        """Cache VM inference result to reduce API calls"""
+        """Cache VM inference result to reduce API calls
+        
+        Stored as a binary-packed field in a small per-slice hash bucket; the
+        whole bucket expires two TTL slices later, so no per-entry keys exist.
+        """
         if not self.connected:
             return False
             
         try:
-            cache_key = f"{REDIS_KEYS['inference_cache']}{frame_hash}"
-            cached_data = {
-                'timestamp': time.time(),
-                'device_id': self.device_id,
-                'result': inference_result
-            }
+            now = time.time()
+            ttl = CACHE_TTL['inference_result']
+            slice_id, bucket, field = cache_slot(frame_hash, now, ttl)
+            cache_key = self._cache_key(slice_id, bucket)
+            packed = pack_detection_rows(inference_result.get('timestamp', now),
+                                         inference_result.get('detections', []))
             
-            self.redis_client.setex(
-                cache_key, 
-                CACHE_TTL['inference_result'], 
-                json.dumps(cached_data)
-            )
+            pipe = self.raw_client.pipeline(transaction=False)
+            pipe.hset(cache_key, field, packed)
+            pipe.expire(cache_key, 2 * ttl)
+            pipe.execute()
             
             logger.debug(f"💾 Cached inference result: {frame_hash}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to cache inference result: {e}")
+            self._handle_error(e, "Failed to cache inference result")
             return False
     
     def get_cached_inference(self, frame_hash: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached inference result"""
+        """Retrieve cached inference result ({'timestamp', 'detections': rows})"""
         if not self.connected:
             return None
             
         try:
-            cache_key = f"{REDIS_KEYS['inference_cache']}{frame_hash}"
-            cached_data = self.redis_client.get(cache_key)
+            slice_id, bucket, field = cache_slot(frame_hash, time.time(), CACHE_TTL['inference_result'])
+            
+            # Current and previous slice in one round trip
+            pipe = self.raw_client.pipeline(transaction=False)
+            pipe.hget(self._cache_key(slice_id, bucket), field)
+            pipe.hget(self._cache_key(slice_id - 1, bucket), field)
+            cached_data = next((value for value in pipe.execute() if value), None)
             
             if cached_data:
-                result = json.loads(cached_data)
+                timestamp, rows = unpack_detection_rows(cached_data)
                 logger.debug(f"🎯 Cache hit for inference: {frame_hash}")
-                return result['result']
+                return {'timestamp': timestamp, 'detections': rows}
             
             return None
             
         except Exception as e:
-            logger.error(f"Failed to get cached inference: {e}")
+            self._handle_error(e, "Failed to get cached inference")
             return None
     
+    def get_detection_history(self, device_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recent detection summaries for a device (newest first), with the long key names restored"""
+        if not self.connected:
+            return []
+        
+        device_id = device_id or self.device_id
+        try:
+            history_key = f"{REDIS_KEYS['detections']}{device_id}:history"
+            entries = self.event_client.lrange(history_key, 0, limit - 1)
+            return [expand_history_entry(decode_event(entry), device_id) for entry in entries]
+        except Exception as e:
+            self._handle_error(e, "Failed to get detection history")
+            return []
+    
+    def get_memory_report(self, samples: int = 20) -> Dict[str, Dict[str, Any]]:
+        """MEMORY USAGE per key family (sampled with SCAN) - bytes per key and per entry
+
+        encodings counts the sampled keys per OBJECT ENCODING; an inference cache
+        bucket holding an oversized entry shows up as 'hashtable', not 'listpack'.
+        """
+        if not self.connected:
+            return {}
+        
+        families = {
+            'inference_cache': (f"{REDIS_KEYS['inference_cache']}*", 'hlen'),
+            'detection_history': (f"{REDIS_KEYS['detections']}*:history", 'llen'),
+            'detection_stream': (self.stream_key, 'xlen'),
+            'device_status': (f"{REDIS_KEYS['device_status']}*", 'hlen'),
+            'fleet_stats': (f"{REDIS_KEYS['system_stats']}*", None)
+        }
+        
+        report = {}
+        try:
+            for family, (pattern, length_command) in families.items():
+                keys = []
+                for key in self.redis_client.scan_iter(match=pattern, count=500):
+                    keys.append(key)
+                    if len(keys) >= samples:
+                        break
+                if not keys:
+                    continue
+                
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.execute_command('MEMORY', 'USAGE', key, 'SAMPLES', 0)
+                    pipe.object('encoding', key)
+                    if length_command:
+                        getattr(pipe, length_command)(key)
+                results = pipe.execute(raise_on_error=False)
+                
+                step = 3 if length_command else 2
+                sizes = [r for r in results[0::step] if isinstance(r, int)]
+                encodings = {}
+                for encoding in results[1::step]:
+                    if not isinstance(encoding, Exception):
+                        encoding = encoding.decode() if isinstance(encoding, bytes) else str(encoding)
+                        encodings[encoding] = encodings.get(encoding, 0) + 1
+                entries = sum(r for r in results[2::step] if isinstance(r, int)) if length_command else None
+                
+                report[family] = {
+                    'sampled_keys': len(keys),
+                    'bytes_per_key': sum(sizes) / len(sizes) if sizes else None,
+                    'bytes_per_entry': sum(sizes) / entries if entries else None,
+                    'encodings': encodings
+                }
+            
+            cache_encodings = report.get('inference_cache', {}).get('encodings', {})
+            expanded = sum(count for encoding, count in cache_encodings.items() if encoding not in COMPACT_ENCODINGS)
+            if expanded:
+                logger.warning(f"⚠️ {expanded} sampled inference cache buckets are not listpack-encoded "
+                               f"(entry over hash-max-listpack-value) - {cache_encodings}")
+            return report
+        
+        except Exception as e:
+            self._handle_error(e, "Failed to build Redis memory report")
+            return report
+    
     def update_device_status(self, status_data: Dict[str, Any]) -> bool:
-        """Update device status and heartbeat"""
+        """Update device status and heartbeat (latest status is kept for write-behind while disconnected)"""
+        device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
+        status_update = {
+            'last_seen': time.time(),
+            **status_data
+        }
+        
         if not self.connected:
+            with self.buffer_lock:
+                self.pending_status.update(status_update)
             return False
             
         try:
-            device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
-            status_update = {
-                'last_seen': time.time(),
-                **status_data
-            }
-            
-            self.redis_client.hset(device_key, mapping=status_update)
-            self.redis_client.expire(device_key, CACHE_TTL['device_status'])
+            started = time.perf_counter()
+            self._write_device_hash(device_key, status_update)
+            self._record_latency('update_device_status', started)
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to update device status: {e}")
+            if isinstance(e, (redis.ConnectionError, redis.TimeoutError)):
+                with self.buffer_lock:
+                    self.pending_status.update(status_update)
+            self._handle_error(e, "Failed to update device status")
+            return False
+    
+    def update_location(self, latitude: float, longitude: float, fix_time: Optional[float] = None) -> bool:
+        """Record a GPS fix: device hash fields + GEOADD, one MULTI/EXEC round trip
+        
+        The fix is kept while disconnected and written again after every reconnect.
+        """
+        self.location = (latitude, longitude, fix_time or time.time())
+        if not self.connected:
+            return False
+        
+        try:
+            started = time.perf_counter()
+            self._write_location()
+            self._record_latency('update_location', started)
+            return True
+        except Exception as e:
+            self._handle_error(e, "Failed to update device location")
             return False
     
+    def _write_location(self):
+        latitude, longitude, fix_time = self.location
+        device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
+        pipe = self.redis_client.pipeline(transaction=True)
+        # Hash fields too - the edge replicator copies them to central with the status
+        pipe.hset(device_key, mapping={'latitude': latitude, 'longitude': longitude, 'fix_time': fix_time})
+        pipe.expire(device_key, CACHE_TTL['device_status'])
+        queue_location_writes(pipe, self.device_id, latitude, longitude, fix_time)
+        pipe.execute()
+    
+    def get_nearby_devices(self, radius_m: Optional[float] = None) -> Optional[List[tuple]]:
+        """(device_id, distance_m) of other devices with a recent fix within radius_m, nearest first
+        
+        None when this device has no fix (callers fall back to fleet-wide behaviour).
+        """
+        if self.location is None or not self.connected:
+            return None
+        
+        latitude, longitude, _ = self.location
+        radius_m = radius_m or GEO_CONFIG['radius_m']
+        cutoff = time.time() - CACHE_TTL['coordinates']
+        client = self._fleet_client()
+        
+        try:
+            started = time.perf_counter()
+            found = None
+            if self.scripts_enabled['nearby_devices']:
+                try:
+                    found = self.nearby_devices_script(
+                        keys=[GEO_KEYS['positions'], GEO_KEYS['fixes']],
+                        args=[longitude, latitude, radius_m, cutoff, GEO_CONFIG['max_neighbours']],
+                        client=client
+                    )
+                except redis.ResponseError as e:
+                    if not self._disable_script('nearby_devices', e):
+                        raise
+            
+            if found is None:
+                # Without scripting: GEOSEARCH, then the fix times of what it returned
+                found = client.geosearch(GEO_KEYS['positions'], longitude=longitude, latitude=latitude,
+                                         radius=radius_m, unit='m', sort='ASC',
+                                         count=GEO_CONFIG['max_neighbours'], withdist=True)
+                fix_times = client.zmscore(GEO_KEYS['fixes'], [item[0] for item in found]) if found else []
+                found = [item for item, fix_time in zip(found, fix_times)
+                         if fix_time is not None and fix_time >= cutoff]
+            self._record_latency('get_nearby_devices', started)
+            
+            return [(device_id, float(distance)) for device_id, distance in found if device_id != self.device_id]
+        
+        except Exception as e:
+            self._handle_error(e, "Failed to query nearby devices")
+            return None
+    
+    def get_located_devices(self) -> Optional[frozenset]:
+        """Ids of every device with a fix newer than CACHE_TTL['coordinates'] (None on failure)
+        
+        Lets callers tell a device known to be out of range from one that has not
+        reported a position at all.
+        """
+        if not self.connected:
+            return None
+        try:
+            started = time.perf_counter()
+            located = self._fleet_client().zrangebyscore(GEO_KEYS['fixes'], time.time() - CACHE_TTL['coordinates'],
+                                                         '+inf')
+            self._record_latency('get_located_devices', started)
+            return frozenset(located)
+        except Exception as e:
+            self._handle_error(e, "Failed to list located devices")
+            return None
+    
     def get_all_devices(self) -> List[Dict[str, Any]]:
         """Get status of all registered devices"""
         if not self.connected:
             return []
             
         try:
-            device_pattern = f"{REDIS_KEYS['device_status']}*"
-            device_keys = self.redis_client.keys(device_pattern)
-            
-            devices = []
-            for key in device_keys:
-                device_data = self.redis_client.hgetall(key)
-                if device_data:
-                    devices.append(device_data)
-            
+            started = time.perf_counter()
+            if LEGACY_SCAN:
+                devices = self._get_all_devices_scan()
+            else:
+                devices = self._get_all_devices_indexed()
+            self._record_latency('get_all_devices', started)
             return devices
             
         except Exception as e:
-            logger.error(f"Failed to get device list: {e}")
+            self._handle_error(e, "Failed to get device list")
             return []
     
-    def publish_alarm_state(self, alarm_code: str, source_device: str = None) -> bool:
-        """Publish alarm state change"""
+    def _get_all_devices_indexed(self) -> List[Dict[str, Any]]:
+        """Live devices from the registry sorted set (stale entries expired lazily)
+        
+        One round trip for the ids, one pipelined round trip for the hashes - every
+        key is named in its own command, so this also works through cluster proxies.
+        """
+        client = self._fleet_client()
+        cutoff = time.time() - CACHE_TTL['device_status']
+        
+        pipe = client.pipeline(transaction=False)
+        pipe.zremrangebyscore(REDIS_INDEXES['devices'], '-inf', cutoff)
+        pipe.zrange(REDIS_INDEXES['devices'], 0, -1)
+        _, device_ids = pipe.execute()
+        
+        pipe = client.pipeline(transaction=False)
+        for device_id in device_ids:
+            pipe.hgetall(f"{REDIS_KEYS['device_status']}{device_id}")
+        return [device for device in pipe.execute() if device]
+    
+    def _get_all_devices_scan(self) -> List[Dict[str, Any]]:
+        """Legacy listing by keyspace scan - also sees devices that predate the registry"""
+        client = self._fleet_client()
+        device_pattern = f"{REDIS_KEYS['device_status']}*"
+        device_keys = list(client.scan_iter(match=device_pattern, count=500))
+        
+        pipe = client.pipeline(transaction=False)
+        for key in device_keys:
+            pipe.hgetall(key)
+        return [device for device in pipe.execute() if device]
+    
+    def rebuild_indexes(self) -> int:
+        """Migration helper: seed the registry and counters from existing keys (one SCAN pass)"""
+        if not self.connected:
+            return 0
+            
+        try:
+            client = self._fleet_client()
+            devices = self._get_all_devices_scan()
+            
+            history_pattern = f"{REDIS_KEYS['detections']}*:history"
+            history_keys = list(client.scan_iter(match=history_pattern, count=500))
+            pipe = client.pipeline(transaction=False)
+            for key in history_keys:
+                pipe.llen(key)
+            history_lengths = pipe.execute()
+            
+            pipe = client.pipeline(transaction=True)
+            for device in devices:
+                if device.get('device_id') and device.get('last_seen'):
+                    pipe.zadd(REDIS_INDEXES['devices'], {device['device_id']: float(device['last_seen'])})
+            prefix_len = len(REDIS_KEYS['detections'])
+            for key, length in zip(history_keys, history_lengths):
+                device_id = key[prefix_len:-len(':history')]
+                # Only seed devices with no counter yet - never lower a live count
+                pipe.hsetnx(REDIS_INDEXES['detection_counts'], device_id, length)
+            pipe.execute()
+            
+            logger.info(f"🗂️ Redis indexes rebuilt: {len(devices)} devices, {len(history_keys)} histories")
+            return len(devices)
+            
+        except Exception as e:
+            logger.error(f"Failed to rebuild Redis indexes: {e}")
+            return 0
+    
+    def publish_alarm_state(self, alarm_code: str, source_device: str = None,
+                            radius_m: Optional[float] = None) -> bool:
+        """Publish alarm state change
+        
+        With a GPS fix the alarm goes to the per-device channels of devices within
+        radius_m (plus the dashboard's state channel); without one, to the state channel only.
+        Each RedisDetectionHandler listens on its own channel (subscribe_to_alarms).
+        """
         if not self.connected:
             return False
             
@@ -255,19 +1152,24 @@ class RedisManager:
                 'source_device': source_device or self.device_id,
                 'timestamp': time.time()
             }
+            payload = self.serializer.dumps(alarm_event)
+            nearby = self.get_nearby_devices(radius_m) or []
             
-            channel = f"{REDIS_KEYS['alarms']}state"
-            self.redis_client.publish(channel, json.dumps(alarm_event))
+            # Fleet client - in the edge tier the neighbours listen on central
+            pipe = self._fleet_client().pipeline(transaction=False)
+            pipe.publish(f"{REDIS_KEYS['alarms']}state", payload)
+            for device_id, _ in nearby:
+                pipe.publish(alarm_channel(device_id), payload)
             
             # Store current alarm state
-            state_key = f"{REDIS_KEYS['alarms']}current"
-            self.redis_client.setex(state_key, CACHE_TTL['alarm_state'], json.dumps(alarm_event))
+            pipe.setex(f"{REDIS_KEYS['alarms']}current", CACHE_TTL['alarm_state'], payload)
+            pipe.execute()
             
-            logger.info(f"🚨 Published alarm state: {alarm_code}")
+            logger.info(f"🚨 Published alarm state: {alarm_code} ({len(nearby)} nearby devices)")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to publish alarm state: {e}")
+            self._handle_error(e, "Failed to publish alarm state")
             return False
     
     def get_system_stats(self) -> Dict[str, Any]:
@@ -276,47 +1178,171 @@ class RedisManager:
             return {}
             
         try:
-            stats = {
-                'active_devices': len(self.get_all_devices()),
-                'redis_info': self.redis_client.info('memory'),
-                'total_detections': 0,
-                'cache_hits': 0,
-                'timestamp': time.time()
-            }
-            
-            # Count total detections across all devices
-            detection_pattern = f"{REDIS_KEYS['detections']}*:history"
-            detection_keys = self.redis_client.keys(detection_pattern)
-            
-            for key in detection_keys:
-                count = self.redis_client.llen(key)
-                stats['total_detections'] += count
-            
+            started = time.perf_counter()
+            if LEGACY_SCAN:
+                stats = self._get_system_stats_scan()
+            else:
+                stats = self._get_system_stats_indexed()
+            self._record_latency('get_system_stats', started)
             return stats
             
         except Exception as e:
-            logger.error(f"Failed to get system stats: {e}")
+            self._handle_error(e, "Failed to get system stats")
+            return {}
+    
+    def _get_system_stats_indexed(self) -> Dict[str, Any]:
+        """Registry size, write-time counters and aggregates in one pipelined round trip"""
+        client = self._fleet_client()
+        cutoff = time.time() - CACHE_TTL['device_status']
+        refresh_info = time.time() - self.memory_info_time > STATS_CONFIG['info_refresh']
+        
+        pipe = client.pipeline(transaction=False)
+        pipe.zremrangebyscore(REDIS_INDEXES['devices'], '-inf', cutoff)
+        pipe.zcard(REDIS_INDEXES['devices'])
+        pipe.hgetall(REDIS_INDEXES['detection_counts'])
+        fleet_parser = self._queue_fleet_stats_reads(pipe, window_minutes=15)
+        if refresh_info:
+            pipe.info('memory')
+        results = pipe.execute()
+        
+        _, active_devices, detection_counts = results[:3]
+        fleet_stats = fleet_parser(results[3:])
+        if refresh_info:
+            self.memory_info = results[-1]
+            self.memory_info_time = time.time()
+        
+        detections_by_device = {device: int(count) for device, count in detection_counts.items()}
+        return {
+            'active_devices': active_devices,
+            'redis_info': self.memory_info,
+            'total_detections': sum(detections_by_device.values()),
+            'detections_by_device': detections_by_device,
+            'cache_hits': 0,
+            'fleet': fleet_stats,
+            'timestamp': time.time()
+        }
+    
+    def _queue_fleet_stats_reads(self, pipe, window_minutes: int):
+        """Queue the aggregate reads; returns a parser for their slice of the pipeline results"""
+        now = time.time()
+        buckets_per_minute = max(1, 60 // STATS_CONFIG['bucket_seconds'])
+        newest = stats_bucket(now)
+        buckets = range(newest - window_minutes * buckets_per_minute + 1, newest + 1)
+        
+        pipe.mget([f"{STATS_KEYS['detections']}{bucket}" for bucket in buckets])
+        pipe.pfcount(*[f"{STATS_KEYS['devices']}{bucket}" for bucket in buckets])
+        pipe.zrevrange(STATS_KEYS['sites'], 0, -1, withscores=True)
+        pipe.zrange(STATS_KEYS['site_objects'], 0, -1, withscores=True)
+        
+        def parse(results):
+            counters, detecting_devices, sites, site_objects = results[:4]
+            objects_per_site = {}
+            for member, count in site_objects:
+                site, _, label = member.rpartition('|')
+                objects_per_site.setdefault(site, {})[label] = int(count)
+            return {
+                'window_minutes': window_minutes,
+                'detections_in_window': sum(int(c) for c in counters if c),
+                'detecting_devices_in_window': detecting_devices,
+                'detections_per_site': {site: int(count) for site, count in sites},
+                'distinct_objects_per_site': {site: len(labels) for site, labels in objects_per_site.items()},
+                'objects_per_site': objects_per_site
+            }
+        return parse
+    
+    def get_fleet_stats(self, window_minutes: int = 15) -> Dict[str, Any]:
+        """Dashboard aggregates: detections and detecting devices in the last N minutes, per-site rollups"""
+        if not self.connected:
+            return {}
+        
+        try:
+            window_minutes = max(1, min(window_minutes, STATS_CONFIG['bucket_ttl'] // 60))
+            started = time.perf_counter()
+            pipe = self._fleet_client().pipeline(transaction=False)
+            parse = self._queue_fleet_stats_reads(pipe, window_minutes)
+            stats = parse(pipe.execute())
+            self._record_latency('get_fleet_stats', started)
+            return stats
+        except Exception as e:
+            self._handle_error(e, "Failed to get fleet stats")
             return {}
     
+    def _get_system_stats_scan(self) -> Dict[str, Any]:
+        """Legacy stats by keyspace scan (counts the capped per-device history lists)"""
+        client = self._fleet_client()
+        stats = {
+            'active_devices': len(self._get_all_devices_scan()),
+            'redis_info': client.info('memory'),
+            'total_detections': 0,
+            'cache_hits': 0,
+            'timestamp': time.time()
+        }
+        
+        detection_pattern = f"{REDIS_KEYS['detections']}*:history"
+        detection_keys = list(client.scan_iter(match=detection_pattern, count=500))
+        
+        pipe = client.pipeline(transaction=False)
+        for key in detection_keys:
+            pipe.llen(key)
+        stats['total_detections'] = sum(pipe.execute())
+        
+        return stats
+    
     def cleanup(self):
         """Clean up Redis connections"""
+        self.subscriber_running = False
+        self.supervisor_running = False
+        self.supervisor_wake.set()
         try:
             if self.connected and self.redis_client:
-                # Remove device from active list
+                # Last chance for anything still buffered
+                self._flush_write_buffer()
+                
+                # Remove device from active list (locally and, in the edge tier, centrally)
                 device_key = f"{REDIS_KEYS['device_status']}{self.device_id}"
-                self.redis_client.delete(device_key)
+                clients = [self.redis_client]
+                if self._fleet_client() is not self.redis_client:
+                    clients.append(self._fleet_client())
+                for client in clients:
+                    pipe = client.pipeline(transaction=True)
+                    pipe.delete(device_key)
+                    pipe.zrem(REDIS_INDEXES['devices'], self.device_id)
+                    pipe.zrem(GEO_KEYS['positions'], self.device_id)
+                    pipe.zrem(GEO_KEYS['fixes'], self.device_id)
+                    pipe.execute()
                 
-                # Close connection
-                self.redis_client.close()
                 logger.info(f"🧹 Redis cleanup completed for {self.device_id}")
                 
         except Exception as e:
             logger.error(f"Redis cleanup error: {e}")
         finally:
+            if self.replicator is not None:
+                self.replicator.stop()
+                self.replicator = None
             self.connected = False
+            self.connected_event.clear()
+            self.alarm_subscriber_running = False
+            # Close pooled connections
+            for pool in (self.event_pool, self.pool):
+                if pool is not None:
+                    pool.disconnect()
+            self.pool = None
+            self.event_pool = None
+            self.raw_client = None
             self.redis_client = None
+            self.event_client = None
 
 # Utility functions
+def scripting_unavailable(error: Exception) -> bool:
+    """True for errors meaning the server will not run scripts at all (not a command error inside one)"""
+    message = str(error).lower()
+    if message.startswith('noscript'):
+        return True
+    if 'scripting' in message and 'disabled' in message:
+        return True
+    # EVAL/EVALSHA renamed away or blocked by an ACL
+    return ('evalsha' in message or "'eval'" in message) and ('unknown command' in message or 'noperm' in message)
+
 def create_frame_hash(frame_data: bytes) -> str:
     """Create hash of frame data for caching"""
     import hashlib
@@ -5,21 +5,43 @@ import json
 import hashlib
 import logging
 import cv2
-from typing import Dict, List, Any, Optional
-from redis_system.redis_config import RedisManager, create_frame_hash
+from typing import Dict, List, Any, Optional, Callable
+from redis_system.redis_config import RedisManager, GEO_CONFIG, create_frame_hash
+from redis_system.coordination_index import CoordinationWindow, coordination_analysis
+from redis_system.event_coalescing import EVENT_COALESCING_CONFIG, EventCoalescer, detection_event_data
 
 logger = logging.getLogger(__name__)
 
 class RedisDetectionHandler:
-    """Enhanced detection handler with Redis integration"""
+    """Enhanced detection handler with Redis integration
     
-    def __init__(self, device_id: str, device_config: Dict[str, Any]):
+    Detections are records exposing label, confidence, box, is_weapon and
+    to_dict() (see runScripts/detection_types.Detection); they are only
+    converted to dicts/rows when they cross into Redis.
+    """
+    
+    def __init__(self, device_id: str, device_config: Dict[str, Any],
+                 telemetry_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+                 detection_type: Optional[Any] = None,
+                 alarm_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
         self.device_id = device_id
         self.device_config = device_config
         self.redis_manager = RedisManager(device_id)
         
-        # Redis connection status
-        self.redis_connected = False
+        # Returns the latest device telemetry snapshot (attached to heartbeats)
+        self.telemetry_provider = telemetry_provider
+        
+        # Record type used to rebuild cached rows (needs a from_row classmethod)
+        self.detection_type = detection_type
+        
+        # Receives alarms that nearby devices fan out to this device's alarm channel
+        self.alarm_callback = alarm_callback
+        self.last_alarm = None
+        
+        # Coordination analysis for the most recent weapon frame (None when no weapon)
+        self.last_coordination = None
+        
+        # Redis connection status (see the redis_connected property)
         self.redis_retry_count = 0
         self.max_redis_retries = 3
         
@@ -28,30 +50,53 @@ class RedisDetectionHandler:
         self.inference_cache_misses = 0
         
         # Cross-device detection tracking
-        self.remote_detections = {}  # Track detections from other devices
+        # Latest detection per remote device, expiry-ordered (30 s coordination window, 60 s retention)
+        self.remote_detections = CoordinationWindow(active_window=30.0, retention=60.0)
         self.last_redis_heartbeat = 0
         self.heartbeat_interval = 30  # seconds
         
+        # Devices within GEO_CONFIG['radius_m'] and devices with a fix outside it (refreshed by
+        # the heartbeat worker); None until this device has a fix - coordination is fleet-wide
+        # then. Devices without a known position are never excluded.
+        self.nearby_devices = None
+        self.distant_devices = None
+        self.last_nearby_refresh = 0.0
+        
         # Detection coordination
         self.detection_coordination_lock = threading.Lock()
         self.coordinated_response_threshold = 2  # If 2+ devices detect, enhanced response
         
+        # Outgoing event coalescing (see EVENT_COALESCING_CONFIG)
+        self.coalescer = EventCoalescer()
+        
+        # Fixed installations can set their position in the device config
+        if 'latitude' in device_config and 'longitude' in device_config:
+            self.redis_manager.update_location(device_config['latitude'], device_config['longitude'])
+        
         # Start Redis connection and services
         self._initialize_redis()
     
+    @property
+    def redis_connected(self) -> bool:
+        """Live connection state - the manager's supervisor flips it on failure and reconnect"""
+        return self.redis_manager.connected
+    
     def _initialize_redis(self) -> bool:
         """Initialize Redis connection and start background services"""
         try:
-            self.redis_connected = self.redis_manager.connect()
+            connected = self.redis_manager.connect()
+            
+            # Services and the supervisor run either way - they wait for / restore the connection
+            self._start_redis_services()
+            self.redis_manager.start_supervisor()
+            self.redis_manager.start_replicator()
             
-            if self.redis_connected:
-                # Start background services
-                self._start_redis_services()
+            if connected:
                 logger.info(f"🚀 Redis services started for {self.device_id}")
             else:
-                logger.warning(f"⚠️ Operating without Redis - limited coordination")
+                logger.warning(f"⚠️ Operating without Redis - limited coordination, reconnecting in background")
             
-            return self.redis_connected
+            return connected
             
         except Exception as e:
             logger.error(f"Redis initialization error: {e}")
@@ -67,6 +112,15 @@ class RedisDetectionHandler:
         )
         detection_thread.start()
         
+        # Alarms fanned out to this device by nearby devices
+        alarm_thread = threading.Thread(
+            target=self.redis_manager.subscribe_to_alarms,
+            args=(self._handle_alarm,),
+            daemon=True,
+            name=f"RedisAlarmSub-{self.device_id}"
+        )
+        alarm_thread.start()
+        
         # Heartbeat thread
         heartbeat_thread = threading.Thread(
             target=self._heartbeat_worker, 
@@ -83,6 +137,9 @@ class RedisDetectionHandler:
             def handle_remote_detection(event_data: Dict[str, Any]):
                 """Handle detection event from another device"""
                 remote_device = event_data.get('device_id', 'unknown')
+                distant = self.distant_devices
+                if distant is not None and remote_device in distant:
+                    return  # known to be outside the coordination radius
                 detection_objects = event_data.get('objects', [])
                 confidence = event_data.get('max_confidence', 0)
                 timestamp = event_data.get('timestamp', time.time())
@@ -90,22 +147,15 @@ class RedisDetectionHandler:
                 logger.info(f"📡 Remote detection from {remote_device}: {detection_objects} ({confidence:.3f})")
                 
                 with self.detection_coordination_lock:
-                    self.remote_detections[remote_device] = {
+                    self.remote_detections.update(remote_device, {
                         'objects': detection_objects,
                         'confidence': confidence,
                         'timestamp': timestamp,
                         'detection_id': event_data.get('detection_id', 'unknown')
-                    }
-                    
-                    # Clean old remote detections (older than 60 seconds)
-                    current_time = time.time()
-                    expired_devices = [
-                        dev for dev, data in self.remote_detections.items()
-                        if current_time - data['timestamp'] > 60
-                    ]
+                    })
                     
-                    for expired_dev in expired_devices:
-                        del self.remote_detections[expired_dev]
+                    # Only entries past their deadline are touched (older than 60 seconds)
+                    for expired_dev in self.remote_detections.expire(time.time()):
                         logger.debug(f"🧹 Cleaned expired detection from {expired_dev}")
             
             # Subscribe to detection events
@@ -114,11 +164,21 @@ class RedisDetectionHandler:
         except Exception as e:
             logger.error(f"Detection subscriber error: {e}")
     
+    def _handle_alarm(self, alarm_event: Dict[str, Any]):
+        """Alarm from a device that has this one within its radius"""
+        if alarm_event.get('source_device') == self.device_id:
+            return
+        self.last_alarm = alarm_event
+        logger.info(f"🚨 Nearby alarm from {alarm_event.get('source_device')}: {alarm_event.get('alarm_code')}")
+        if self.alarm_callback:
+            self.alarm_callback(alarm_event)
+    
     def _heartbeat_worker(self):
         """Send periodic heartbeat and status updates"""
         while True:
             try:
-                if self.redis_connected and time.time() - self.last_redis_heartbeat > self.heartbeat_interval:
+                # While disconnected the manager keeps the latest status for write-behind
+                if time.time() - self.last_redis_heartbeat > self.heartbeat_interval:
                     status_data = {
                         'status': 'active',
                         'cache_hits': self.inference_cache_hits,
@@ -126,65 +186,101 @@ class RedisDetectionHandler:
                         'remote_detections_count': len(self.remote_detections)
                     }
                     
-                    self.redis_manager.update_device_status(status_data)
-                    self.last_redis_heartbeat = time.time()
-                    logger.debug(f"💓 Heartbeat sent for {self.device_id}")
+                    if self.telemetry_provider:
+                        # Redis hashes only hold str/int/float - skip unavailable sources
+                        for key, value in self.telemetry_provider().items():
+                            if value is not None:
+                                status_data[key] = int(value) if isinstance(value, bool) else value
+                    
+                    if self.redis_manager.update_device_status(status_data):
+                        self.last_redis_heartbeat = time.time()
+                        logger.debug(f"💓 Heartbeat sent for {self.device_id}")
+                
+                if time.time() - self.last_nearby_refresh > GEO_CONFIG['refresh_interval']:
+                    self._refresh_nearby_devices()
                 
-                time.sleep(10)  # Check every 10 seconds
+                time.sleep(GEO_CONFIG['refresh_interval'])
                 
             except Exception as e:
                 logger.error(f"Heartbeat worker error: {e}")
                 time.sleep(30)  # Wait longer on error
     
-    def process_detection_with_redis(self, frame, detections: List[Dict[str, Any]], vm_inference_func) -> List[Dict[str, Any]]:
-        """Enhanced detection processing with Redis caching and coordination"""
+    def update_location(self, latitude: float, longitude: float, fix_time: Optional[float] = None) -> bool:
+        """Publish a GPS fix; the neighbour set is refreshed on the next heartbeat pass"""
+        self.last_nearby_refresh = 0.0
+        return self.redis_manager.update_location(latitude, longitude, fix_time)
+    
+    def _refresh_nearby_devices(self):
+        """GEOSEARCH for devices within the coordination radius (keeps the old sets if a query fails)"""
+        if self.redis_manager.location is None:
+            self.nearby_devices = None
+            self.distant_devices = None
+            return
+        nearby = self.redis_manager.get_nearby_devices()
+        located = self.redis_manager.get_located_devices() if nearby is not None else None
+        if located is not None:
+            self.nearby_devices = frozenset(device_id for device_id, _ in nearby)
+            self.distant_devices = located - self.nearby_devices - {self.device_id}
+            self.last_nearby_refresh = time.time()
+    
+    def _count_active_remote(self, now: float) -> int:
+        """Remote devices in the coordination window, minus those known to be out of range"""
+        distant = self.distant_devices
+        if distant is None:
+            return self.remote_detections.active_count(now)
+        return self.remote_detections.active_count_excluding(distant, now)
+    
+    def process_detection_with_redis(self, frame, detections: List[Any], vm_inference_func=None,
+                                     frame_hash: Optional[str] = None) -> List[Any]:
+        """Enhanced detection processing with Redis caching and coordination
+        
+        Without vm_inference_func the detections are fresh inference results: the
+        cache lookup (and its JPEG encode) is skipped, and they are cached only when
+        frame_hash - the MD5 of the q85 JPEG the caller already encoded - is given.
+        The coordination analysis is kept in self.last_coordination instead of
+        being copied into every detection.
+        """
         
-        # Try to get cached inference result first
-        cached_result = self._try_inference_cache(frame)
-        if cached_result:
-            detections = cached_result
-            self.inference_cache_hits += 1
-            logger.debug(f"🎯 Using cached inference result")
+        if vm_inference_func is None:
+            if frame_hash is not None:
+                self._cache_inference_result(frame, detections, frame_hash)
         else:
-            # Perform VM inference and cache result
-            detections = vm_inference_func(frame)
-            self._cache_inference_result(frame, detections)
-            self.inference_cache_misses += 1
+            # Try to get cached inference result first
+            cached_result = self._try_inference_cache(frame, frame_hash)
+            if cached_result:
+                detections = cached_result
+                self.inference_cache_hits += 1
+                logger.debug(f"🎯 Using cached inference result")
+            else:
+                # Perform VM inference and cache result
+                detections = vm_inference_func(frame)
+                self._cache_inference_result(frame, detections, frame_hash)
+                self.inference_cache_misses += 1
         
         # Check for weapons in detections
         weapon_detections = self._extract_weapon_detections(detections)
         
         if weapon_detections:
-            # Publish detection event to Redis
+            # Publish detection event to Redis (only on state change or heartbeat)
             self._publish_detection_event(weapon_detections, detections)
             
             # Analyze coordinated response
-            coordination_analysis = self._analyze_coordinated_response(weapon_detections)
-            
-            # Add coordination metadata to detections
-            for detection in detections:
-                detection['redis_metadata'] = {
-                    'coordination_level': coordination_analysis['level'],
-                    'cooperating_devices': coordination_analysis['devices'],
-                    'total_detecting_devices': coordination_analysis['total_devices'],
-                    'cache_performance': {
-                        'hits': self.inference_cache_hits,
-                        'misses': self.inference_cache_misses,
-                        'hit_rate': self._calculate_cache_hit_rate()
-                    }
-                }
+            self.last_coordination = self._analyze_coordinated_response(weapon_detections)
+        else:
+            self.last_coordination = None
         
         return detections
     
-    def _try_inference_cache(self, frame) -> Optional[List[Dict[str, Any]]]:
-        """Try to get cached inference result"""
+    def _try_inference_cache(self, frame, frame_hash: Optional[str] = None) -> Optional[List[Any]]:
+        """Try to get cached inference result (frame_hash: MD5 of the q85 JPEG when already encoded)"""
         if not self.redis_connected:
             return None
             
         try:
             # Create frame hash for cache lookup
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            frame_hash = create_frame_hash(buffer.tobytes())
+            if frame_hash is None:
+                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                frame_hash = create_frame_hash(buffer.tobytes())
             
             # Check cache
             cached_result = self.redis_manager.get_cached_inference(frame_hash)
@@ -193,7 +289,7 @@ class RedisDetectionHandler:
                 # Validate cache age (don't use old results)
                 cache_age = time.time() - cached_result.get('timestamp', 0)
                 if cache_age < 30:  # Use cache results less than 30 seconds old
-                    return cached_result.get('detections', [])
+                    return self._rows_to_detections(cached_result.get('detections', []))
             
             return None
             
@@ -201,20 +297,27 @@ class RedisDetectionHandler:
             logger.error(f"Cache lookup error: {e}")
             return None
     
-    def _cache_inference_result(self, frame, detections: List[Dict[str, Any]]):
+    def _rows_to_detections(self, rows: List[Any]) -> List[Any]:
+        """Rebuild detection records from cached rows"""
+        if self.detection_type is None:
+            return rows
+        return [self.detection_type.from_row(row) for row in rows]
+    
+    def _cache_inference_result(self, frame, detections: List[Any], frame_hash: Optional[str] = None):
         """Cache inference result for future use"""
         if not self.redis_connected:
             return
             
         try:
             # Create frame hash
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            frame_hash = create_frame_hash(buffer.tobytes())
+            if frame_hash is None:
+                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+                frame_hash = create_frame_hash(buffer.tobytes())
             
             # Cache result
             cache_data = {
                 'timestamp': time.time(),
-                'detections': detections,
+                'detections': [list(detection) for detection in detections],  # compact rows
                 'device_id': self.device_id
             }
             
@@ -223,83 +326,68 @@ class RedisDetectionHandler:
         except Exception as e:
             logger.error(f"Cache storage error: {e}")
     
-    def _extract_weapon_detections(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Extract weapon-related detections"""
-        weapon_labels = {"weapon", "pistol", "rifle", "knife"}
-        weapon_detections = []
-        
-        for detection in detections:
-            obj_class = detection.get('class', '').strip().lower()
-            confidence = detection.get('confidence', 0)
-            
-            if obj_class in weapon_labels and confidence >= 0.4:
-                weapon_detections.append({
-                    'class': obj_class,
-                    'confidence': confidence,
-                    'box': detection.get('box', []),
-                    'timestamp': time.time()
-                })
-        
-        return weapon_detections
+    def _extract_weapon_detections(self, detections: List[Any]) -> List[Any]:
+        """Extract weapon-related detections (the records themselves, no copies)"""
+        return [
+            detection for detection in detections
+            if detection.is_weapon and detection.confidence >= 0.4
+        ]
     
-    def _publish_detection_event(self, weapon_detections: List[Dict[str, Any]], all_detections: List[Dict[str, Any]]):
-        """Publish detection event to Redis"""
-        if not self.redis_connected or not weapon_detections:
+    def _publish_detection_event(self, weapon_detections: List[Any], all_detections: List[Any]):
+        """Publish detection event to Redis (coalesced - see EVENT_COALESCING_CONFIG)"""
+        # No connection check - the manager buffers events while Redis is unreachable
+        if not weapon_detections:
             return
             
         try:
             # Calculate detection metadata
-            max_confidence = max(det['confidence'] for det in weapon_detections)
-            detected_objects = list(set(det['class'] for det in weapon_detections))
+            max_confidence = max(det.confidence for det in weapon_detections)
+            objects = frozenset(det.label for det in weapon_detections)
             
-            detection_event = {
-                'objects': detected_objects,
-                'max_confidence': max_confidence,
-                'detection_count': len(weapon_detections),
-                'all_detections': all_detections,
-                'coordinates': self.device_config.get('location', 'Unknown'),
-                'device_type': self.device_config.get('device_type', 'unknown')
-            }
+            now = time.time()
+            reason = self.coalescer.observe(objects, max_confidence, now)
+            if reason is None:
+                return
             
-            self.redis_manager.publish_detection(detection_event)
+            detection_event = detection_event_data(objects, max_confidence, weapon_detections, all_detections,
+                                                   self.device_config, reason, self.coalescer.suppressed_since_emit)
+            
+            # State only advances once the event is out - a failed publish retries next frame
+            if self.redis_manager.publish_detection(detection_event):
+                self.coalescer.published(objects, max_confidence, now, reason)
             
         except Exception as e:
             logger.error(f"Failed to publish detection event: {e}")
     
-    def _analyze_coordinated_response(self, weapon_detections: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze coordination level with other devices"""
+    def _analyze_coordinated_response(self, weapon_detections: List[Any]) -> Dict[str, Any]:
+        """Analyze coordination level with other devices (O(1) fleet-wide, O(neighbours) with a fix)"""
+        current_time = time.time()
         with self.detection_coordination_lock:
-            # Count total devices currently detecting
-            total_detecting_devices = 1  # This device
-            cooperating_devices = []
-            
-            current_time = time.time()
-            
-            for device_id, remote_detection in self.remote_detections.items():
-                # Only count recent detections (within last 30 seconds)
-                if current_time - remote_detection['timestamp'] <= 30:
-                    total_detecting_devices += 1
-                    cooperating_devices.append({
-                        'device_id': device_id,
-                        'objects': remote_detection['objects'],
-                        'confidence': remote_detection['confidence'],
-                        'age': current_time - remote_detection['timestamp']
-                    })
-            
-            # Determine coordination level
-            if total_detecting_devices >= 3:
-                coordination_level = 'HIGH'  # 3+ devices detecting
-            elif total_detecting_devices >= 2:
-                coordination_level = 'MEDIUM'  # 2 devices detecting
-            else:
-                coordination_level = 'LOW'  # Only this device
-            
-            return {
-                'level': coordination_level,
-                'devices': cooperating_devices,
-                'total_devices': total_detecting_devices,
-                'analysis_timestamp': current_time
-            }
+            # This device plus every remote device not known to be out of range, detecting in the last 30 s
+            total_detecting_devices = 1 + self._count_active_remote(current_time)
+        
+        return coordination_analysis(total_detecting_devices, current_time)
+    
+    def get_cooperating_devices(self) -> List[Dict[str, Any]]:
+        """Per-device detail for the current coordination window (built on demand)"""
+        current_time = time.time()
+        distant = self.distant_devices
+        with self.detection_coordination_lock:
+            return [
+                {
+                    'device_id': device_id,
+                    'objects': remote_detection['objects'],
+                    'confidence': remote_detection['confidence'],
+                    'age': current_time - remote_detection['timestamp']
+                }
+                for device_id, remote_detection in self.remote_detections.active_devices(current_time)
+                if distant is None or device_id not in distant
+            ]
+    
+    def active_remote_count(self) -> int:
+        """Remote devices currently inside the coordination window"""
+        with self.detection_coordination_lock:
+            return self._count_active_remote(time.time())
     
     def _calculate_cache_hit_rate(self) -> float:
         """Calculate cache hit rate percentage"""
@@ -315,19 +403,31 @@ class RedisDetectionHandler:
                 'device_id': self.device_id,
                 'redis_connected': self.redis_connected,
                 'active_remote_detections': len(self.remote_detections),
-                'remote_devices': list(self.remote_detections.keys()),
+                'remote_devices': self.remote_detections.devices(),
+                'nearby_devices': len(self.nearby_devices) if self.nearby_devices is not None else None,
+                'distant_devices': len(self.distant_devices) if self.distant_devices is not None else None,
+                'coordination_radius_m': GEO_CONFIG['radius_m'],
+                'last_alarm': self.last_alarm,
                 'cache_performance': {
                     'hits': self.inference_cache_hits,
                     'misses': self.inference_cache_misses,
                     'hit_rate': self._calculate_cache_hit_rate()
                 },
-                'last_heartbeat': self.last_redis_heartbeat
+                'last_heartbeat': self.last_redis_heartbeat,
+                'detection_events': self.coalescer.get_stats(),
+                'redis_latency_ms': self.redis_manager.get_latency_stats() if self.redis_manager else {},
+                'redis_connection': self.redis_manager.get_connection_stats() if self.redis_manager else {},
+                'replication': self.redis_manager.replicator.get_stats() if self.redis_manager.replicator else {},
+                'event_stream': self.redis_manager.get_stream_stats() if self.redis_manager else {}
             }
     
     def cleanup(self):
         """Clean up Redis resources"""
         try:
             if self.redis_manager:
+                for operation, stats in self.redis_manager.get_latency_stats().items():
+                    logger.info(f"⏱️ Redis {operation}: p50 {stats['p50_ms']:.1f}ms "
+                                f"p95 {stats['p95_ms']:.1f}ms max {stats['max_ms']:.1f}ms ({stats['count']} calls)")
                 self.redis_manager.cleanup()
             logger.info(f"🧹 Redis detection handler cleanup completed for {self.device_id}")
         except Exception as e:
@@ -339,9 +439,8 @@ def enhance_detection_with_redis(original_process_detections_func):
     def wrapper(self, frame, detections):
         # If Redis handler exists, use it
         if hasattr(self, 'redis_handler') and self.redis_handler:
-            enhanced_detections = self.redis_handler.process_detection_with_redis(
-                frame, detections, lambda f: detections  # Use existing detections
-            )
+            # Existing detections are fresh - coordination only, no cache round trip
+            enhanced_detections = self.redis_handler.process_detection_with_redis(frame, detections)
             return original_process_detections_func(self, frame, enhanced_detections)
         else:
             # Fallback to original processing
@@ -1,16 +1,38 @@
 # Redis Proxy Add-on for server.py
 # Add this to your existing server.py to proxy Redis through port 8000
 
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 import redis
 import json
+import base64
 
 # Add this to your server.py imports
 # import redis
 
 # Add this Redis client to your server.py
+# Pooled connections shared by every request thread; subscribers hold one each while streaming
+PROXY_CONFIG = {
+    'max_connections': 64,
+    'max_pipeline_commands': 500,
+    'subscribe_keepalive': 15,  # seconds between SSE keep-alive comments
+    # Commands a device may send through /redis/pipeline (no admin/keyspace-wide commands)
+    'allowed_commands': {
+        'GET', 'SET', 'SETEX', 'DEL', 'EXISTS', 'EXPIRE', 'TTL', 'INCR', 'INCRBY',
+        'HGET', 'HSET', 'HGETALL', 'HINCRBY', 'HDEL',
+        'LPUSH', 'LTRIM', 'LRANGE', 'LLEN',
+        'ZADD', 'ZREM', 'ZRANGE', 'ZRANGEBYSCORE', 'ZREMRANGEBYSCORE', 'ZCARD',
+        'PFADD', 'PFCOUNT', 'XADD', 'XRANGE', 'XREVRANGE', 'XLEN', 'PUBLISH', 'PING'
+    }
+}
+
 try:
-    redis_client = redis.Redis(host='localhost', port=6379, decode_responses=True)
+    redis_pool = redis.ConnectionPool(host='localhost', port=6379, decode_responses=True,
+                                      max_connections=PROXY_CONFIG['max_connections'])
+    redis_client = redis.Redis(connection_pool=redis_pool)
+    # Subscribers may receive binary (msgpack) payloads - read them undecoded
+    redis_raw_pool = redis.ConnectionPool(host='localhost', port=6379, decode_responses=False,
+                                          max_connections=PROXY_CONFIG['max_connections'])
+    redis_raw_client = redis.Redis(connection_pool=redis_raw_pool)
     REDIS_AVAILABLE = True
     print("✅ Redis proxy enabled")
 except:
@@ -81,6 +103,93 @@ def redis_publish():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/redis/pipeline', methods=['POST'])
+def redis_pipeline():
+    """Run a list of Redis commands in one pipelined round trip
+    
+    Body: {"commands": [["HSET", "key", "field", "value"], ["EXPIRE", "key", 120]],
+           "transaction": false}
+    Results come back in command order; a failing command returns {"error": ...}
+    in its slot without aborting the others (unless transaction is true).
+    """
+    if not REDIS_AVAILABLE:
+        return jsonify({'error': 'Redis not available'}), 503
+    
+    try:
+        data = request.get_json()
+        commands = data.get('commands') or []
+        
+        if not isinstance(commands, list) or len(commands) > PROXY_CONFIG['max_pipeline_commands']:
+            return jsonify({'error': f"commands must be a list of at most {PROXY_CONFIG['max_pipeline_commands']}"}), 400
+        
+        for command in commands:
+            if not isinstance(command, list) or not command:
+                return jsonify({'error': 'each command must be a non-empty list'}), 400
+            if str(command[0]).upper() not in PROXY_CONFIG['allowed_commands']:
+                return jsonify({'error': f"command not allowed: {command[0]}"}), 403
+        
+        pipe = redis_client.pipeline(transaction=bool(data.get('transaction', False)))
+        for command in commands:
+            pipe.execute_command(str(command[0]).upper(), *command[1:])
+        results = pipe.execute(raise_on_error=False)
+        
+        return jsonify({
+            'status': 'success',
+            'results': [{'error': str(r)} if isinstance(r, Exception) else r for r in results]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _sse_payload(data):
+    """Text payloads pass through; binary ones (msgpack events) are base64-encoded"""
+    if isinstance(data, bytes):
+        try:
+            return {'data': data.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {'data': base64.b64encode(data).decode('ascii'), 'encoding': 'base64'}
+    return {'data': data}
+
+@app.route('/redis/subscribe', methods=['GET'])
+def redis_subscribe():
+    """Stream channel messages as server-sent events
+    
+    /redis/subscribe?channel=arcis:detections:events&channel=arcis:alarms:state
+    (or pattern=arcis:*). Each message is an SSE "message" event whose data is
+    {"channel": ..., "data": ...}; comment lines keep idle connections open.
+    """
+    if not REDIS_AVAILABLE:
+        return jsonify({'error': 'Redis not available'}), 503
+    
+    channels = request.args.getlist('channel')
+    patterns = request.args.getlist('pattern')
+    if not channels and not patterns:
+        return jsonify({'error': 'channel or pattern required'}), 400
+    
+    def generate():
+        pubsub = redis_raw_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            if channels:
+                pubsub.subscribe(*channels)
+            if patterns:
+                pubsub.psubscribe(*patterns)
+            yield ": subscribed\n\n"
+            
+            while True:
+                message = pubsub.get_message(timeout=PROXY_CONFIG['subscribe_keepalive'])
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                if message['type'] not in ('message', 'pmessage'):
+                    continue
+                event = {'channel': message['channel'].decode('utf-8'), **_sse_payload(message['data'])}
+                yield f"event: message\ndata: {json.dumps(event)}\n\n"
+        finally:
+            # Runs when the client disconnects (generator closed) - return the connection to the pool
+            pubsub.close()
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # Add this to test the proxy
 if __name__ == '__main__':
     print("🧪 Testing Redis proxy...")
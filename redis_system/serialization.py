@@ -0,0 +1,141 @@
+# Pluggable Serialization Layer for ARCIS System
+import os
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Serializer selection ('auto' = orjson when installed, stdlib json otherwise)
+SERIALIZATION_CONFIG = {
+    'default': os.environ.get('ARCIS_SERIALIZER', 'auto'),
+    # Device-to-device detection events; 'msgpack' needs every peer on this version
+    'device_events': os.environ.get('ARCIS_EVENT_FORMAT', 'auto')
+}
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Fallback for types JSON/msgpack do not know (sets, numpy scalars, records)"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, tuple):  # detection records - the compact row json writes natively
+        return list(obj)
+    if hasattr(obj, 'item'):  # numpy scalar
+        return obj.item()
+    if hasattr(obj, 'tolist'):  # numpy array
+        return obj.tolist()
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+class JsonSerializer:
+    """Standard library json"""
+    name = 'json'
+    binary = False
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, default=_to_builtin, separators=(',', ':'))
+
+    def dumps_text(self, obj: Any) -> str:
+        return self.dumps(obj)
+
+    def loads(self, data: Any) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson - JSON compatible output, several times faster than json"""
+    name = 'orjson'
+    binary = False  # output is UTF-8 JSON, safe on decode_responses connections
+
+    def __init__(self):
+        self.options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_to_builtin, option=self.options)
+
+    def dumps_text(self, obj: Any) -> str:
+        return self.dumps(obj).decode('utf-8')
+
+    def loads(self, data: Any) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """msgpack - compact binary frames for device-to-device channels"""
+    name = 'msgpack'
+    binary = True  # needs a connection with decode_responses=False
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=_to_builtin, use_bin_type=True)
+
+    def dumps_text(self, obj: Any) -> str:
+        raise TypeError("msgpack output is binary - use a JSON serializer for text fields")
+
+    def loads(self, data: Any) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_SERIALIZERS: Dict[str, Any] = {}
+
+
+def get_serializer(name: Optional[str] = None):
+    """Return a shared serializer instance ('auto', 'orjson', 'json' or 'msgpack')"""
+    name = (name or SERIALIZATION_CONFIG['default']).lower()
+    if name == 'auto':
+        name = 'orjson' if ORJSON_AVAILABLE else 'json'
+
+    if name == 'orjson' and not ORJSON_AVAILABLE:
+        logger.warning("⚠️ orjson not installed - falling back to json")
+        name = 'json'
+    elif name == 'msgpack' and not MSGPACK_AVAILABLE:
+        logger.warning("⚠️ msgpack not installed - falling back to JSON")
+        name = 'orjson' if ORJSON_AVAILABLE else 'json'
+
+    if name not in _SERIALIZERS:
+        if name == 'orjson':
+            _SERIALIZERS[name] = OrjsonSerializer()
+        elif name == 'msgpack':
+            _SERIALIZERS[name] = MsgpackSerializer()
+        elif name == 'json':
+            _SERIALIZERS[name] = JsonSerializer()
+        else:
+            raise ValueError(f"Unknown serializer: {name}")
+    return _SERIALIZERS[name]
+
+
+def decode_event(data: Any) -> Any:
+    """Decode a device event in either JSON or msgpack (mixed fleets during rollout)"""
+    if isinstance(data, str):
+        return get_serializer().loads(data)
+    if data[:1] in (b'{', b'['):
+        return get_serializer().loads(data)
+    return get_serializer('msgpack').loads(data)
+
+
+# Module-level shortcuts for the default serializer
+def dumps(obj: Any):
+    return get_serializer().dumps(obj)
+
+
+def dumps_text(obj: Any) -> str:
+    return get_serializer().dumps_text(obj)
+
+
+def loads(data: Any) -> Any:
+    return get_serializer().loads(data)
@@ -42,6 +42,10 @@ def install_redis_dependencies():
     if not run_command("pip3 install redis", "Installing Python Redis client"):
         return False
     
+    # Optional - serialization.py falls back to stdlib json without it
+    if not run_command("pip3 install orjson", "Installing optional orjson serializer"):
+        logger.warning("⚠️ orjson not installed - using stdlib json")
+    
     logger.info("✅ Redis dependencies installed successfully")
     return True
 
@@ -290,6 +294,7 @@ def main():
         logger.info("   1. Run: python3 test_arcis_redis.py")
         logger.info("   2. Start your ARCIS detection scripts")
         logger.info("   3. Monitor Redis with: redis-cli monitor")
+        logger.info("   4. Load test: python3 redis_system/benchmark_redis_load.py 50 10")
         return True
     else:
         logger.error("❌ Setup incomplete - please check errors above")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test Script for the compact inference cache and history layout
+"""
+
+import fnmatch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.compact_layout import (
+    LISTPACK_VALUE_LIMIT, cache_slot, pack_detection_rows, unpack_detection_rows, history_entry,
+    expand_history_entry
+)
+from redis_system.redis_config import REDIS_KEYS, RedisManager
+
+
+class ReportPipeline:
+    """Answers MEMORY USAGE / OBJECT ENCODING / HLEN from the client's table"""
+
+    def __init__(self, client):
+        self.client = client
+        self.results = []
+
+    def execute_command(self, *args):
+        self.results.append(100)
+
+    def object(self, subcommand, key):
+        self.results.append(self.client.encodings[key])
+
+    def hlen(self, key):
+        self.results.append(4)
+
+    def execute(self, raise_on_error=True):
+        return self.results
+
+
+class ReportClient:
+    def __init__(self, encodings):
+        self.encodings = encodings
+
+    def scan_iter(self, match=None, count=None):
+        return iter(key for key in self.encodings if fnmatch.fnmatchcase(key, match))
+
+    def pipeline(self, transaction=True):
+        return ReportPipeline(self)
+
+
+def test_detection_rows_round_trip():
+    rows = [['pistol', 0.8731, [80, 120, 220, 330], 'vm_google_vision'],
+            ['knife', 0.55, [10, 20, 30, 40], 'local']]
+    data = pack_detection_rows(1700000000.25, rows)
+
+    timestamp, unpacked = unpack_detection_rows(data)
+    assert abs(timestamp - 1700000000.25) < 0.001
+    assert unpacked == rows
+    # Stays within the default listpack value limit for a typical hit
+    assert len(data) <= LISTPACK_VALUE_LIMIT
+
+    # ...but not for a crowded frame - that bucket becomes a hashtable
+    crowded = pack_detection_rows(1700000000.25, rows * 3)
+    assert len(crowded) > LISTPACK_VALUE_LIMIT
+
+
+def test_unknown_source_and_empty_rows():
+    timestamp, rows = unpack_detection_rows(pack_detection_rows(5.0, [['rifle', 0.9, [1, 2, 3, 4]]]))
+    assert rows == [['rifle', 0.9, [1, 2, 3, 4], '']]
+    assert unpack_detection_rows(pack_detection_rows(5.0, [])) == (5.0, [])
+
+
+def test_cache_slot_groups_by_ttl_and_prefix():
+    frame_hash = 'ab' + '0123456789abcdef' + 'ffff'
+    assert cache_slot(frame_hash, 61.0, 30) == (2, 'ab', '0123456789abcdef')
+    assert cache_slot(frame_hash, 89.9, 30)[0] == 2
+
+
+def test_history_entry_round_trip():
+    event = {'device_id': 'jetson1', 'timestamp': 10.0, 'detection_id': 'jetson1_10',
+             'objects': ['pistol'], 'max_confidence': 0.8, 'detection_count': 1,
+             'all_detections': [{'class': 'pistol'}], 'coordinates': 'Gate A'}
+    entry = history_entry(event)
+    assert 'all_detections' not in entry and 'device_id' not in entry
+
+    expanded = expand_history_entry(entry, 'jetson1')
+    assert expanded == {key: value for key, value in event.items() if key != 'all_detections'}
+
+
+def test_memory_report_counts_actual_encodings():
+    cache = REDIS_KEYS['inference_cache']
+    manager = RedisManager('test_device')
+    manager.connected = True
+    manager.redis_client = ReportClient({f"{cache}1:ab": 'listpack', f"{cache}1:cd": 'hashtable',
+                                         f"{cache}2:ab": 'listpack'})
+    report = manager.get_memory_report()
+    assert report['inference_cache']['encodings'] == {'listpack': 2, 'hashtable': 1}
+    assert report['inference_cache']['sampled_keys'] == 3
+
+
+def run_tests():
+    print("🚀 COMPACT LAYOUT TESTS")
+    test_detection_rows_round_trip()
+    test_unknown_source_and_empty_rows()
+    test_cache_slot_groups_by_ttl_and_prefix()
+    test_history_entry_round_trip()
+    test_memory_report_counts_actual_encodings()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
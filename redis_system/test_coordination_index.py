@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test Script for the expiry-ordered coordination window
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.coordination_index import CoordinationWindow
+
+
+def record(timestamp, objects=('pistol',)):
+    return {'objects': list(objects), 'confidence': 0.8, 'timestamp': timestamp, 'detection_id': 'x'}
+
+
+def test_counts_follow_the_window():
+    window = CoordinationWindow(active_window=30.0, retention=60.0)
+    window.update('jetson1', record(100.0))
+    window.update('pi1', record(110.0))
+
+    assert window.active_count(120.0) == 2
+    # jetson1 leaves the coordination window but is still retained
+    assert window.active_count(131.0) == 1
+    assert 'jetson1' in window
+    # Past retention the record itself is dropped
+    assert window.expire(161.0) == ['jetson1']
+    assert 'jetson1' not in window
+    assert window.active_count(171.0) == 0
+    assert window.devices() == []
+
+
+def test_refresh_supersedes_older_heap_entries():
+    window = CoordinationWindow(active_window=30.0, retention=60.0)
+    window.update('jetson1', record(100.0))
+    window.update('jetson1', record(125.0, objects=('knife',)))
+
+    # The first entry's deadlines pass without evicting the refreshed device
+    assert window.active_count(140.0) == 1
+    assert window.expire(170.0) == []
+    assert window.entries['jetson1']['objects'] == ['knife']
+    assert len(window) == 1
+
+
+def test_retained_device_rejoins_window():
+    window = CoordinationWindow(active_window=30.0, retention=60.0)
+    window.update('pi1', record(100.0))
+    assert window.active_count(135.0) == 0
+
+    window.update('pi1', record(140.0))
+    assert window.active_count(141.0) == 1
+    assert [device for device, _ in window.active_devices(141.0)] == ['pi1']
+
+
+def test_many_devices_expire_in_order():
+    window = CoordinationWindow(active_window=30.0, retention=60.0)
+    for i in range(500):
+        window.update(f"device{i}", record(float(i)))
+
+    # Devices 470-499 are inside the window; 0-439 are already past retention
+    assert window.active_count(500.0) == 30
+    assert len(window) == 60
+    assert len(window.expire(530.0)) == 30
+    assert sorted(window.devices()) == sorted(f"device{i}" for i in range(470, 500))
+
+
+def test_count_within_neighbours():
+    window = CoordinationWindow(active_window=30.0, retention=60.0)
+    for device in ('gate_a', 'gate_b', 'lobby', 'far_site'):
+        window.update(device, record(100.0))
+
+    assert window.active_count_within(frozenset({'gate_a', 'gate_b', 'parking'}), 110.0) == 2
+    assert window.active_count_within(frozenset(), 110.0) == 0
+    # Past the window nothing counts, neighbour or not
+    assert window.active_count_within(frozenset({'gate_a'}), 131.0) == 0
+
+
+def run_tests():
+    print("🚀 COORDINATION WINDOW TESTS")
+    test_counts_follow_the_window()
+    test_refresh_supersedes_older_heap_entries()
+    test_retained_device_rejoins_window()
+    test_many_devices_expire_in_order()
+    test_count_within_neighbours()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test Script for the edge-to-central replicator
+Local and central Redis are in-memory stand-ins - no Redis server needed
+"""
+
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import redis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.edge_replicator import EdgeReplicator
+from redis_system.redis_config import REDIS_KEYS, REDIS_INDEXES, GEO_KEYS
+from redis_system.serialization import get_serializer
+
+STREAM_KEY = f"{REDIS_KEYS['detections']}stream"
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        if self.client.fail_with is not None:
+            raise self.client.fail_with
+        for name, args, kwargs in self.commands:
+            self.client.log.append((self.client.name, name, args, kwargs))
+            if name == 'set':
+                self.client.values[args[0]] = args[1]
+        return [True] * len(self.commands)
+
+
+class FakeClient:
+    """Records every write in a log shared between the local and central stand-ins"""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.values = {}
+        self.hashes = {}
+        self.stream = []
+        self.fail_with = None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.log.append((self.name, 'set', (key, value), {}))
+        return True
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def xrevrange(self, key, count=None):
+        return list(reversed(self.stream))[:count]
+
+    def xack(self, key, group, *entry_ids):
+        self.log.append((self.name, 'xack', entry_ids, {}))
+        return len(entry_ids)
+
+
+def make_replicator():
+    log = []
+    local = FakeClient('local', log)
+    central = FakeClient('central', log)
+    manager = SimpleNamespace(device_id='edge1', stream_key=STREAM_KEY, connected=True,
+                              redis_client=local, event_client=local,
+                              event_serializer=get_serializer())
+    replicator = EdgeReplicator(manager)
+    replicator.central_client = replicator.central_event_client = central
+    return replicator, local, central, log
+
+
+def entry(device_id, ms, objects=('pistol',)):
+    event = {'device_id': device_id, 'timestamp': ms / 1000.0, 'detection_id': f"{device_id}_{ms}",
+             'objects': list(objects), 'max_confidence': 0.9, 'coordinates': 'Gate'}
+    return f"{ms}-0".encode(), {b'device_id': device_id.encode(), b'data': json.dumps(event).encode()}
+
+
+def test_connect_reconciles_the_registry_entry():
+    replicator, local, central, log = make_replicator()
+    device_key = f"{REDIS_KEYS['device_status']}edge1"
+    local.hashes[device_key] = {'last_seen': '1000.0', 'status': 'active',
+                                'latitude': '32.1', 'longitude': '34.8', 'fix_time': '990.0'}
+
+    assert replicator._connect_central()
+    writes = [(name, args) for client, name, args, _ in log if client == 'central']
+    assert ('hset', (device_key,)) in writes
+    assert ('zadd', (REDIS_INDEXES['devices'], {'edge1': 1000.0})) in writes
+    assert ('geoadd', (GEO_KEYS['positions'], [34.8, 32.1, 'edge1'])) in writes
+    assert replicator.status_pushes == 1
+
+
+def test_ack_follows_the_central_write():
+    replicator, local, central, log = make_replicator()
+    now_ms = int(time.time() * 1000)
+    entries = [entry('edge1', now_ms - 250), entry('pi2', now_ms - 200), entry('edge1', now_ms - 100)]
+
+    replicator._replicate_batch(entries)
+    order = [(client, name) for client, name, _, _ in log]
+    assert order.index(('local', 'xack')) > max(i for i, step in enumerate(order) if step[0] == 'central')
+    # Inbound copies of other devices' events are acked but never echoed back to central
+    assert sum(1 for client, name, _, _ in log if client == 'central' and name == 'xadd') == 2
+    assert replicator.replicated_events == 2
+    assert log[-1][2] == tuple(entry_id for entry_id, _ in entries)
+
+    # A failed central write leaves the batch unacknowledged for the replay
+    log.clear()
+    central.fail_with = redis.ConnectionError('uplink down')
+    try:
+        replicator._replicate_batch(entries)
+        assert False, "expected ConnectionError"
+    except redis.ConnectionError:
+        pass
+    assert not any(name == 'xack' for _, name, _, _ in log)
+
+
+def test_lag_is_measured_from_the_oldest_entry():
+    replicator, local, central, log = make_replicator()
+    now_ms = int(time.time() * 1000)
+    replicator._replicate_batch([entry('edge1', now_ms - 5000), entry('edge1', now_ms - 10)])
+    assert 5000 <= replicator.last_lag_ms < 6000
+    replicator._replicate_batch([entry('edge1', now_ms - 10)])
+    assert replicator.last_lag_ms < 1000
+    assert replicator.max_lag_ms >= 5000
+    stats = replicator.get_stats()
+    assert stats['batches'] == 2 and stats['replicated_events'] == 3
+
+
+def test_first_connect_saves_the_inbound_cursor():
+    replicator, local, central, log = make_replicator()
+    central.stream = [entry('pi2', 1000), entry('pi3', 2000)]
+
+    # Nothing copied yet - the cursor is still saved at the central stream's last entry
+    assert replicator._inbound_cursor() == '2000-0'
+    assert local.values[replicator.inbound_cursor_key] == '2000-0'
+    # A reconnect resumes there instead of skipping to '$'
+    central.stream.append(entry('pi2', 3000))
+    assert replicator._inbound_cursor() == '2000-0'
+
+    # Copied entries advance it; own entries are skipped
+    assert replicator._copy_inbound([entry('pi2', 3000), entry('edge1', 3500)]) == '3500-0'
+    assert replicator.inbound_events == 1
+    assert local.values[replicator.inbound_cursor_key] == '3500-0'
+
+
+def test_empty_central_stream_starts_from_the_beginning():
+    replicator, local, central, log = make_replicator()
+    assert replicator._inbound_cursor() == '0-0'
+
+
+def run_tests():
+    print("🚀 EDGE REPLICATOR TESTS")
+    test_connect_reconciles_the_registry_entry()
+    test_ack_follows_the_central_write()
+    test_lag_is_measured_from_the_oldest_entry()
+    test_first_connect_saves_the_inbound_cursor()
+    test_empty_central_stream_starts_from_the_beginning()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test Script for outgoing detection event coalescing
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.event_coalescing import EventCoalescer
+
+PISTOL = frozenset({'pistol'})
+
+
+def emit(coalescer, objects, confidence, now):
+    """One weapon frame; publishes (successfully) whenever there is a reason"""
+    reason = coalescer.observe(objects, confidence, now)
+    if reason:
+        coalescer.published(objects, confidence, now, reason)
+    return reason
+
+
+def test_first_event_is_a_new_incident():
+    coalescer = EventCoalescer()
+    assert emit(coalescer, PISTOL, 0.8, 100.0) == 'new_incident'
+    # Same state a moment later - suppressed
+    assert emit(coalescer, PISTOL, 0.8, 100.1) is None
+    assert coalescer.suppressed == 1 and coalescer.suppressed_since_emit == 1
+
+
+def test_new_object_classes():
+    coalescer = EventCoalescer()
+    emit(coalescer, PISTOL, 0.8, 100.0)
+    assert emit(coalescer, frozenset({'pistol', 'knife'}), 0.8, 100.1) == 'new_classes'
+    # A subset of what was published is not a change
+    assert emit(coalescer, PISTOL, 0.8, 100.2) is None
+
+
+def test_confidence_delta():
+    coalescer = EventCoalescer()
+    emit(coalescer, PISTOL, 0.6, 100.0)
+    assert emit(coalescer, PISTOL, 0.74, 100.1) is None
+    assert emit(coalescer, PISTOL, 0.75, 100.2) == 'confidence_jump'
+    # Drops count too
+    assert emit(coalescer, PISTOL, 0.59, 100.3) == 'confidence_jump'
+
+
+def test_heartbeat_for_ongoing_detection():
+    coalescer = EventCoalescer()
+    emit(coalescer, PISTOL, 0.8, 100.0)
+    assert emit(coalescer, PISTOL, 0.8, 101.9) is None
+    assert emit(coalescer, PISTOL, 0.8, 102.0) == 'heartbeat'
+    assert coalescer.emit_reasons == {'new_incident': 1, 'heartbeat': 1}
+
+
+def test_gap_resets_the_incident():
+    coalescer = EventCoalescer()
+    emit(coalescer, PISTOL, 0.8, 100.0)
+    # Weapon frames keep the incident open past the heartbeat...
+    assert emit(coalescer, PISTOL, 0.8, 104.0) == 'heartbeat'
+    # ...but more than 5 s without any weapon frame starts a new one
+    assert emit(coalescer, PISTOL, 0.8, 109.5) == 'new_incident'
+
+
+def test_failed_publish_does_not_advance_state():
+    coalescer = EventCoalescer()
+    assert coalescer.observe(PISTOL, 0.8, 100.0) == 'new_incident'  # publish failed - no published()
+    assert coalescer.observe(PISTOL, 0.8, 100.1) == 'new_incident'
+    assert coalescer.emitted == 0
+
+
+def test_frames_during_a_background_publish_are_suppressed():
+    coalescer = EventCoalescer()
+    assert coalescer.observe(PISTOL, 0.8, 100.0) == 'new_incident'
+    coalescer.in_flight = True
+    assert coalescer.observe(frozenset({'pistol', 'knife'}), 0.8, 100.1) is None
+    coalescer.published(PISTOL, 0.8, 100.0, 'new_incident')
+    coalescer.in_flight = False
+    assert coalescer.observe(frozenset({'pistol', 'knife'}), 0.8, 100.2) == 'new_classes'
+
+
+def offline_handler(device_id):
+    """Handler without Redis services - publish_detection is replaced per test"""
+    pytest.importorskip('cv2')  # imported by the handler module
+    from redis_system.redis_detection_handler import RedisDetectionHandler
+
+    class OfflineHandler(RedisDetectionHandler):
+        def _initialize_redis(self):
+            return False
+
+    return OfflineHandler(device_id, {'location': 'Gate'})
+
+
+def weapon(label='pistol', confidence=0.8):
+    return SimpleNamespace(label=label, confidence=confidence, is_weapon=True,
+                           to_dict=lambda: {'label': label, 'confidence': confidence})
+
+
+def test_handler_retries_after_failed_publish():
+    handler = offline_handler('test_device')
+    published = []
+    handler.redis_manager.publish_detection = lambda event: False
+    handler._publish_detection_event([weapon()], [weapon()])
+    assert handler.coalescer.emitted == 0
+
+    handler.redis_manager.publish_detection = lambda event: published.append(event) or True
+    handler._publish_detection_event([weapon()], [weapon()])
+    assert len(published) == 1 and published[0]['emit_reason'] == 'new_incident'
+    handler._publish_detection_event([weapon()], [weapon()])
+    assert len(published) == 1
+    assert handler.get_coordination_status()['detection_events']['suppressed'] == 1
+
+
+def run_tests():
+    print("🚀 EVENT COALESCING TESTS")
+    test_first_event_is_a_new_incident()
+    test_new_object_classes()
+    test_confidence_delta()
+    test_heartbeat_for_ongoing_detection()
+    test_gap_resets_the_incident()
+    test_failed_publish_does_not_advance_state()
+    test_frames_during_a_background_publish_are_suppressed()
+    test_handler_retries_after_failed_publish()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
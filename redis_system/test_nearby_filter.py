@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test Script for radius-limited coordination and nearby alarms
+Only devices with a known fix outside the radius are excluded - no Redis server needed
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.async_redis_handler import AsyncRedisDetectionHandler
+from redis_system.coordination_index import CoordinationWindow
+
+
+def remote_event(device_id):
+    return {'device_id': device_id, 'objects': ['pistol'], 'max_confidence': 0.9,
+            'timestamp': time.time(), 'detection_id': f"{device_id}_1"}
+
+
+def place(manager, nearby, located):
+    """Stand-in geo queries for a manager that has a fix"""
+    manager.location = (32.1, 34.8, time.time())
+    manager.get_nearby_devices = lambda radius_m=None: [(device_id, 100.0) for device_id in nearby]
+    manager.get_located_devices = lambda: frozenset(located)
+
+
+def test_window_counts_everything_but_the_excluded():
+    window = CoordinationWindow()
+    for device_id in ('near', 'far', 'unknown'):
+        window.update(device_id, {'timestamp': 100.0})
+    assert window.active_count_excluding(frozenset({'far'}), 101.0) == 2
+    assert window.active_count_excluding(frozenset(), 101.0) == 3
+
+
+def test_async_handler_keeps_devices_without_a_fix():
+    async def scenario():
+        handler = AsyncRedisDetectionHandler('me', {})
+        manager = handler.redis_manager
+
+        async def nearby(radius_m=None):
+            return [('near', 120.0)]
+
+        async def located():
+            return frozenset({'me', 'near', 'far'})
+
+        manager.location = (32.1, 34.8, time.time())
+        manager.get_nearby_devices = nearby
+        manager.get_located_devices = located
+        await handler._refresh_nearby_devices()
+        assert handler.distant_devices == frozenset({'far'})
+
+        for device_id in ('near', 'far', 'unknown'):
+            handler._handle_remote_detection(remote_event(device_id))
+        assert sorted(handler.remote_detections.devices()) == ['near', 'unknown']
+        assert handler._analyze_coordinated_response()['level'] == 'HIGH'
+
+    asyncio.run(scenario())
+
+
+def test_async_handler_forwards_nearby_alarms():
+    received = []
+    handler = AsyncRedisDetectionHandler('me', {}, alarm_callback=received.append)
+    handler._handle_alarm({'alarm_code': 'WEAPON', 'source_device': 'near'})
+    handler._handle_alarm({'alarm_code': 'WEAPON', 'source_device': 'me'})  # own fan-out echo
+    assert [event['source_device'] for event in received] == ['near']
+    assert handler.get_coordination_status()['last_alarm']['source_device'] == 'near'
+
+
+def test_sync_handler_keeps_devices_without_a_fix():
+    pytest.importorskip('cv2')  # imported by the handler module
+    from redis_system.redis_detection_handler import RedisDetectionHandler
+
+    class OfflineHandler(RedisDetectionHandler):
+        def _initialize_redis(self):
+            return False
+
+        def _detection_subscriber(self):
+            pass
+
+    handler = OfflineHandler('me', {})
+    place(handler.redis_manager, nearby=['near'], located=['me', 'near', 'far'])
+    handler._refresh_nearby_devices()
+    assert handler.distant_devices == frozenset({'far'})
+
+    callbacks = []
+    handler.redis_manager.subscribe_to_detections = callbacks.append
+    RedisDetectionHandler._detection_subscriber(handler)
+    for device_id in ('near', 'far', 'unknown'):
+        callbacks[0](remote_event(device_id))
+    assert sorted(handler.remote_detections.devices()) == ['near', 'unknown']
+    assert handler.active_remote_count() == 2
+    assert sorted(d['device_id'] for d in handler.get_cooperating_devices()) == ['near', 'unknown']
+
+    # A failed geo query keeps the previous sets
+    handler.redis_manager.get_located_devices = lambda: None
+    handler._refresh_nearby_devices()
+    assert handler.distant_devices == frozenset({'far'})
+
+
+def run_tests():
+    print("🚀 NEARBY FILTER TESTS")
+    test_window_counts_everything_but_the_excluded()
+    test_async_handler_keeps_devices_without_a_fix()
+    test_async_handler_forwards_nearby_alarms()
+    test_sync_handler_keeps_devices_without_a_fix()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
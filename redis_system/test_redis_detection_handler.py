@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test Script for the threaded Redis detection handler's cache path
+The manager's cache calls are stand-ins - no Redis server needed
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runScripts.detection_types import Detection
+
+FRAME_HASH = 'ab' + '0' * 30
+
+
+def offline_handler():
+    """Connected as far as the handler can tell, with cache calls recorded"""
+    pytest.importorskip('cv2')  # imported by the handler module
+    from redis_system.redis_detection_handler import RedisDetectionHandler
+
+    class OfflineHandler(RedisDetectionHandler):
+        def _initialize_redis(self):
+            return False
+
+    handler = OfflineHandler('test_device', {}, detection_type=Detection)
+    handler.redis_manager.connected = True
+    handler.calls = []
+    handler.redis_manager.get_cached_inference = lambda frame_hash: handler.calls.append(('get', frame_hash))
+    handler.redis_manager.cache_inference_result = \
+        lambda frame_hash, result: handler.calls.append(('set', frame_hash)) or True
+    handler.redis_manager.publish_detection = lambda event: True
+    return handler
+
+
+def cv2_forbidden(*args, **kwargs):
+    raise AssertionError("frame was re-encoded")
+
+
+def test_fresh_detections_are_not_looked_up_or_re_encoded(monkeypatch):
+    handler = offline_handler()
+    from redis_system import redis_detection_handler
+    monkeypatch.setattr(redis_detection_handler.cv2, 'imencode', cv2_forbidden, raising=False)
+
+    detections = [Detection('pistol', 0.9, (1, 2, 3, 4), 'vm_google_vision')]
+    assert handler.process_detection_with_redis('frame', detections, frame_hash=FRAME_HASH) == detections
+    assert handler.calls == [('set', FRAME_HASH)]
+    assert handler.process_detection_with_redis('frame', detections) == detections
+    assert handler.calls == [('set', FRAME_HASH)]
+    assert handler.last_coordination['level'] == 'LOW'
+
+
+def test_inference_path_reuses_the_callers_hash(monkeypatch):
+    handler = offline_handler()
+    from redis_system import redis_detection_handler
+    monkeypatch.setattr(redis_detection_handler.cv2, 'imencode', cv2_forbidden, raising=False)
+
+    detections = [Detection('person', 0.8, (1, 2, 3, 4), 'vm_google_vision')]
+    result = handler.process_detection_with_redis('frame', [], lambda frame: detections, frame_hash=FRAME_HASH)
+    assert result == detections
+    assert handler.calls == [('get', FRAME_HASH), ('set', FRAME_HASH)]
+    assert handler.inference_cache_misses == 1
+
+
+def run_tests():
+    print("🚀 REDIS DETECTION HANDLER TESTS")
+    pytest.main([__file__, '-q'])
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test Script for the pluggable serialization layer
+Every backend must put the same payload on the wire after decode
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from redis_system.serialization import JsonSerializer, decode_event
+from runScripts.detection_types import Detection
+
+PAYLOAD = {
+    'timestamp': 1700000000.5,
+    'objects': frozenset({'pistol'}),
+    'detections': [Detection('pistol', 0.9, (1, 2, 3, 4), 'vm_google_vision'),
+                   Detection('person', 0.8, (5, 6, 7, 8))]
+}
+
+EXPECTED = {
+    'timestamp': 1700000000.5,
+    'objects': ['pistol'],
+    'detections': [['pistol', 0.9, [1, 2, 3, 4], 'vm_google_vision'],
+                   ['person', 0.8, [5, 6, 7, 8], '']]
+}
+
+
+def test_json_writes_detection_records_as_rows():
+    serializer = JsonSerializer()
+    decoded = serializer.loads(serializer.dumps(PAYLOAD))
+    assert decoded == EXPECTED
+    assert [Detection.from_row(row) for row in decoded['detections']] == PAYLOAD['detections']
+
+
+def test_orjson_matches_json():
+    pytest.importorskip("orjson")
+    from redis_system.serialization import OrjsonSerializer
+
+    serializer = OrjsonSerializer()
+    assert serializer.loads(serializer.dumps(PAYLOAD)) == EXPECTED
+    # Either encoder's bytes decode the same on a peer running the other
+    assert JsonSerializer().loads(serializer.dumps(PAYLOAD)) == EXPECTED
+    assert serializer.loads(JsonSerializer().dumps(PAYLOAD)) == EXPECTED
+
+
+def test_msgpack_matches_json():
+    pytest.importorskip("msgpack")
+    from redis_system.serialization import MsgpackSerializer
+
+    assert decode_event(MsgpackSerializer().dumps(PAYLOAD)) == EXPECTED
+
+
+def run_tests():
+    print("🚀 SERIALIZATION TESTS")
+    pytest.main([__file__, '-q'])
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
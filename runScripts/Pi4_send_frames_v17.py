@@ -1,11 +1,13 @@
+import time
+_PROCESS_START = time.perf_counter()  # t=0 for the startup profile
+
 import cv2
 import requests
 import numpy as np
 import threading
-import time
-import pygame
+import itertools
 import json
-from queue import Queue, Empty
+from queue import Queue, PriorityQueue, Empty, Full
 import logging
 from collections import deque
 import base64
@@ -13,25 +15,38 @@ from io import BytesIO
 import os
 import socketio
 import platform
-
-# Redis integration for enhanced coordination
+from concurrent.futures import ThreadPoolExecutor
+
+from alarm_audio import AlarmAudioActor
+from detection_types import Detection, detections_to_dicts
+from device_telemetry import DeviceTelemetrySampler
+from field_io import FieldIO
+from frame_pool import FramePool, encode_jpeg
+from inference_backends import CircuitBreaker, InferenceBackend, InferenceBackendError, InferenceRouter
+from startup_profiler import StartupProfiler
+from state_bus import StateBus
+from vision_batcher import localized_objects_to_detections
+
+# Fast JSON (orjson when installed) for upload form fields
 try:
-    from redis_system.redis_config import RedisManager
-    from redis_system.redis_detection_handler import RedisDetectionHandler
-    REDIS_AVAILABLE = True
-    print("✅ Redis integration available")
+    from redis_system.serialization import dumps_text
 except ImportError:
-    REDIS_AVAILABLE = False
-    print("⚠️ Redis not available - using basic WebSocket coordination")
+    dumps_text = json.dumps
 
-# Try to import Google Vision, fallback to VM inference if not available
-try:
-    from google.cloud import vision
-    GOOGLE_VISION_AVAILABLE = True
-    print("✅ Google Cloud Vision SDK available")
-except ImportError:
-    GOOGLE_VISION_AVAILABLE = False
-    print("⚠️ Google Cloud Vision SDK not installed - using VM inference (recommended)")
+# Optional subsystems (Redis, Google Vision SDK) are imported lazily on first use -
+# see load_redis_handler() / load_vision_sdk(). None means "not probed yet".
+REDIS_AVAILABLE = None
+RedisDetectionHandler = None
+GOOGLE_VISION_AVAILABLE = None
+vision = None
+
+# Headless mode: no preview window/overlays; ARCIS_AUDIO=0 also skips pygame entirely
+HEADLESS = os.environ.get('ARCIS_HEADLESS') == '1' or (
+    platform.system() == 'Linux' and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY')
+)
+AUDIO_ENABLED = os.environ.get('ARCIS_AUDIO', '1') != '0'
+
+_IMPORTS_DONE = time.perf_counter()
 
 # Configuration
 ARCIS_API_URL = "https://arcis-production.up.railway.app/api/detections/upload-jpeg"
@@ -64,7 +79,9 @@ def detect_device_type():
     except:
         return 'pi4'  # Default fallback
 
-DEVICE_TYPE = detect_device_type()
+# Set by load_device_config() during client start-up - importing probes nothing
+DEVICE_TYPE = None
+DEVICE_CONFIG = None
 
 # Device-specific configurations
 DEVICE_CONFIGS = {
@@ -93,8 +110,12 @@ ALARM_ME = "./Alarm_ME.mp3"
 ALARM_OTHER = "./Alarm_OTHER.mp3" 
 ALARM_BOTH = "./Alarm_BOTH.mp3"
 
-# Get current device config
-DEVICE_CONFIG = DEVICE_CONFIGS[DEVICE_TYPE]
+# Alarm code -> clip, decoded once at startup by the audio actor
+ALARM_FILES = {
+    'ME': ALARM_ME,
+    'OTHER': ALARM_OTHER,
+    'BOTH': ALARM_BOTH
+}
 
 # Smart Detection Configuration - RESTORED TO ORIGINAL WORKING LOGIC
 SMART_CONFIG = {
@@ -108,10 +129,97 @@ SMART_CONFIG = {
     'max_alarm_duration': 30.0
 }
 
+# Inference failover - per-backend circuit breakers and hedged requests
+FAILOVER_CONFIG = {
+    'vm_timeout': 2.0,
+    'failure_threshold': 3,      # consecutive failures before a breaker opens
+    'reset_timeout': 10.0,       # seconds an open breaker skips its backend
+    'probe_interval': 5.0,       # health probe period for open backends
+    'hedge_enabled': True,       # also ask the next backend when the primary is slow
+    'hedge_percentile': 95,      # ...slower than this percentile of its recent latency
+    'min_hedge_delay': 0.5
+}
+
+# Panic switch and L76X GPS (Jetson wiring by default) - run inside the client
+# switch_enabled / gps_enabled: None = on for Jetson, resolved by load_device_config()
+FIELD_IO_CONFIG = {
+    'switch_enabled': os.environ['ARCIS_PANIC_SWITCH'] == '1' if 'ARCIS_PANIC_SWITCH' in os.environ else None,
+    'switch_gpio': int(os.environ.get('ARCIS_SWITCH_GPIO', '19')),  # sysfs number (see switch_service)
+    'gps_enabled': os.environ['ARCIS_GPS'] == '1' if 'ARCIS_GPS' in os.environ else None,
+    'gps_port': os.environ.get('ARCIS_GPS_PORT', '/dev/ttyTHS1'),
+    'gps_baud': 9600,
+    'gps_max_age': 30.0,       # older fixes are not stamped on uploads
+    'panic_retries': 3         # a failed panic upload goes back to the front of the queue
+}
+
+# Shared-memory state bus (state_bus.py) - frame metadata and detections for
+# co-located processes; GPS/switch state from a sidecar when not run in-process
+STATE_BUS_ENABLED = os.environ.get('ARCIS_STATE_BUS_ENABLED', '1') == '1'
+
+# Multi-process encoding (frame_pool.py) - captured frames go into shared-memory
+# slots and JPEG encode + MD5 run in worker processes. 0 workers = in-process
+FRAME_POOL_CONFIG = {
+    'workers': int(os.environ.get('ARCIS_ENCODE_WORKERS', '0')),
+    'slots': 8                 # frame queue + detection + uploads + headroom
+}
+
+# Upload queue order - lower first, FIFO within a priority
+UPLOAD_PRIORITY = {
+    'panic': 0,
+    'detection': 1
+}
+
+# Google Vision SDK fallback - one frame per call; detection_worker is serial, so
+# there is never a second frame to batch with (vision_batcher.VisionBatcher is for
+# callers that do have concurrent frames)
+VISION_CONFIG = {
+    'rpc_timeout': 5.0
+}
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def load_device_config():
+    """Detect the device type on first use and select its config"""
+    global DEVICE_TYPE, DEVICE_CONFIG
+    if DEVICE_TYPE is None:
+        DEVICE_TYPE = detect_device_type()
+        DEVICE_CONFIG = DEVICE_CONFIGS[DEVICE_TYPE]
+        for key in ('switch_enabled', 'gps_enabled'):
+            if FIELD_IO_CONFIG[key] is None:
+                FIELD_IO_CONFIG[key] = DEVICE_TYPE == 'jetson'
+        logger.info(f"🔧 Detected Device: {DEVICE_TYPE}")
+    return DEVICE_CONFIG
+
+def load_redis_handler():
+    """Import the Redis integration on first use"""
+    global REDIS_AVAILABLE, RedisDetectionHandler
+    if REDIS_AVAILABLE is None:
+        try:
+            from redis_system.redis_detection_handler import RedisDetectionHandler as handler_class
+            RedisDetectionHandler = handler_class
+            REDIS_AVAILABLE = True
+            logger.info("✅ Redis integration available")
+        except ImportError:
+            REDIS_AVAILABLE = False
+            logger.info("⚠️ Redis not available - using basic WebSocket coordination")
+    return REDIS_AVAILABLE
+
+def load_vision_sdk():
+    """Import the Google Cloud Vision SDK on first use"""
+    global GOOGLE_VISION_AVAILABLE, vision
+    if GOOGLE_VISION_AVAILABLE is None:
+        try:
+            from google.cloud import vision as vision_module
+            vision = vision_module
+            GOOGLE_VISION_AVAILABLE = True
+            logger.info("✅ Google Cloud Vision SDK available")
+        except ImportError:
+            GOOGLE_VISION_AVAILABLE = False
+            logger.info("⚠️ Google Cloud Vision SDK not installed - using VM inference (recommended)")
+    return GOOGLE_VISION_AVAILABLE
+
 class SmartDetectionTracker:
     """Implements Smart Detection Rules for 1.5 second steady detection uploads"""
     
@@ -155,9 +263,8 @@ class SmartDetectionTracker:
         # Extract current objects from detections
         detected_objects = set()
         for detection in detections:
-            obj_class = detection.get('class', '').strip().lower()
-            if obj_class in {'weapon', 'pistol', 'rifle', 'knife'}:
-                detected_objects.add(obj_class)
+            if detection.is_weapon:
+                detected_objects.add(detection.label)
         
         # Add to sliding window (True if objects detected, False if not)
         self.detection_window.append(detected_objects if detected_objects else set())
@@ -412,7 +519,7 @@ class SmartDetectionTracker:
             'objects_detected': list(upload_decision['objects']),
             'smart_detection': True,
             'steady_detection_duration': self.steady_detection_duration,
-            'google_vision_detections': frame_detections
+            'google_vision_detections': detections_to_dicts(frame_detections)
         }
         
         logger.info(f"[{self.device_id}] 📊 UPLOAD #{self.upload_sequence} - {list(upload_decision['objects'])} - {upload_decision['reason']}")
@@ -437,43 +544,66 @@ class WeaponDetectionClient:
         self.alarm_cooldown_start = None
         self.alarm_cooldown_duration = 2.0  # 2 seconds cooldown before stopping alarm
 
-        # Initialize Google Cloud Vision
+        # Startup profile - phases are timed in ms from process start
+        self.startup = StartupProfiler(origin=_PROCESS_START)
+        self.startup.record('imports', _PROCESS_START, _IMPORTS_DONE)
+        with self.startup.phase('device_detection'):
+            load_device_config()
+        init_start = time.perf_counter()
+
+        # Google Cloud Vision client is created during concurrent warm-up (see run)
         self.vision_client = None
-        self._initialize_vision_client()
+        self.vision_features = None
 
         # Simple detection state tracking (like send_frames2.py)
         self.current_detected_objects = set()
         self.upload_sent_for_current_objects = False
 
-        # Initialize pygame mixer for audio
-        try:
-            pygame.mixer.init()
-            logger.info("Audio system initialized")
-            
-            # Test alarm file availability
-            alarm_files = ['./alarm.mp3', './Alarm_ME.mp3', './Alarm_OTHER.mp3', './Alarm_BOTH.mp3']
-            found_alarms = []
-            for alarm_file in alarm_files:
-                if os.path.exists(alarm_file):
-                    found_alarms.append(alarm_file)
-            
-            if found_alarms:
-                logger.info(f"✅ Found alarm files: {found_alarms}")
-            else:
-                logger.warning("⚠️ No alarm files found in current directory")
-                
-        except Exception as e:
-            logger.error(f"Failed to initialize audio: {e}")
+        # Audio actor - decodes alarm clips once and owns the mixer on its own thread
+        self.alarm_audio = AlarmAudioActor(ALARM_FILES)
+        if AUDIO_ENABLED:
+            self.alarm_audio.start()
+
+        # Real device telemetry sampled off the hot path
+        self.telemetry = DeviceTelemetrySampler(interval=2.0)
+        self.telemetry.start()
 
-        # Thread-safe queues
+        # Thread-safe queues - uploads are (priority, sequence, upload_data)
         self.frame_queue = Queue(maxsize=2)
-        self.upload_queue = Queue()
+        self.upload_queue = PriorityQueue()
+        self.upload_sequence = itertools.count()
         self.detection_lock = threading.Lock()
+        
+        # Most recent camera frame (reference swapped by the capture loop) for panic uploads
+        self.latest_frame = None
+        
+        # Latest frame metadata / detections for co-located processes
+        self.state_bus = None
+        if STATE_BUS_ENABLED:
+            try:
+                self.state_bus = StateBus()
+            except (OSError, ValueError) as e:
+                logger.warning(f"State bus unavailable: {e}")
+        self.frame_id = 0
+        
+        # Shared-memory frame slots + encode workers, sized from the camera (see run)
+        self.frame_pool = None
+        
+        # Panic switch and GPS services are started with the capture loop (see run)
+        self.field_io = FieldIO(
+            switch_gpio=FIELD_IO_CONFIG['switch_gpio'] if FIELD_IO_CONFIG['switch_enabled'] else None,
+            gps_port=FIELD_IO_CONFIG['gps_port'] if FIELD_IO_CONFIG['gps_enabled'] else None,
+            gps_baud=FIELD_IO_CONFIG['gps_baud'],
+            on_press=self.on_panic_switch,
+            on_fix=self.on_gps_fix,
+            bus=self.state_bus
+        )
 
         # Performance tracking
         self.last_detection_time = 0
         self.fps_counter = 0
         self.fps_start_time = time.time()
+        self.display_fps = 0.0
         self.upload_count = 0
         
         # Detection cache for display
@@ -483,17 +613,76 @@ class WeaponDetectionClient:
         self.sio = socketio.Client(logger=False, engineio_logger=False)
         self.setup_websocket_handlers()
         
-        # Initialize Redis for enhanced coordination
+        # Keep-alive session for VM inference (warmed up during startup)
+        self.http = requests.Session()
+        _, probe_buffer = cv2.imencode('.jpg', np.zeros((48, 64, 3), dtype=np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 85])
+        self.probe_jpeg = probe_buffer.tobytes()
+        
+        # Inference routing - VM first, Vision SDK appended once its client is ready
+        self.inference_router = InferenceRouter(
+            [InferenceBackend(
+                'vm', self.detect_objects_with_vm,
+                CircuitBreaker('vm', FAILOVER_CONFIG['failure_threshold'], FAILOVER_CONFIG['reset_timeout']),
+                probe_func=self._probe_vm
+            )],
+            hedge_enabled=FAILOVER_CONFIG['hedge_enabled'],
+            hedge_percentile=FAILOVER_CONFIG['hedge_percentile'],
+            min_hedge_delay=FAILOVER_CONFIG['min_hedge_delay'],
+            probe_interval=FAILOVER_CONFIG['probe_interval'],
+            retain_frame=self.retain_frame,
+            release_frame=self.release_frame
+        )
+        
+        # Redis coordination is connected during concurrent warm-up (see run)
         self.redis_handler = None
-        if REDIS_AVAILABLE:
-            try:
-                self.redis_handler = RedisDetectionHandler(DEVICE_CONFIG['device_id'], DEVICE_CONFIG)
-                logger.info(f"✅ Redis coordination enabled for {DEVICE_CONFIG['device_id']}")
-            except Exception as e:
-                logger.warning(f"⚠️ Redis initialization failed: {e} - using WebSocket only")
-                self.redis_handler = None
-        else:
+
+        self.startup.record('client_init', init_start)
+
+    def _initialize_redis(self):
+        """Import and connect the Redis handler (optional subsystem)"""
+        if not load_redis_handler():
             logger.info("📡 Using WebSocket-only coordination (Redis not available)")
+            return
+        try:
+            self.redis_handler = RedisDetectionHandler(
+                DEVICE_CONFIG['device_id'], DEVICE_CONFIG,
+                telemetry_provider=self.telemetry.latest_metrics,
+                detection_type=Detection,
+                alarm_callback=self.on_nearby_alarm
+            )
+            logger.info(f"✅ Redis coordination enabled for {DEVICE_CONFIG['device_id']}")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis initialization failed: {e} - using WebSocket only")
+            self.redis_handler = None
+
+    def _probe_vm(self, timeout=1.0):
+        """Cheap VM health check - a tiny JPEG through /infer"""
+        files = {'image': ('probe.jpg', self.probe_jpeg, 'image/jpeg')}
+        headers = {'X-API-Key': DEVICE_CONFIG['api_key']}
+        response = self.http.post(INFERENCE_URL, files=files, headers=headers, timeout=timeout)
+        return response.status_code == 200
+
+    def warm_up_inference(self):
+        """Open the keep-alive connection to the VM and start the health prober"""
+        try:
+            healthy = self._probe_vm(timeout=5.0)
+            logger.info(f"🔥 Inference warm-up: VM {'healthy' if healthy else 'unhealthy'}")
+        except Exception as e:
+            logger.warning(f"Inference warm-up failed: {e}")
+        self.inference_router.start()
+
+    def _warm_up_optional_subsystems(self):
+        """Bring up optional backends in the background - detection works without them"""
+        subsystems = [
+            ('inference_warmup', self.warm_up_inference),
+            ('vision_client', self._initialize_vision_client),
+            ('redis', self._initialize_redis)
+        ]
+        for name, init_step in subsystems:
+            threading.Thread(
+                target=self.startup.timed, args=(name, init_step),
+                daemon=True, name=f"Warmup-{name}"
+            ).start()
 
     def setup_websocket_handlers(self):
         @self.sio.event
@@ -542,7 +731,7 @@ class WeaponDetectionClient:
                 if other_device_id != DEVICE_CONFIG['device_id']:
                     logger.info(f"🚨 Other device {other_device_id} detected weapon - playing OTHER alarm")
                     self.current_alarm_code = 'OTHER'  # Update alarm code for display
-                    threading.Thread(target=self.play_alarm, args=(ALARM_OTHER,), daemon=True).start()
+                    self.play_alarm('OTHER')
                     
             except Exception as e:
                 logger.error(f"Error handling weapon detection from other device: {e}")
@@ -589,18 +778,26 @@ class WeaponDetectionClient:
         logger.info(f"Alarm code changed: {self.current_alarm_code} -> {alarm_code}")
         self.current_alarm_code = alarm_code
         
-        if alarm_code == 'ME':
-            self.play_alarm(ALARM_ME)
-        elif alarm_code == 'OTHER':
-            self.play_alarm(ALARM_OTHER)
-        elif alarm_code == 'BOTH':
-            self.play_alarm(ALARM_BOTH)
+        if alarm_code in ALARM_FILES:
+            self.play_alarm(alarm_code)
         else:  # 'NONE'
             self.stop_alarm()
 
+    def on_nearby_alarm(self, alarm_event):
+        """Alarm fanned out over Redis by a device within the coordination radius"""
+        alarm_code = alarm_event.get('alarm_code', 'NONE')
+        with self.detection_lock:
+            if alarm_code != 'NONE':
+                self.current_alarm_code = 'OTHER'  # Update alarm code for display
+                self.play_alarm('OTHER')
+            elif not self.weapon_detected:
+                # Only stop alarm if this device isn't detecting anything
+                self.current_alarm_code = 'NONE'
+                self.stop_alarm()
+
     def _initialize_vision_client(self):
         """Initialize Google Cloud Vision client (optional)"""
-        if not GOOGLE_VISION_AVAILABLE:
+        if not load_vision_sdk():
             logger.info("📱 Using VM inference (VM has Google Vision) - No local setup needed")
             self.vision_client = None
             return
@@ -610,106 +807,100 @@ class WeaponDetectionClient:
             self.vision_client = vision.ImageAnnotatorClient()
             logger.info("✅ Google Cloud Vision SDK client initialized")
             
+            # One client (one gRPC channel) and one Feature list shared by every request
+            self.vision_features = [vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION)]
+            
+            self.inference_router.add_backend(InferenceBackend(
+                'vision_sdk', self.detect_objects_with_vision,
+                CircuitBreaker('vision_sdk', FAILOVER_CONFIG['failure_threshold'], FAILOVER_CONFIG['reset_timeout'])
+            ))
+            
         except Exception as e:
             logger.info(f"📱 Google Vision SDK setup issue: {e}")
             logger.info("📱 Will use VM inference (recommended method)")
             self.vision_client = None
 
     def detect_objects_with_vm(self, frame):
-        """Enhanced VM inference with Redis caching"""
+        """Enhanced VM inference with Redis caching - raises InferenceBackendError on failure"""
         try:
+            # One encode serves the cache key and the request body
+            jpeg_bytes, frame_hash = self.encode_jpeg(frame, 85)
+            
             # Try Redis cache first if available
             if self.redis_handler:
-                cached_result = self.redis_handler._try_inference_cache(frame)
+                cached_result = self.redis_handler._try_inference_cache(frame, frame_hash)
                 if cached_result:
                     logger.debug("🎯 Using cached inference result from Redis")
                     return cached_result
             
             # Perform VM inference
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            files = {'image': ('frame.jpg', buffer.tobytes(), 'image/jpeg')}
+            files = {'image': ('frame.jpg', jpeg_bytes, 'image/jpeg')}
             headers = {'X-API-Key': DEVICE_CONFIG['api_key']}
-            response = requests.post(INFERENCE_URL, files=files, headers=headers, timeout=2.0)
+            response = self.http.post(INFERENCE_URL, files=files, headers=headers, timeout=FAILOVER_CONFIG['vm_timeout'])
 
             if response.status_code == 200:
                 result = response.json()
                 detections = result.get('detections', [])
                 
-                # Convert VM format to our standard format
-                formatted_detections = []
-                for det in detections:
-                    formatted_det = {
-                        'class': det.get('class', '').lower(),
-                        'confidence': det.get('confidence', 0.0),
-                        'box': det.get('box', [0, 0, 100, 100]),
-                        'description': det.get('class', ''),
-                        'source': 'vm_google_vision'
-                    }
-                    formatted_detections.append(formatted_det)
+                # Convert VM format to compact Detection records
+                formatted_detections = [Detection.from_dict(det, source='vm_google_vision') for det in detections]
                 
                 # Cache result in Redis if available
                 if self.redis_handler:
-                    self.redis_handler._cache_inference_result(frame, formatted_detections)
+                    self.redis_handler._cache_inference_result(frame, formatted_detections, frame_hash)
                 
                 return formatted_detections
 
+            raise InferenceBackendError(f"VM returned HTTP {response.status_code}")
+
+        except InferenceBackendError:
+            raise
         except requests.exceptions.Timeout:
-            logger.warning("VM inference request timed out")
+            raise InferenceBackendError("VM inference request timed out")
         except requests.exceptions.RequestException as e:
-            logger.warning(f"VM network error: {e}")
+            raise InferenceBackendError(f"VM network error: {e}")
         except Exception as e:
-            logger.error(f"VM inference error: {e}")
-
-        return []
+            raise InferenceBackendError(f"VM inference error: {e}")
 
     def detect_objects_with_vision(self, frame):
-        """Send frame to Google Vision API for object detection"""
+        """Google Vision object localization for one frame - raises InferenceBackendError on failure"""
+        if not self.vision_client:
+            raise InferenceBackendError("Google Vision client not initialized")
         try:
-            if not self.vision_client:
-                return []
-
-            # Convert frame to JPEG
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            image_bytes = buffer.tobytes()
-
-            # Create Vision API image object
-            image = vision.Image(content=image_bytes)
-
-            # Perform object localization
-            response = self.vision_client.object_localization(image=image)
-            objects = response.localized_object_annotations
-
-            detections = []
-            for obj in objects:
-                # Extract bounding box coordinates
-                vertices = obj.bounding_poly.normalized_vertices
-                x_coords = [v.x for v in vertices]
-                y_coords = [v.y for v in vertices]
-                
-                # Convert normalized coordinates to pixel coordinates
-                h, w = frame.shape[:2]
-                x1 = int(min(x_coords) * w)
-                y1 = int(min(y_coords) * h)
-                x2 = int(max(x_coords) * w)
-                y2 = int(max(y_coords) * h)
-
-                detection = {
-                    'class': obj.name.lower(),
-                    'confidence': obj.score,
-                    'box': [x1, y1, x2, y2],
-                    'description': obj.name,
-                    'boundingPoly': {
-                        'vertices': [{'x': int(v.x * w), 'y': int(v.y * h)} for v in vertices]
-                    }
-                }
-                
-                detections.append(detection)
-
-            return detections
-
+            jpeg_bytes, _ = self.encode_jpeg(frame, 85)
+            response = self.vision_client.annotate_image(
+                vision.AnnotateImageRequest(image=vision.Image(content=jpeg_bytes), features=self.vision_features),
+                timeout=VISION_CONFIG['rpc_timeout']
+            )
         except Exception as e:
-            logger.error(f"Google Vision API error: {e}")
-            return []
+            raise InferenceBackendError(f"Google Vision API error: {e}")
+        if response.error.message:
+            raise InferenceBackendError(f"Google Vision API error: {response.error.message}")
+        return localized_objects_to_detections(response.localized_object_annotations, frame.shape)
+
+    def get_inference_status(self):
+        """Breaker state per inference backend plus failover/hedge counters"""
+        return self.inference_router.get_stats()
+
+    def encode_jpeg(self, frame, quality):
+        """(JPEG bytes, MD5) - on a frame pool worker when enabled, otherwise in this process"""
+        if self.frame_pool:
+            return self.frame_pool.encode(frame, quality)
+        return encode_jpeg(frame, quality)
+
+    def start_frame_pool(self):
+        """Shared-memory slots sized to the camera frames, plus the encode workers"""
+        if FRAME_POOL_CONFIG['workers'] <= 0:
+            return
+        ret, frame = self.cap.read()
+        if not ret:
+            return
+        try:
+            frame_pool = FramePool(frame.shape, FRAME_POOL_CONFIG['slots'], FRAME_POOL_CONFIG['workers'])
+            frame_pool.start()
+            self.frame_pool = frame_pool
+        except (OSError, ValueError) as e:
+            logger.warning(f"Frame pool unavailable, encoding in-process: {e}")
 
     def initialize_camera(self, camera_id=0):
         try:
@@ -742,8 +933,7 @@ class WeaponDetectionClient:
             reason = upload_data['reason']
 
             # Convert frame to JPEG bytes (high quality like test script)
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
-            jpeg_bytes = buffer.tobytes()
+            jpeg_bytes, _ = self.encode_jpeg(frame, 90)
 
             logger.info(f"🔧 Uploading frame: {len(jpeg_bytes)} bytes ({len(jpeg_bytes)/1024:.1f}KB)")
 
@@ -772,8 +962,8 @@ class WeaponDetectionClient:
             # Get highest confidence from detections
             max_confidence = 0.85
             for det in detections:
-                if det.get('class', '').lower() in objects:
-                    max_confidence = max(max_confidence, det.get('confidence', 0.85))
+                if det.label in objects:
+                    max_confidence = max(max_confidence, det.confidence)
 
             # Calculate bounding box from detections
             bounding_box = {
@@ -785,8 +975,8 @@ class WeaponDetectionClient:
             
             if detections:
                 for det in detections:
-                    if det.get('class', '').lower() == primary_object:
-                        box = det.get('box', [80, 120, 180, 270])
+                    if det.label == primary_object:
+                        box = det.box
                         bounding_box = {
                             'x': int(box[0]),
                             'y': int(box[1]), 
@@ -795,16 +985,12 @@ class WeaponDetectionClient:
                         }
                         break
 
-            # System metrics (EXACT format from test script)
+            # System metrics - latest background telemetry snapshot (no sampling here)
             system_metrics = {
                 'device_type': DEVICE_CONFIG['device_type'],
                 'device_id': DEVICE_CONFIG['device_id'],
                 'device_name': DEVICE_CONFIG['device_name'],
-                'cpu_usage': 35 + np.random.random() * 20,
-                'memory_usage': 45 + np.random.random() * 25,
-                'temperature': 55 + np.random.random() * 15,
-                'voltage': 5.1 + np.random.random() * 0.2,
-                'network_strength': 80 + np.random.random() * 15
+                **self.telemetry.upload_metrics()
             }
 
             # Simple metadata 
@@ -814,11 +1000,16 @@ class WeaponDetectionClient:
                 'device_type': DEVICE_CONFIG['device_type'],
                 'device_model': DEVICE_CONFIG['device_model'],
                 'location': DEVICE_CONFIG['location'],
-                'upload_method': 'simple_detection',
+                'upload_method': upload_data.get('upload_method', 'simple_detection'),
                 'image_format': 'full_resolution_jpeg',
                 'upload_reason': reason,
                 'detected_objects': list(objects)
             }
+            
+            # Cached GPS fix (no serial access here)
+            gps_fix = self.field_io.gps_stamp(FIELD_IO_CONFIG['gps_max_age'])
+            if gps_fix:
+                upload_metadata['gps'] = gps_fix
 
             # Prepare the multipart form data (EXACT format from test script)
             files = {
@@ -833,9 +1024,9 @@ class WeaponDetectionClient:
                 'device_id': DEVICE_CONFIG['device_id'],
                 'device_name': DEVICE_CONFIG['device_name'],
                 'device_type': DEVICE_CONFIG['device_type'],
-                'bounding_box': json.dumps(bounding_box),
-                'system_metrics': json.dumps(system_metrics),
-                'metadata': json.dumps(upload_metadata),
+                'bounding_box': dumps_text(bounding_box),
+                'system_metrics': dumps_text(system_metrics),
+                'metadata': dumps_text(upload_metadata),
                 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
             }
 
@@ -879,33 +1070,15 @@ class WeaponDetectionClient:
             logger.error(f"Traceback: {traceback.format_exc()}")
             return False
 
-    def play_alarm(self, alarm_path):
-        """Play alarm - like working send_frames2.py"""
-        try:
-            if not pygame.mixer.get_init():
-                return
-
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
-
-            pygame.mixer.music.load(alarm_path)
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-            self.alarm_playing = True
-            logger.info(f"🚨 Playing alarm: {alarm_path}")
-
-        except Exception as e:
-            logger.error(f"Failed to play alarm: {e}")
+    def play_alarm(self, alarm_code):
+        """Queue a looping alarm on the audio actor (never blocks the caller)"""
+        self.alarm_audio.play(alarm_code)
+        self.alarm_playing = True
 
     def stop_alarm(self):
-        """Stop alarm with improved handling"""
-        try:
-            if self.alarm_playing:
-                if pygame.mixer.get_init() and pygame.mixer.music.get_busy():
-                    pygame.mixer.music.stop()
-                self.alarm_playing = False
-                logger.info("🔇 Alarm stopped")
-        except Exception as e:
-            logger.error(f"Failed to stop alarm: {e}")
+        """Queue an alarm stop on the audio actor"""
+        if self.alarm_playing:
+            self.alarm_audio.stop()
             self.alarm_playing = False
 
     def check_alarm_cooldown(self):
@@ -924,41 +1097,37 @@ class WeaponDetectionClient:
         # Redis-enhanced detection processing if available
         if self.redis_handler:
             try:
-                # Use Redis handler for enhanced processing
-                enhanced_detections = self.redis_handler.process_detection_with_redis(
-                    frame, detections, lambda f: detections
-                )
+                # Router results are fresh (the VM path already cached them under the hash
+                # of its one encode) - coordination only, no second encode or cache lookup
+                enhanced_detections = self.redis_handler.process_detection_with_redis(frame, detections)
                 detections = enhanced_detections
                 
-                # Get coordination status for logging
-                coord_status = self.redis_handler.get_coordination_status()
-                if coord_status['active_remote_detections'] > 0:
-                    logger.debug(f"🤝 Coordination: {coord_status['active_remote_detections']} remote devices active")
+                # Cheap per-frame count - the full status (Redis stats, lag) is for reporting only
+                active_remote = self.redis_handler.active_remote_count()
+                if active_remote > 0:
+                    logger.debug(f"🤝 Coordination: {active_remote} remote devices active")
                 
             except Exception as e:
                 logger.error(f"Redis processing error: {e} - falling back to standard processing")
         
-        # Cache detections for display
-        self.last_detections = detections.copy()
-        
-        # Check for weapons with higher confidence threshold for uploads
-        weapon_labels = {"weapon", "pistol", "rifle", "knife"}
+        # Cache detections for display (records are immutable - a shallow list is enough)
+        self.last_detections = list(detections)
         
         # Extract current detected objects with STRICT confidence for uploads
         current_objects = set()
         high_confidence_objects = set()
         
         for det in detections:
-            obj_class = det.get("class", "").strip().lower()
-            confidence = det.get("confidence", 0)
+            if not det.is_weapon:
+                continue
             
             # Lower threshold for alarms/display (40%)
-            if obj_class in weapon_labels and confidence >= 0.4:
-                current_objects.add(obj_class)
+            if det.confidence >= 0.4:
+                current_objects.add(det.label)
             
             # HIGHER threshold for uploads (70% - prevent false positive uploads)
-            if obj_class in weapon_labels and confidence >= 0.7:
-                high_confidence_objects.add(obj_class)
+            if det.confidence >= 0.7:
+                high_confidence_objects.add(det.label)
         
         weapon_found = len(current_objects) > 0
         high_confidence_weapon_found = len(high_confidence_objects) > 0
@@ -979,7 +1148,7 @@ class WeaponDetectionClient:
                         self.sio.emit('weapon_detected', {
                             'device_id': DEVICE_CONFIG['device_id'],
                             'timestamp': time.time(),
-                            'objects': list(self.last_detections)
+                            'objects': detections_to_dicts(self.last_detections)
                         })
                         logger.info(f"[{DEVICE_CONFIG['device_id']}] 📡 Notified server of weapon detection")
                     except Exception as e:
@@ -1011,15 +1180,9 @@ class WeaponDetectionClient:
             # Check coordination level for upload decision
             coordination_level = 'LOW'  # Default
             if self.redis_handler:
-                try:
-                    coord_status = self.redis_handler.get_coordination_status()
-                    # Enhance metadata if Redis detections have coordination info
-                    for det in detections:
-                        if 'redis_metadata' in det:
-                            coordination_level = det['redis_metadata']['coordination_level']
-                            break
-                except:
-                    pass
+                coordination = self.redis_handler.last_coordination
+                if coordination:
+                    coordination_level = coordination['level']
             
             # Check if this is a NEW detection session (different objects OR sufficient time passed)
             objects_changed = high_confidence_objects != self.last_upload_objects
@@ -1043,7 +1206,7 @@ class WeaponDetectionClient:
                         'objects': high_confidence_objects,
                         'reason': f'high_confidence_detection_70%+_coord_{coordination_level}'
                     }
-                    self.upload_queue.put_nowait(upload_data)
+                    self.queue_upload(upload_data)
                     logger.info(f"[{DEVICE_CONFIG['device_id']}] 📤 Queued HIGH-CONF upload for {high_confidence_objects} (coord: {coordination_level})")
                 except:
                     logger.warning("Upload queue full, skipping upload")
@@ -1060,25 +1223,84 @@ class WeaponDetectionClient:
 
         return detections
 
+    def queue_upload(self, upload_data, priority='detection'):
+        """Add an upload; panic uploads overtake anything still waiting"""
+        self.upload_queue.put_nowait((UPLOAD_PRIORITY[priority], next(self.upload_sequence), upload_data))
+    
+    def on_panic_switch(self, event):
+        """Switch press (watcher thread): upload the latest frame now, no smart-detection confirmation"""
+        frame = self.latest_frame
+        if frame is None:
+            logger.warning(f"[{DEVICE_CONFIG['device_id']}] 🚨 Panic switch pressed before the first frame")
+            return
+        
+        detections = self.last_detections
+        weapon_objects = {det.label for det in detections if det.is_weapon}
+        self.queue_upload({
+            'frame': frame.copy(),
+            'detections': detections,
+            'objects': weapon_objects or {'weapon'},
+            'reason': 'manual_panic_switch',
+            'upload_method': 'panic_switch',
+            'pressed_at': event.monotonic,
+            'attempts': 0
+        }, priority='panic')
+        logger.warning(f"[{DEVICE_CONFIG['device_id']}] 🚨 PANIC SWITCH - priority upload queued "
+                       f"(press #{event.press_count})")
+    
+    def on_gps_fix(self, latitude, longitude, fix_time):
+        """GPS reader thread: feed the geo index used for Redis coordination"""
+        if self.redis_handler:
+            self.redis_handler.update_location(latitude, longitude, fix_time)
+    
+    def queue_frame(self, frame):
+        """Hand the newest frame to detection - a shared-memory slot copy when the pool has room"""
+        queued = self.frame_pool.write(frame) if self.frame_pool else None
+        if queued is None:
+            queued = frame.copy()
+        try:
+            self.frame_queue.put_nowait((self.frame_id, queued))
+        except Full:
+            # Drop the stale frame so detection always works on the latest one
+            try:
+                _, stale = self.frame_queue.get_nowait()
+                self.release_frame(stale)
+            except Empty:
+                pass
+            try:
+                self.frame_queue.put_nowait((self.frame_id, queued))
+            except Full:
+                self.release_frame(queued)
+    
+    def retain_frame(self, frame):
+        """Keep a frame pool slot for a reader that may outlive detection_worker's use (hedged calls)"""
+        if self.frame_pool:
+            self.frame_pool.retain(frame)
+    
+    def release_frame(self, frame):
+        if self.frame_pool:
+            self.frame_pool.release(frame)
+    
     def detection_worker(self):
         """Background worker for object detection (VM primary, Google Vision SDK optional)"""
         while self.running:
             try:
-                frame = self.frame_queue.get(timeout=0.1)
-                
-                # Primary method: Use VM inference (VM has Google Vision set up)
-                detections = self.detect_objects_with_vm(frame)
-                detection_source = "VM Google Vision"
+                frame_id, frame = self.frame_queue.get(timeout=0.1)
                 
-                # Optional: If VM fails and we have direct Google Vision SDK, try that
-                if not detections and GOOGLE_VISION_AVAILABLE and self.vision_client:
-                    detections = self.detect_objects_with_vision(frame)
-                    detection_source = "Direct Google Vision SDK"
-                
-                # Process with Smart Detection
-                self.process_detections(frame, detections)
+                try:
+                    # VM inference first; an open breaker skips straight to the Vision SDK
+                    detections, detection_source = self.inference_router.detect(frame)
+                    if self.state_bus:
+                        self.state_bus.write_detections(frame_id, detections)
+                    
+                    # Process with Smart Detection
+                    self.process_detections(frame, detections)
+                finally:
+                    self.release_frame(frame)
                 
                 self.last_detection_time = time.time()
+                if self.startup.mark('first_detection'):
+                    self.startup.log_report()
                 
             except Empty:
                 continue
@@ -1090,8 +1312,16 @@ class WeaponDetectionClient:
         """Background worker for ARCIS uploads"""
         while self.running:
             try:
-                upload_data = self.upload_queue.get(timeout=1.0)
-                self.upload_to_arcis(upload_data)
+                _, _, upload_data = self.upload_queue.get(timeout=1.0)
+                uploaded = self.upload_to_arcis(upload_data)
+                
+                if 'pressed_at' in upload_data:
+                    if uploaded:
+                        latency_ms = self.field_io.record_panic_latency(upload_data['pressed_at'])
+                        logger.info(f"🚨 Panic upload delivered {latency_ms:.0f} ms after the press")
+                    elif upload_data['attempts'] < FIELD_IO_CONFIG['panic_retries']:
+                        upload_data['attempts'] += 1
+                        self.queue_upload(upload_data, priority='panic')
             except Empty:
                 continue
             except Exception as e:
@@ -1109,31 +1339,90 @@ class WeaponDetectionClient:
     def draw_detections(self, frame, detections):
         """Draw detection boxes with thin borders, no text"""
         for det in detections:
-            if det.get('confidence', 0) < 0.4:
+            if det.confidence < 0.4:
                 continue
-                
-            box = det.get('box', [0, 0, 100, 100])
-            class_name = det.get('class', '').lower()
 
             # Only draw for weapons
-            if class_name in ['weapon', 'pistol', 'rifle', 'knife']:
+            if det.is_weapon:
                 try:
-                    x1, y1, x2, y2 = [int(coord) for coord in box]
+                    x1, y1, x2, y2 = det.box
                     # Draw thin bounding box (line weight 1)
                     cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 255), 1)
                 except:
                     continue
 
+    def render_overlay(self, frame, current_time):
+        """Build the preview frame with detection boxes and status text"""
+        display_frame = frame.copy()
+        
+        # Use cached detection results for display (non-blocking)
+        current_weapon_detected = self.weapon_detected
+        
+        # Draw cached detections if available (non-blocking)
+        if hasattr(self, 'last_detections') and self.last_detections:
+            self.draw_detections(display_frame, self.last_detections)
+        
+        # Status indicators
+        status_color = (0, 0, 255) if current_weapon_detected else (0, 255, 0)
+        status_text = "WEAPON DETECTED!" if current_weapon_detected else "Safe"
+        cv2.putText(display_frame, status_text, (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
+
+        # VM connection status
+        vm_ok = (current_time - self.last_detection_time) < 5.0
+        vm_text = f"VM: {'Connected' if vm_ok else 'Disconnected'}"
+        if not self.inference_router.backends[0].is_available():
+            vm_ok = False
+            vm_text = "VM: Circuit OPEN"
+        vm_color = (0, 255, 0) if vm_ok else (0, 0, 255)
+        cv2.putText(display_frame, vm_text, (10, 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, vm_color, 2)
+
+        # WebSocket status
+        ws_color = (0, 255, 0) if self.websocket_connected else (0, 0, 255)
+        ws_text = f"WS: {'Connected' if self.websocket_connected else 'Disconnected'}"
+        cv2.putText(display_frame, ws_text, (10, 90),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, ws_color, 2)
+
+        # Alarm status
+        alarm_text = f"Alarm: {self.current_alarm_code or 'NONE'}"
+        alarm_color = (0, 0, 255) if self.alarm_playing else (255, 255, 0)
+        cv2.putText(display_frame, alarm_text, (10, 120),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, alarm_color, 2)
+
+        # Upload stats (black text)
+        cv2.putText(display_frame, f"Uploads: {self.upload_count}", (10, 150),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+
+        # Device info
+        cv2.putText(display_frame, f"Device: {DEVICE_CONFIG['device_id']}", (10, 180),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+        return display_frame
+
     def run(self):
-        if not self.initialize_camera():
+        # Optional backends warm up in the background while the required ones start
+        self._warm_up_optional_subsystems()
+
+        # Camera and WebSocket are required - bring them up concurrently
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='Startup') as startup_pool:
+            camera_future = startup_pool.submit(self.startup.timed, 'camera', self.initialize_camera)
+            websocket_future = startup_pool.submit(self.startup.timed, 'websocket', self.connect_websocket)
+            camera_ok = camera_future.result()
+            websocket_ok = websocket_future.result()
+
+        if not camera_ok:
             return
 
-        # Connect to WebSocket server
-        if not self.connect_websocket():
+        if not websocket_ok:
             logger.error("Failed to connect to WebSocket server. Exiting.")
             return
 
+        self.startup.mark('capture_ready')
+
         self.running = True
+        self.field_io.start()
+        self.start_frame_pool()
         
         # Start background workers
         detection_thread = threading.Thread(target=self.detection_worker, daemon=True)
@@ -1151,7 +1440,7 @@ class WeaponDetectionClient:
         logger.info(f"🧠 Smart Detection: {'Enabled' if SMART_CONFIG['enabled'] else 'Disabled'}")
         logger.info(f"📡 ARCIS Upload: {ARCIS_API_URL}")
         logger.info(f"🔌 WebSocket: {WEBSOCKET_URL}")
-        logger.info("Press 'q' to quit")
+        logger.info("Press Ctrl+C to quit" if HEADLESS else "Press 'q' to quit")
 
         try:
             while self.running:
@@ -1160,72 +1449,33 @@ class WeaponDetectionClient:
                     logger.error("Failed to capture frame")
                     break
 
-                display_frame = frame.copy()
-                
-                # Use cached detection results for display (non-blocking)
-                current_weapon_detected = self.weapon_detected
-                
-                # Draw cached detections if available (non-blocking)
-                if hasattr(self, 'last_detections') and self.last_detections:
-                    self.draw_detections(display_frame, self.last_detections)
-                
-                # Status indicators
-                status_color = (0, 0, 255) if current_weapon_detected else (0, 255, 0)
-                status_text = "WEAPON DETECTED!" if current_weapon_detected else "Safe"
-                cv2.putText(display_frame, status_text, (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
-
                 current_time = time.time()
-                
-                # VM connection status
-                vm_ok = (current_time - self.last_detection_time) < 5.0
-                vm_text = f"VM: {'Connected' if vm_ok else 'Disconnected'}"
-                vm_color = (0, 255, 0) if vm_ok else (0, 0, 255)
-                cv2.putText(display_frame, vm_text, (10, 60),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, vm_color, 2)
-
-                # WebSocket status
-                ws_color = (0, 255, 0) if self.websocket_connected else (0, 0, 255)
-                ws_text = f"WS: {'Connected' if self.websocket_connected else 'Disconnected'}"
-                cv2.putText(display_frame, ws_text, (10, 90),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, ws_color, 2)
-
-                # Alarm status
-                alarm_text = f"Alarm: {self.current_alarm_code or 'NONE'}"
-                alarm_color = (0, 0, 255) if self.alarm_playing else (255, 255, 0)
-                cv2.putText(display_frame, alarm_text, (10, 120),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, alarm_color, 2)
-
-                # Upload stats (black text)
-                cv2.putText(display_frame, f"Uploads: {self.upload_count}", (10, 150),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
-
-                # Device info
-                cv2.putText(display_frame, f"Device: {DEVICE_CONFIG['device_id']}", (10, 180),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                self.latest_frame = frame
+                self.frame_id += 1
+                if self.state_bus:
+                    self.state_bus.write_frame_meta(self.frame_id, frame.shape[1], frame.shape[0],
+                                                    self.display_fps, captured_at=current_time)
+
+                if not HEADLESS:
+                    display_frame = self.render_overlay(frame, current_time)
 
                 # FPS counter
                 self.fps_counter += 1
                 if self.fps_counter % 30 == 0:
                     fps = 30.0 / (current_time - self.fps_start_time)
+                    self.display_fps = fps
                     logger.info(f"📺 Display FPS: {fps:.1f} | Uploads: {self.upload_count}")
                     self.fps_start_time = current_time
 
                 # Queue frame for smart detection processing (background)
-                try:
-                    self.frame_queue.put_nowait(frame.copy())
-                except:
-                    try:
-                        self.frame_queue.get_nowait()
-                        self.frame_queue.put_nowait(frame.copy())
-                    except:
-                        pass
+                self.queue_frame(frame)
 
-                cv2.imshow(f'{DEVICE_TYPE.upper()} Smart Weapon Detection', display_frame)
+                if not HEADLESS:
+                    cv2.imshow(f'{DEVICE_TYPE.upper()} Smart Weapon Detection', display_frame)
 
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    break
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == ord('q'):
+                        break
 
         except KeyboardInterrupt:
             logger.info("Interrupted by user")
@@ -1238,12 +1488,21 @@ class WeaponDetectionClient:
         logger.info(f"🛑 Shutting down {DEVICE_TYPE.upper()} Smart Detection...")
         self.running = False
         self.stop_alarm()
+        self.alarm_audio.shutdown()
+        self.telemetry.stop()
+        self.field_io.stop()
+        if self.frame_pool:
+            logger.info(f"🧵 Frame pool - {self.frame_pool.get_stats()}")
+            self.frame_pool.stop()
+        if self.state_bus:
+            self.state_bus.close()
+        self.inference_router.stop()
 
         if self.cap:
             self.cap.release()
 
-        cv2.destroyAllWindows()
-        pygame.mixer.quit()
+        if not HEADLESS:
+            cv2.destroyAllWindows()
         
         if self.sio.connected:
             self.sio.disconnect()
@@ -1257,14 +1516,22 @@ class WeaponDetectionClient:
                 logger.error(f"Redis cleanup error: {e}")
         
         logger.info(f"📊 Final Stats - Total Smart Uploads: {self.upload_count}")
+        inference_stats = self.get_inference_status()
+        logger.info(f"🔀 Inference failover - failovers: {inference_stats['failovers']}, hedges: {inference_stats['hedges_sent']} ({inference_stats['hedge_wins']} won)")
+        for backend_name, breaker in inference_stats['backends'].items():
+            logger.info(f"   {backend_name}: {breaker['state']} (opened {breaker['times_opened']}x, {breaker['failures']} failures)")
+        audio_stats = self.alarm_audio.get_stats()
+        field_stats = self.field_io.get_stats()
+        if field_stats['panic_presses']:
+            logger.info(f"🚨 Panic switch - presses: {field_stats['panic_presses']}, uploads: {field_stats['panic_uploads']}, "
+                        f"press-to-upload p50: {field_stats['press_to_upload_ms_p50']:.0f} ms, max: {field_stats['press_to_upload_ms_max']:.0f} ms")
+        logger.info(f"🔊 Alarm start latency - p50: {audio_stats['start_latency_ms_p50']:.1f} ms, max: {audio_stats['start_latency_ms_max']:.1f} ms")
         logger.info("✅ Cleanup complete")
 
 if __name__ == "__main__":
+    client = WeaponDetectionClient()
     logger.info(f"🚀 {DEVICE_TYPE.upper()} Smart Weapon Detection System v3.0")
-    logger.info(f"🔧 Detected Device: {DEVICE_TYPE}")
     logger.info(f"🔗 Using VM Google Vision (no local setup required)")
     logger.info(f"🧠 Smart Detection: {SMART_CONFIG}")
     logger.info(f"🔧 Device Config: {DEVICE_CONFIG}")
-    
-    client = WeaponDetectionClient()
     client.run()
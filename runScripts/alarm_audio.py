@@ -0,0 +1,204 @@
+"""
+Alarm Audio Actor for the ARCIS detection client
+Decodes every alarm clip once at startup and plays them from a single
+audio thread fed by a command queue, so callers never touch the mixer
+"""
+
+import os
+import time
+import logging
+import threading
+from queue import Queue, Empty
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Commands understood by the audio thread
+CMD_PLAY = 'play'
+CMD_STOP = 'stop'
+CMD_SHUTDOWN = 'shutdown'
+
+
+class AlarmAudioActor:
+    """Owns the pygame mixer on a dedicated thread and plays preloaded clips"""
+
+    def __init__(self, alarm_files, name='AlarmAudio'):
+        # alarm code ('ME', 'OTHER', 'BOTH') -> path on disk
+        self.alarm_files = dict(alarm_files)
+        self.name = name
+
+        self.commands = Queue()
+        self.ready = threading.Event()
+        self.thread = None
+
+        # Populated on the audio thread only
+        self.sounds = {}          # code -> pygame.mixer.Sound (decoded PCM)
+        self.streamed = {}        # code -> path, for clips Sound could not decode
+        self.channel = None
+        self.mixer_available = False
+
+        # State readable from any thread
+        self.current_code = None
+        self.playing = False
+        self.commands_processed = 0
+        self.start_latencies_ms = deque(maxlen=100)
+
+    def start(self):
+        """Start the audio thread (mixer init and decoding happen there)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+        self.thread.start()
+
+    def play(self, alarm_code):
+        """Queue a looping alarm; returns immediately"""
+        if self.thread is None:
+            return  # audio disabled
+        self.commands.put((CMD_PLAY, alarm_code, time.perf_counter()))
+
+    def stop(self):
+        """Queue an alarm stop; returns immediately"""
+        if self.thread is None:
+            return
+        self.commands.put((CMD_STOP, None, time.perf_counter()))
+
+    def shutdown(self, timeout=2.0):
+        """Stop playback, release the mixer and join the audio thread"""
+        self.commands.put((CMD_SHUTDOWN, None, time.perf_counter()))
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def get_stats(self):
+        """Alarm start latency and preload status"""
+        latencies = sorted(self.start_latencies_ms)
+        return {
+            'mixer_available': self.mixer_available,
+            'preloaded': sorted(self.sounds.keys()),
+            'streamed': sorted(self.streamed.keys()),
+            'current_code': self.current_code,
+            'playing': self.playing,
+            'commands_processed': self.commands_processed,
+            'start_latency_ms_last': self.start_latencies_ms[-1] if latencies else 0.0,
+            'start_latency_ms_max': latencies[-1] if latencies else 0.0,
+            'start_latency_ms_p50': latencies[len(latencies) // 2] if latencies else 0.0
+        }
+
+    def _run(self):
+        """Audio thread main loop"""
+        self._initialize_mixer()
+        self.ready.set()
+
+        while True:
+            try:
+                command = self.commands.get(timeout=1.0)
+            except Empty:
+                continue
+
+            # Coalesce bursts - only the newest command matters for the speaker
+            try:
+                while True:
+                    command = self.commands.get_nowait()
+                    if command[0] == CMD_SHUTDOWN:
+                        break
+            except Empty:
+                pass
+
+            action, alarm_code, queued_at = command
+            self.commands_processed += 1
+
+            if action == CMD_SHUTDOWN:
+                self._stop_playback()
+                self._release_mixer()
+                return
+            elif action == CMD_PLAY:
+                self._start_playback(alarm_code, queued_at)
+            elif action == CMD_STOP:
+                self._stop_playback()
+
+    def _initialize_mixer(self):
+        """Initialize the mixer and decode every alarm clip once"""
+        try:
+            import pygame
+            self._pygame = pygame
+            pygame.mixer.init()
+            # One reserved channel so alarms never compete with other sounds
+            pygame.mixer.set_reserved(1)
+            self.channel = pygame.mixer.Channel(0)
+            self.mixer_available = True
+            logger.info("Audio system initialized")
+        except Exception as e:
+            logger.error(f"Failed to initialize audio: {e}")
+            return
+
+        for alarm_code, alarm_path in self.alarm_files.items():
+            if not os.path.exists(alarm_path):
+                logger.warning(f"⚠️ Alarm file not found: {alarm_path}")
+                continue
+            try:
+                self.sounds[alarm_code] = self._pygame.mixer.Sound(alarm_path)
+            except Exception as e:
+                # Older SDL_mixer builds cannot decode MP3 into a Sound - stream it instead
+                logger.warning(f"⚠️ Could not preload {alarm_path} ({e}) - will stream from disk")
+                self.streamed[alarm_code] = alarm_path
+
+        if self.sounds or self.streamed:
+            logger.info(f"✅ Alarm clips ready - preloaded: {sorted(self.sounds)}, streamed: {sorted(self.streamed)}")
+        else:
+            logger.warning("⚠️ No alarm files found in current directory")
+
+    def _start_playback(self, alarm_code, queued_at):
+        """Switch the speaker to the requested alarm"""
+        if not self.mixer_available:
+            return
+        if self.playing and self.current_code == alarm_code:
+            return
+
+        try:
+            self._stop_playback()
+
+            if alarm_code in self.sounds:
+                self.channel.play(self.sounds[alarm_code], loops=-1)
+            elif alarm_code in self.streamed:
+                self._pygame.mixer.music.load(self.streamed[alarm_code])
+                self._pygame.mixer.music.play(-1)
+            else:
+                logger.warning(f"⚠️ No alarm clip for code {alarm_code}")
+                return
+
+            self.current_code = alarm_code
+            self.playing = True
+
+            latency_ms = (time.perf_counter() - queued_at) * 1000.0
+            self.start_latencies_ms.append(latency_ms)
+            logger.info(f"🚨 Playing alarm: {alarm_code} ({latency_ms:.1f} ms)")
+
+        except Exception as e:
+            logger.error(f"Failed to play alarm: {e}")
+
+    def _stop_playback(self):
+        """Silence whichever alarm is playing"""
+        if not self.mixer_available:
+            return
+        try:
+            if self.channel.get_busy():
+                self.channel.stop()
+            if self._pygame.mixer.music.get_busy():
+                self._pygame.mixer.music.stop()
+            if self.playing:
+                logger.info("🔇 Alarm stopped")
+        except Exception as e:
+            logger.error(f"Failed to stop alarm: {e}")
+        finally:
+            self.playing = False
+            self.current_code = None
+
+    def _release_mixer(self):
+        """Shut the mixer down from the thread that owns it"""
+        if not self.mixer_available:
+            return
+        try:
+            self._pygame.mixer.quit()
+        except Exception as e:
+            logger.error(f"Failed to release audio: {e}")
+        finally:
+            self.mixer_available = False
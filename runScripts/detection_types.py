@@ -0,0 +1,55 @@
+"""
+Detection Records for the ARCIS detection client
+Immutable tuple-backed records used on the hot path; converted to the
+legacy JSON dict layout only at network boundaries
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+WEAPON_LABELS = frozenset({'weapon', 'pistol', 'rifle', 'knife'})
+
+DEFAULT_BOX = (0, 0, 100, 100)
+
+
+class Detection(NamedTuple):
+    """One detected object - label is lowercase, box is (x1, y1, x2, y2) in pixels"""
+    label: str
+    confidence: float
+    box: Tuple[int, int, int, int]
+    source: str = ''
+
+    @property
+    def is_weapon(self) -> bool:
+        return self.label in WEAPON_LABELS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy dict layout expected by the server and WebSocket peers"""
+        return {
+            'class': self.label,
+            'confidence': self.confidence,
+            'box': list(self.box),
+            'description': self.label,
+            'source': self.source
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = '') -> 'Detection':
+        """Build from a VM / legacy detection dict"""
+        box = data.get('box') or DEFAULT_BOX
+        return cls(
+            label=str(data.get('class', '')).strip().lower(),
+            confidence=float(data.get('confidence', 0.0)),
+            box=tuple(int(v) for v in box[:4]),
+            source=data.get('source', source)
+        )
+
+    @classmethod
+    def from_row(cls, row: Iterable[Any]) -> 'Detection':
+        """Rebuild from a compact row (e.g. a cached JSON list)"""
+        label, confidence, box, *rest = row
+        return cls(label, float(confidence), tuple(box), rest[0] if rest else '')
+
+
+def detections_to_dicts(detections: Iterable[Detection]) -> List[Dict[str, Any]]:
+    """Serialize records for a network boundary"""
+    return [detection.to_dict() for detection in detections]
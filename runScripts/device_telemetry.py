@@ -0,0 +1,266 @@
+"""
+Device Telemetry Sampler for the ARCIS detection client
+Samples CPU, memory, temperature, power rail and Wi-Fi link quality on a
+background thread through file descriptors opened once, so uploads and
+heartbeats only read the latest snapshot
+"""
+
+import os
+import glob
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Jetson Nano INA3221 rail (mV) and Raspberry Pi under-voltage alarm locations
+JETSON_RAIL_PATTERNS = [
+    'bus/i2c/drivers/ina3221x/*/iio:device*/in_voltage0_input',
+    'bus/i2c/drivers/ina3221/*/hwmon/hwmon*/in1_input'
+]
+PI_VOLT_HWMON_NAME = 'rpi_volt'
+
+# Numeric system_metrics fields sent with uploads - a source with no reading is left out
+UPLOAD_METRIC_FIELDS = ('cpu_usage', 'memory_usage', 'temperature', 'voltage', 'network_strength')
+
+
+class TelemetrySnapshot(NamedTuple):
+    """One telemetry sample - None means the source is not available on this device"""
+    timestamp: float
+    cpu_usage: Optional[float]
+    memory_usage: Optional[float]
+    temperature: Optional[float]
+    voltage: Optional[float]
+    network_strength: Optional[float]
+    under_voltage: Optional[bool]
+
+
+class _ReusedFile:
+    """procfs/sysfs file kept open and re-read from offset 0 on every sample"""
+
+    def __init__(self, path: str, read_size: int = 4096):
+        self.path = path
+        self.read_size = read_size
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> str:
+        return os.pread(self.fd, self.read_size, 0).decode('ascii', errors='replace')
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class DeviceTelemetrySampler:
+    """Low-rate background sampler keeping a compact ring of recent snapshots"""
+
+    def __init__(self, interval: float = 2.0, history_size: int = 150,
+                 proc_root: str = '/proc', sys_root: str = '/sys'):
+        self.interval = interval
+        self.proc_root = proc_root
+        self.sys_root = sys_root
+
+        self.history = deque(maxlen=history_size)
+        self.latest: Optional[TelemetrySnapshot] = None
+        self.samples_taken = 0
+
+        self.running = False
+        self.thread = None
+
+        self._files: Dict[str, _ReusedFile] = {}
+        self._thermal_files: List[_ReusedFile] = []
+        self._previous_cpu = None
+        self._open_sources()
+
+    def _open(self, name: str, path: str, read_size: int = 4096):
+        """Open a source once; missing sources are simply skipped"""
+        try:
+            self._files[name] = _ReusedFile(path, read_size)
+        except OSError:
+            pass
+
+    def _open_sources(self):
+        """Discover and open every telemetry source available on this device"""
+        # Only the aggregate cpu line is needed - /proc/stat is large on busy systems
+        self._open('stat', os.path.join(self.proc_root, 'stat'), read_size=256)
+        self._open('meminfo', os.path.join(self.proc_root, 'meminfo'))
+        self._open('wireless', os.path.join(self.proc_root, 'net', 'wireless'))
+
+        for zone_path in sorted(glob.glob(os.path.join(self.sys_root, 'class/thermal/thermal_zone*/temp'))):
+            try:
+                self._thermal_files.append(_ReusedFile(zone_path, read_size=32))
+            except OSError:
+                continue
+
+        for pattern in JETSON_RAIL_PATTERNS:
+            rails = sorted(glob.glob(os.path.join(self.sys_root, pattern)))
+            if rails:
+                self._open('rail_mv', rails[0], read_size=32)
+                break
+
+        for name_path in glob.glob(os.path.join(self.sys_root, 'class/hwmon/hwmon*/name')):
+            try:
+                with open(name_path) as f:
+                    if f.read().strip() == PI_VOLT_HWMON_NAME:
+                        self._open('under_voltage', os.path.join(os.path.dirname(name_path), 'in0_lcrit_alarm'), read_size=32)
+                        break
+            except OSError:
+                continue
+
+        sources = sorted(self._files.keys()) + (['thermal'] if self._thermal_files else [])
+        logger.info(f"🌡️ Telemetry sources: {sources or 'none'}")
+
+    def start(self):
+        """Take a first sample and start the background thread"""
+        if self.running:
+            return
+        self.sample()
+        self.running = True
+        self.thread = threading.Thread(target=self._sampler_worker, daemon=True, name="DeviceTelemetry")
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling and close every held file descriptor"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1.0)
+        for reused in list(self._files.values()) + self._thermal_files:
+            reused.close()
+        self._files.clear()
+        self._thermal_files = []
+
+    def _sampler_worker(self):
+        """Sample at a fixed rate until stopped"""
+        next_sample = time.monotonic()
+        while self.running:
+            next_sample += self.interval
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+            if not self.running:
+                break
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Telemetry sample error: {e}")
+
+    def sample(self) -> TelemetrySnapshot:
+        """Read every source once and publish the snapshot"""
+        snapshot = TelemetrySnapshot(
+            timestamp=time.time(),
+            cpu_usage=self._read_cpu_usage(),
+            memory_usage=self._read_memory_usage(),
+            temperature=self._read_temperature(),
+            voltage=self._read_voltage(),
+            network_strength=self._read_network_strength(),
+            under_voltage=self._read_under_voltage()
+        )
+        self.history.append(snapshot)
+        # Single reference swap - readers never see a half-built sample
+        self.latest = snapshot
+        self.samples_taken += 1
+        return snapshot
+
+    def latest_metrics(self) -> Dict[str, Optional[float]]:
+        """Latest snapshot in the system_metrics field layout (no sampling)"""
+        snapshot = self.latest
+        if snapshot is None:
+            return {}
+        return {
+            'cpu_usage': snapshot.cpu_usage,
+            'memory_usage': snapshot.memory_usage,
+            'temperature': snapshot.temperature,
+            'voltage': snapshot.voltage,
+            'network_strength': snapshot.network_strength,
+            'under_voltage': snapshot.under_voltage,
+            'sampled_at': snapshot.timestamp
+        }
+
+    def upload_metrics(self) -> Dict[str, float]:
+        """Numeric fields of latest_metrics() for the upload payload - unavailable sources omitted"""
+        metrics = self.latest_metrics()
+        return {key: metrics[key] for key in UPLOAD_METRIC_FIELDS if metrics.get(key) is not None}
+
+    def _read_cpu_usage(self) -> Optional[float]:
+        """Busy percentage of all cores since the previous sample"""
+        source = self._files.get('stat')
+        if not source:
+            return None
+        try:
+            fields = source.read().split('\n', 1)[0].split()
+            values = [int(v) for v in fields[1:]]
+            idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+            total = sum(values[:8])
+        except (OSError, ValueError, IndexError):
+            return None
+
+        previous = self._previous_cpu
+        self._previous_cpu = (idle, total)
+        if previous is None or total <= previous[1]:
+            return None
+        return round(100.0 * (1.0 - (idle - previous[0]) / (total - previous[1])), 1)
+
+    def _read_memory_usage(self) -> Optional[float]:
+        """Used memory percentage based on MemAvailable"""
+        source = self._files.get('meminfo')
+        if not source:
+            return None
+        try:
+            meminfo = {}
+            for line in source.read().splitlines():
+                key, _, rest = line.partition(':')
+                if key in ('MemTotal', 'MemAvailable'):
+                    meminfo[key] = int(rest.split()[0])
+                    if len(meminfo) == 2:
+                        break
+            return round(100.0 * (1.0 - meminfo['MemAvailable'] / meminfo['MemTotal']), 1)
+        except (OSError, ValueError, KeyError, ZeroDivisionError):
+            return None
+
+    def _read_temperature(self) -> Optional[float]:
+        """Hottest thermal zone in degrees Celsius"""
+        hottest = None
+        for zone in self._thermal_files:
+            try:
+                celsius = int(zone.read().strip()) / 1000.0
+            except (OSError, ValueError):
+                continue
+            if hottest is None or celsius > hottest:
+                hottest = celsius
+        return round(hottest, 1) if hottest is not None else None
+
+    def _read_voltage(self) -> Optional[float]:
+        """Main power rail in volts (Jetson INA3221)"""
+        source = self._files.get('rail_mv')
+        if not source:
+            return None
+        try:
+            return round(int(source.read().strip()) / 1000.0, 3)
+        except (OSError, ValueError):
+            return None
+
+    def _read_under_voltage(self) -> Optional[bool]:
+        """Raspberry Pi under-voltage alarm"""
+        source = self._files.get('under_voltage')
+        if not source:
+            return None
+        try:
+            return source.read().strip() == '1'
+        except OSError:
+            return None
+
+    def _read_network_strength(self) -> Optional[float]:
+        """Wi-Fi link quality percentage of the first wireless interface"""
+        source = self._files.get('wireless')
+        if not source:
+            return None
+        try:
+            lines = source.read().splitlines()
+            if len(lines) < 3:
+                return None
+            link_quality = float(lines[2].split()[2].rstrip('.'))
+            return round(min(100.0, link_quality * 100.0 / 70.0), 1)
+        except (OSError, ValueError, IndexError):
+            return None
@@ -0,0 +1,193 @@
+"""
+Panic Switch and GPS for the ARCIS detection client
+Runs the edge-triggered switch service (switch/switch_service.py) and the
+L76X GPS service (L76X_gps/gps_service.py) inside the client process, so a
+press reaches the upload path directly and uploads carry the cached fix.
+With a state bus (state_bus.py) both are published for co-located processes.
+When a sidecar (L76X_gps/gps_switch_combined.py) owns the hardware instead,
+its switch and GPS records are watched on the bus and fed to the same callbacks.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_CONFIG = {
+    'poll_interval': 0.02   # seconds between bus version checks - bounds the extra press latency
+}
+
+
+class SidecarPress(NamedTuple):
+    """A press read from the bus - same fields the client uses from switch_service.SwitchEvent"""
+    pressed: bool
+    timestamp: float
+    monotonic: float     # the sidecar's time.monotonic() - same clock across processes on Linux
+    press_count: int
+
+
+class FieldIO:
+    """Owns the optional switch and GPS services; either may be unavailable"""
+
+    def __init__(self, switch_gpio: Optional[int] = None, gps_port: Optional[str] = None, gps_baud: int = 9600,
+                 on_press: Optional[Callable[[Any], None]] = None,
+                 on_fix: Optional[Callable[[float, float, float], None]] = None, bus=None):
+        self.switch_gpio = switch_gpio
+        self.gps_port = gps_port
+        self.gps_baud = gps_baud
+        self.on_press = on_press
+        self.on_fix = on_fix
+        self.bus = bus
+
+        self.switch = None
+        self.gps = None
+
+        # Press -> upload accepted by ARCIS (ms)
+        self.panic_latency_ms = deque(maxlen=100)
+        self.panic_presses = 0
+
+        # Sidecar records watched on the bus for whichever service is not running here
+        self.watch_switch = False
+        self.watch_gps = False
+        self.watch_stop = threading.Event()
+        self.watch_thread = None
+        self.bus_presses = 0
+        self.bus_fixes = 0
+
+    def start(self):
+        """Start whichever services are configured and importable (hardware libs are optional)"""
+        if self.switch_gpio is not None:
+            try:
+                from switch.switch_service import SwitchService
+                switch = SwitchService(self.switch_gpio)
+                switch.subscribe(self._handle_switch_event)
+                if switch.start():
+                    self.switch = switch
+                    logger.info(f"🔘 Panic switch armed on GPIO {self.switch_gpio}")
+            except ImportError as e:
+                logger.info(f"⚠️ Panic switch unavailable ({e})")
+
+        if self.gps_port:
+            try:
+                from L76X_gps.gps_service import GPSService
+                self.gps = GPSService(self.gps_port, self.gps_baud, fix_callback=self._handle_fix)
+                self.gps.start()
+            except ImportError as e:
+                logger.info(f"⚠️ GPS unavailable ({e})")
+
+        if self.bus is not None:
+            self.watch_switch = self.switch is None and self.on_press is not None
+            self.watch_gps = self.gps is None and self.on_fix is not None
+            if self.watch_switch or self.watch_gps:
+                self.watch_stop.clear()
+                self.watch_thread = threading.Thread(target=self._watch_bus, daemon=True, name="FieldIOBusWatch")
+                self.watch_thread.start()
+                watched = [name for name, on in (('switch', self.watch_switch), ('GPS', self.watch_gps)) if on]
+                logger.info(f"🔎 Watching the state bus for the sidecar {' and '.join(watched)}")
+
+    def _watch_bus(self):
+        """Poll the sidecar's record versions; read a record only when it changed"""
+        switch_version = self.bus.version('switch')
+        gps_version = self.bus.version('gps')
+        state = self.bus.read_switch()
+        press_count = state.press_count if state else 0  # presses before start are not replayed
+        fix_time = None
+
+        while not self.watch_stop.wait(SIDECAR_CONFIG['poll_interval']):
+            try:
+                if self.watch_switch and self.bus.version('switch') != switch_version:
+                    switch_version = self.bus.version('switch')
+                    state = self.bus.read_switch()
+                    if state is not None and state.press_count != press_count:
+                        # A lower count is a restarted sidecar - only a held switch is a press then
+                        if state.press_count > press_count or state.pressed:
+                            self._handle_bus_press(state)
+                        press_count = state.press_count
+
+                if self.watch_gps and self.bus.version('gps') != gps_version:
+                    gps_version = self.bus.version('gps')
+                    fix = self.bus.read_gps()
+                    if fix is not None and fix.valid and fix.fix_time != fix_time:
+                        fix_time = fix.fix_time
+                        self.bus_fixes += 1
+                        self.on_fix(fix.latitude, fix.longitude, fix.fix_time)
+            except Exception as e:
+                logger.error(f"State bus watch error: {e}")
+
+    def _handle_bus_press(self, state):
+        """One press per change - presses between two polls collapse into one panic upload
+
+        The record holds the latest edge, so after a short tap the timestamps are the release's.
+        """
+        self.panic_presses += 1
+        self.bus_presses += 1
+        self.on_press(SidecarPress(True, state.changed_at, state.changed_mono, state.press_count))
+
+    def _handle_fix(self, latitude: float, longitude: float, fix_time: float):
+        if self.bus is not None and self.gps is not None:
+            self.bus.write_gps(self.gps.latest())
+        if self.on_fix:
+            self.on_fix(latitude, longitude, fix_time)
+
+    def _handle_switch_event(self, event):
+        if self.bus is not None:
+            self.bus.write_switch(event.pressed, event.press_count, event.timestamp, event.monotonic)
+        if not event.pressed:
+            return
+        self.panic_presses += 1
+        if self.on_press:
+            self.on_press(event)
+
+    def gps_stamp(self, max_age: float) -> Optional[Dict[str, Any]]:
+        """Latest valid fix as upload metadata - None without a fix younger than max_age"""
+        if self.gps is not None:
+            fix = self.gps.latest()
+        elif self.bus is not None:
+            fix = self.bus.read_gps()
+        else:
+            fix = None
+        if fix is None or not fix.valid or time.time() - fix.fix_time > max_age:
+            return None
+        return {
+            'latitude': fix.latitude,
+            'longitude': fix.longitude,
+            'satellites': fix.satellites,
+            'fix_quality': fix.fix_quality,
+            'fix_age_s': round(time.time() - fix.fix_time, 2)
+        }
+
+    def record_panic_latency(self, pressed_at: float) -> float:
+        """pressed_at is the switch event's time.monotonic()"""
+        latency_ms = (time.monotonic() - pressed_at) * 1000.0
+        self.panic_latency_ms.append(latency_ms)
+        return latency_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.panic_latency_ms)
+        return {
+            'switch_armed': self.switch is not None,
+            'gps_running': self.gps is not None,
+            'state_bus': self.bus.stats if self.bus is not None else {},
+            'sidecar_presses': self.bus_presses,
+            'sidecar_fixes': self.bus_fixes,
+            'panic_presses': self.panic_presses,
+            'panic_uploads': len(ordered),
+            'press_to_upload_ms_p50': ordered[len(ordered) // 2] if ordered else 0.0,
+            'press_to_upload_ms_max': ordered[-1] if ordered else 0.0,
+            'gps': self.gps.get_stats() if self.gps else {}
+        }
+
+    def stop(self):
+        if self.watch_thread is not None:
+            self.watch_stop.set()
+            self.watch_thread.join(timeout=1.0)
+            self.watch_thread = None
+        if self.switch is not None:
+            self.switch.stop()
+            self.switch = None
+        if self.gps is not None:
+            self.gps.stop()
+            self.gps = None
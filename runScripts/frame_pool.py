@@ -0,0 +1,194 @@
+"""
+Shared-Memory Frame Pool for the ARCIS detection client
+Capture copies each frame into a slot of one multiprocessing.shared_memory
+block; JPEG encoding, MD5 hashing and resizing run in a worker-process pool
+that reads the slot by index, so they leave the client's GIL. Only the slot
+index and settings go to a worker - the JPEG bytes and hash come back.
+"""
+
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_POOL_CONFIG = {
+    'encode_timeout': 5.0,     # seconds to wait for a worker before encoding in-process
+    'start_method': 'spawn'    # fork would copy the client's threads and OpenCV's thread pool
+}
+
+# Worker-process state - the attached block and its slot array
+_worker_shm = None
+_worker_frames = None
+
+
+def encode_jpeg(frame, quality: int = 85, max_width: Optional[int] = None) -> Tuple[bytes, str]:
+    """JPEG bytes and their MD5 (the Redis inference cache key) - in-process path"""
+    import cv2
+    if max_width and frame.shape[1] > max_width:
+        scale = max_width / frame.shape[1]
+        frame = cv2.resize(frame, (max_width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    jpeg_bytes = buffer.tobytes()
+    return jpeg_bytes, hashlib.md5(jpeg_bytes).hexdigest()
+
+
+def _attach_worker(name: str, shape: Tuple[int, ...], slots: int):
+    global _worker_shm, _worker_frames
+    import cv2
+    cv2.setNumThreads(1)  # one core per worker - the pool is the parallelism
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_frames = np.ndarray((slots,) + tuple(shape), dtype=np.uint8, buffer=_worker_shm.buf)
+
+
+def _encode_slot(slot: int, quality: int, max_width: Optional[int]) -> Tuple[bytes, str]:
+    return encode_jpeg(_worker_frames[slot], quality, max_width)
+
+
+class FramePool:
+    """Fixed frame slots in shared memory plus the worker processes that encode them"""
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 6, workers: int = 2):
+        self.shape = tuple(shape)
+        self.slot_count = slots
+        self.workers = workers
+        self.slot_bytes = int(np.prod(self.shape))
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slots)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.base_address = self.frames.__array_interface__['data'][0]
+
+        self.free_slots = deque(range(slots))
+        self.slot_refs = [0] * slots   # holders per slot - freed when the last one releases
+        self.slot_lock = threading.Lock()
+        self.executor = None
+
+        self.stats = {
+            'frames_written': 0,
+            'slots_exhausted': 0,
+            'worker_encodes': 0,
+            'inline_encodes': 0,
+            'worker_errors': 0
+        }
+
+    def start(self):
+        context = multiprocessing.get_context(FRAME_POOL_CONFIG['start_method'])
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_attach_worker, initargs=(self.shm.name, self.shape, self.slot_count)
+        )
+        logger.info(f"🧵 Frame pool: {self.slot_count} x {self.shape} slots, {self.workers} encode workers")
+
+    # ---- slots ------------------------------------------------------------------
+
+    def acquire(self) -> Optional[int]:
+        with self.slot_lock:
+            if not self.free_slots:
+                self.stats['slots_exhausted'] += 1
+                return None
+            slot = self.free_slots.popleft()
+            self.slot_refs[slot] = 1
+            return slot
+
+    def slot_of(self, frame) -> Optional[int]:
+        """Slot index of a frame that is a whole slot view, else None"""
+        if not isinstance(frame, np.ndarray) or frame.shape != self.shape or not frame.flags['C_CONTIGUOUS']:
+            return None
+        offset = frame.__array_interface__['data'][0] - self.base_address
+        if offset < 0 or offset % self.slot_bytes:
+            return None
+        slot = offset // self.slot_bytes
+        return slot if slot < self.slot_count else None
+
+    def write(self, frame):
+        """Copy a captured frame into a free slot - returns the slot view, or None when full"""
+        if frame.shape != self.shape:
+            return None
+        slot = self.acquire()
+        if slot is None:
+            return None
+        view = self.frames[slot]
+        np.copyto(view, frame)
+        self.stats['frames_written'] += 1
+        return view
+
+    def retain(self, frame):
+        """Hold a slot view for another reader (an abandoned inference call, a busy worker)"""
+        slot = self.slot_of(frame)
+        if slot is not None:
+            self._retain_slot(slot)
+
+    def release(self, frame):
+        """Drop one hold on a slot view - ordinary frames are ignored"""
+        slot = self.slot_of(frame)
+        if slot is not None:
+            self._release_slot(slot)
+
+    def _retain_slot(self, slot: int):
+        with self.slot_lock:
+            if self.slot_refs[slot]:
+                self.slot_refs[slot] += 1
+
+    def _release_slot(self, slot: int):
+        """The slot goes back on the free list only when its last holder is done"""
+        with self.slot_lock:
+            if not self.slot_refs[slot]:
+                return  # already free - a double release is harmless
+            self.slot_refs[slot] -= 1
+            if not self.slot_refs[slot]:
+                self.free_slots.append(slot)
+
+    # ---- encoding ---------------------------------------------------------------
+
+    def encode(self, frame, quality: int = 85, max_width: Optional[int] = None) -> Tuple[bytes, str]:
+        """JPEG bytes and MD5 from a worker; frames outside the pool are copied into a slot first"""
+        slot = self.slot_of(frame)
+        owned = None
+        if slot is None and self.executor is not None:
+            owned = self.write(frame)
+            slot = self.slot_of(owned) if owned is not None else None
+
+        try:
+            if slot is not None and self.executor is not None:
+                future = None
+                try:
+                    future = self.executor.submit(_encode_slot, slot, quality, max_width)
+                    result = future.result(timeout=FRAME_POOL_CONFIG['encode_timeout'])
+                    self.stats['worker_encodes'] += 1
+                    return result
+                except (BrokenProcessPool, TimeoutError, OSError) as e:
+                    self.stats['worker_errors'] += 1
+                    logger.warning(f"Frame pool worker failed ({e}) - encoding in-process")
+                    if future is not None and not future.cancel():
+                        # A worker may still be reading the slot - keep it until that finishes
+                        self._retain_slot(slot)
+                        future.add_done_callback(lambda _: self._release_slot(slot))
+            self.stats['inline_encodes'] += 1
+            return encode_jpeg(frame, quality, max_width)
+        finally:
+            if owned is not None:
+                self.release(owned)
+
+    def get_stats(self):
+        with self.slot_lock:
+            free = len(self.free_slots)
+        return {**self.stats, 'slots_free': free, 'slots': self.slot_count, 'workers': self.workers}
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # slot views still referenced elsewhere - the mapping goes with them
+        self.shm.unlink()
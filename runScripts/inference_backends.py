@@ -0,0 +1,294 @@
+"""
+Inference Backend Failover for the ARCIS detection client
+Per-backend circuit breakers with health probing, ordered failover and
+optional hedged requests between VM inference and the Google Vision SDK
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states
+CLOSED = 'CLOSED'        # healthy - requests flow
+OPEN = 'OPEN'            # failing - requests skip this backend
+HALF_OPEN = 'HALF_OPEN'  # cooling down - one trial request allowed
+
+
+class InferenceBackendError(Exception):
+    """Raised by a backend call that failed (timeout, network, bad status)"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a latency window"""
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=10.0, latency_window=50):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+        self.latencies = deque(maxlen=latency_window)
+        self.successes = 0
+        self.failures = 0
+        self.times_opened = 0
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """True if a request may be sent to this backend now"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+                logger.info(f"🟡 {self.name} breaker HALF_OPEN - allowing a trial request")
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+            if self.state != CLOSED:
+                logger.info(f"🟢 {self.name} breaker CLOSED - backend recovered")
+            self.state = CLOSED
+
+    def reset(self):
+        """Close after a passing health probe - no latency sample (probes are not inference calls)"""
+        with self.lock:
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+            if self.state != CLOSED:
+                logger.info(f"🟢 {self.name} breaker CLOSED - health probe passed")
+            self.state = CLOSED
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"🔴 {self.name} breaker OPEN after {self.consecutive_failures} failures: {error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def latency_percentile(self, percentile):
+        """Latency (seconds) at the given percentile of recent successes, None if no data"""
+        with self.lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100.0))
+        return ordered[index]
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'successes': self.successes,
+                'failures': self.failures,
+                'times_opened': self.times_opened,
+                'last_error': self.last_error
+            }
+
+
+class InferenceBackend:
+    """A named inference function plus its breaker and optional health probe"""
+
+    def __init__(self, name, infer_func, breaker, probe_func=None):
+        self.name = name
+        self.infer_func = infer_func      # frame -> detections, raises on failure
+        self.breaker = breaker
+        self.probe_func = probe_func      # () -> bool, cheap health check
+
+    def is_available(self):
+        with self.breaker.lock:
+            return self.breaker.state != OPEN
+
+
+class InferenceRouter:
+    """Routes frames to the first healthy backend, failing over and hedging"""
+
+    def __init__(self, backends, hedge_enabled=False, hedge_percentile=95,
+                 min_hedge_delay=0.3, probe_interval=5.0, max_workers=4,
+                 retain_frame=None, release_frame=None):
+        self.backends = list(backends)
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.probe_interval = probe_interval
+        # Frame holds for calls run on the executor - an abandoned call keeps reading its frame
+        self.retain_frame = retain_frame
+        self.release_frame = release_frame
+
+        self.failovers = 0
+        self.skipped_open = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.all_failed = 0
+        self.stats_lock = threading.Lock()
+
+        # Abandoned slow calls keep running after a hedge wins - leave headroom for them
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='Inference')
+        self.running = False
+        self.probe_thread = None
+
+    def start(self):
+        """Start the background health prober"""
+        if self.running:
+            return
+        self.running = True
+        self.probe_thread = threading.Thread(target=self._probe_worker, daemon=True, name="InferenceProbe")
+        self.probe_thread.start()
+
+    def stop(self):
+        self.running = False
+        self.executor.shutdown(wait=False)
+
+    def add_backend(self, backend):
+        """Append a lower-priority backend once it becomes usable"""
+        self.backends = self.backends + [backend]
+
+    def _count(self, counter, amount=1):
+        with self.stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _call(self, backend, frame):
+        """Run one backend call and feed the outcome to its breaker"""
+        start = time.perf_counter()
+        try:
+            detections = backend.infer_func(frame)
+        except Exception as e:
+            backend.breaker.record_failure(e)
+            raise
+        backend.breaker.record_success(time.perf_counter() - start)
+        return detections
+
+    def _submit(self, backend, frame):
+        """_call on the executor, holding the frame until the call finishes even if nobody waits for it"""
+        if self.retain_frame is not None:
+            self.retain_frame(frame)
+        try:
+            future = self.executor.submit(self._call, backend, frame)
+        except Exception:
+            if self.release_frame is not None:
+                self.release_frame(frame)
+            raise
+        if self.release_frame is not None:
+            future.add_done_callback(lambda _: self.release_frame(frame))
+        return future
+
+    def detect(self, frame):
+        """Return (detections, backend name); ([], None) when every backend failed"""
+        primary = self.backends[0] if self.backends else None
+        tried = set()
+
+        for position, backend in enumerate(self.backends):
+            if backend.name in tried:
+                continue
+            # Checked lazily so a HALF_OPEN trial slot is only taken when actually used
+            if not backend.breaker.allow_request():
+                self._count('skipped_open')
+                continue
+            if backend is not primary:
+                self._count('failovers')
+            tried.add(backend.name)
+
+            hedge = self._hedge_candidate(position) if self.hedge_enabled else None
+            try:
+                if hedge is not None:
+                    detections, used = self._detect_hedged(backend, hedge, frame, tried)
+                    return detections, used.name
+                return self._call(backend, frame), backend.name
+            except Exception as e:
+                logger.warning(f"{backend.name} inference failed: {e} - failing over")
+                continue
+
+        self._count('all_failed')
+        return [], None
+
+    def _hedge_candidate(self, position):
+        """Next healthy (CLOSED) backend after position - never hedge onto a recovering one"""
+        for backend in self.backends[position + 1:]:
+            with backend.breaker.lock:
+                if backend.breaker.state == CLOSED:
+                    return backend
+        return None
+
+    def _detect_hedged(self, primary, secondary, frame, tried):
+        """Send to primary; if it is slower than its usual tail latency, also ask secondary"""
+        primary_future = self._submit(primary, frame)
+
+        hedge_delay = primary.breaker.latency_percentile(self.hedge_percentile)
+        hedge_delay = max(self.min_hedge_delay, hedge_delay or self.min_hedge_delay)
+
+        done, _ = wait([primary_future], timeout=hedge_delay)
+        if done or not secondary.breaker.allow_request():
+            return primary_future.result(), primary
+
+        self._count('hedges_sent')
+        tried.add(secondary.name)
+        secondary_future = self._submit(secondary, frame)
+        pending = {primary_future, secondary_future}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary_future:
+                        self._count('hedge_wins')
+                        return future.result(), secondary
+                    return future.result(), primary
+
+        # Both failed - surface the primary error so the caller fails over further
+        return primary_future.result(), primary
+
+    def _probe_worker(self):
+        """Actively probe open backends so they recover without sacrificing frames"""
+        while self.running:
+            time.sleep(self.probe_interval)
+            for backend in self.backends:
+                if backend.probe_func is None or backend.is_available():
+                    continue
+                try:
+                    healthy = backend.probe_func()
+                except Exception as e:
+                    healthy = False
+                    logger.debug(f"{backend.name} health probe error: {e}")
+
+                if healthy:
+                    backend.breaker.reset()
+                else:
+                    with backend.breaker.lock:
+                        # Keep it open for another full cooldown
+                        backend.breaker.opened_at = time.monotonic()
+
+    def get_stats(self):
+        """Breaker state per backend plus failover/hedge counters"""
+        with self.stats_lock:
+            stats = {
+                'failovers': self.failovers,
+                'skipped_open': self.skipped_open,
+                'hedges_sent': self.hedges_sent,
+                'hedge_wins': self.hedge_wins,
+                'all_failed': self.all_failed
+            }
+        stats['backends'] = {backend.name: backend.breaker.get_stats() for backend in self.backends}
+        return stats
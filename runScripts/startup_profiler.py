@@ -0,0 +1,76 @@
+"""
+Startup Phase Profiler for the ARCIS detection client
+Records how many milliseconds each init step takes and when milestones
+(e.g. first detection) are reached relative to process start
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Thread-safe per-phase startup timer"""
+
+    def __init__(self, origin=None):
+        # perf_counter() value treated as t=0 (normally taken before the heavy imports)
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.phases = {}       # name -> (start offset ms, duration ms, thread name)
+        self.milestones = {}   # name -> offset ms
+        self.lock = threading.Lock()
+
+    def record(self, name, start, end=None):
+        """Record a phase from explicit perf_counter() timestamps"""
+        end = end if end is not None else time.perf_counter()
+        with self.lock:
+            self.phases[name] = (
+                (start - self.origin) * 1000.0,
+                (end - start) * 1000.0,
+                threading.current_thread().name
+            )
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one init step"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start)
+
+    def timed(self, name, func, *args, **kwargs):
+        """Run func as a named phase and return its result (handy for executors)"""
+        with self.phase(name):
+            return func(*args, **kwargs)
+
+    def mark(self, name):
+        """Record a milestone the first time it is reached"""
+        with self.lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = (time.perf_counter() - self.origin) * 1000.0
+            return True
+
+    def report(self):
+        """Phases and milestones in start order"""
+        with self.lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+            return {
+                'phases': [
+                    {'name': name, 'start_ms': round(start, 1), 'duration_ms': round(duration, 1), 'thread': thread}
+                    for name, (start, duration, thread) in phases
+                ],
+                'milestones': {name: round(offset, 1) for name, offset in self.milestones.items()}
+            }
+
+    def log_report(self):
+        """Log the startup profile"""
+        report = self.report()
+        logger.info("⏱️ Startup profile (ms since process start):")
+        for phase in report['phases']:
+            logger.info(f"   {phase['name']:<22} start {phase['start_ms']:>8.1f}  took {phase['duration_ms']:>8.1f}  [{phase['thread']}]")
+        for name, offset in report['milestones'].items():
+            logger.info(f"   ➜ {name:<20} at {offset:>8.1f}")
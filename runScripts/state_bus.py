@@ -0,0 +1,216 @@
+"""
+Shared-Memory State Bus for co-located ARCIS processes
+A small mmap'd file (in /dev/shm) holding the latest frame metadata,
+detections, GPS fix and switch state as fixed binary records. Each record
+has one writer process and a seqlock: the writer makes the sequence odd,
+writes, then makes it even; readers retry until they copy a record with the
+same even sequence before and after. A CRC over the payload also catches
+reorderings the seqlock alone cannot on weakly-ordered CPUs (ARM).
+"""
+
+import os
+import mmap
+import time
+import struct
+import zlib
+import tempfile
+from typing import List, NamedTuple, Optional, Tuple
+
+STATE_BUS_CONFIG = {
+    'path': os.environ.get('ARCIS_STATE_BUS') or (
+        '/dev/shm/arcis_state_bus' if os.path.isdir('/dev/shm')
+        else os.path.join(tempfile.gettempdir(), 'arcis_state_bus')
+    ),
+    'max_detections': 16,
+    'label_bytes': 24,
+    'read_retries': 1000
+}
+
+_MAGIC = b'ARCS'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHH')        # magic, version, record count
+_RECORD_HEADER = struct.Struct('<QII')  # sequence, payload length, crc32
+_SLOT_ALIGN = 64                        # one cache line per record header
+
+
+class FrameMeta(NamedTuple):
+    frame_id: int
+    captured_at: float     # time.time()
+    captured_mono: float   # time.monotonic() - comparable across processes on Linux
+    width: int
+    height: int
+    fps: float
+
+
+class BusDetections(NamedTuple):
+    frame_id: int
+    timestamp: float
+    detections: List[Tuple[str, float, Tuple[int, int, int, int], bool]]  # label, confidence, box, is_weapon
+
+
+class BusGPSFix(NamedTuple):
+    valid: bool
+    latitude: float
+    longitude: float
+    satellites: int
+    fix_quality: int
+    fix_time: float
+    updated: float
+
+
+class BusSwitchState(NamedTuple):
+    pressed: bool
+    press_count: int
+    changed_at: float      # time.time() of the last accepted edge
+    changed_mono: float    # time.monotonic() of the last accepted edge
+
+
+_FRAME = struct.Struct('<QddHHf')
+_DETECTIONS_HEADER = struct.Struct('<QdB')
+_DETECTION = struct.Struct(f"<{STATE_BUS_CONFIG['label_bytes']}sfHHHHB")
+_GPS = struct.Struct('<BddBBdd')
+_SWITCH = struct.Struct('<BIdd')
+
+# name -> payload capacity
+RECORDS = (
+    ('frame', _FRAME.size),
+    ('detections', _DETECTIONS_HEADER.size + STATE_BUS_CONFIG['max_detections'] * _DETECTION.size),
+    ('gps', _GPS.size),
+    ('switch', _SWITCH.size)
+)
+
+
+def _aligned(size: int) -> int:
+    return (size + _SLOT_ALIGN - 1) // _SLOT_ALIGN * _SLOT_ALIGN
+
+
+def _layout():
+    offsets = {}
+    offset = _aligned(_HEADER.size)
+    for name, capacity in RECORDS:
+        offsets[name] = (offset, capacity)
+        offset += _aligned(_RECORD_HEADER.size + capacity)
+    return offsets, offset
+
+
+class StateBus:
+    """Latest-value records shared through an mmap'd file - one writer per record"""
+
+    def __init__(self, path: Optional[str] = None, create: bool = True):
+        self.path = path or STATE_BUS_CONFIG['path']
+        self.offsets, self.size = _layout()
+
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        fd = os.open(self.path, flags, 0o660)
+        try:
+            if os.fstat(fd).st_size < self.size:
+                if not create:
+                    raise ValueError(f"State bus {self.path} is not initialised")
+                os.ftruncate(fd, self.size)
+            self.map = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+
+        magic, version, count = _HEADER.unpack_from(self.map, 0)
+        if magic == b'\0' * 4 and create:
+            _HEADER.pack_into(self.map, 0, _MAGIC, _VERSION, len(RECORDS))
+        elif magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"State bus {self.path} has an incompatible layout")
+
+        self.stats = {'writes': 0, 'reads': 0, 'read_retries': 0, 'torn_reads': 0}
+
+    # ---- seqlock core -----------------------------------------------------------
+
+    def _write(self, name: str, payload: bytes):
+        offset, capacity = self.offsets[name]
+        payload = payload[:capacity]
+        sequence = struct.unpack_from('<Q', self.map, offset)[0]
+        if sequence & 1:
+            sequence += 1  # a writer died mid-update - start from a clean even value
+        struct.pack_into('<Q', self.map, offset, sequence + 1)
+        data_offset = offset + _RECORD_HEADER.size
+        self.map[data_offset:data_offset + len(payload)] = payload
+        struct.pack_into('<II', self.map, offset + 8, len(payload), zlib.crc32(payload))
+        struct.pack_into('<Q', self.map, offset, sequence + 2)
+        self.stats['writes'] += 1
+
+    def _read(self, name: str) -> Optional[bytes]:
+        offset, _ = self.offsets[name]
+        data_offset = offset + _RECORD_HEADER.size
+        for attempt in range(STATE_BUS_CONFIG['read_retries']):
+            before, length, crc = _RECORD_HEADER.unpack_from(self.map, offset)
+            if before == 0:
+                return None  # never written
+            if not before & 1:
+                payload = self.map[data_offset:data_offset + length]
+                after = struct.unpack_from('<Q', self.map, offset)[0]
+                if after == before and zlib.crc32(payload) == crc:
+                    self.stats['reads'] += 1
+                    self.stats['read_retries'] += attempt
+                    return payload
+            if attempt > 10:
+                time.sleep(0)  # let a descheduled writer finish
+        self.stats['torn_reads'] += 1
+        return None
+
+    def version(self, name: str) -> int:
+        """Record sequence - changes on every write; cheap change detection for pollers"""
+        return struct.unpack_from('<Q', self.map, self.offsets[name][0])[0]
+
+    # ---- records ------------------------------------------------------------------
+
+    def write_frame_meta(self, frame_id: int, width: int, height: int, fps: float = 0.0,
+                         captured_at: Optional[float] = None, captured_mono: Optional[float] = None):
+        self._write('frame', _FRAME.pack(frame_id, captured_at or time.time(), captured_mono or time.monotonic(),
+                                         width, height, fps))
+
+    def read_frame_meta(self) -> Optional[FrameMeta]:
+        payload = self._read('frame')
+        return FrameMeta(*_FRAME.unpack(payload)) if payload else None
+
+    def write_detections(self, frame_id: int, detections, timestamp: Optional[float] = None):
+        """detections: records with label, confidence, box and is_weapon (runScripts/detection_types)"""
+        rows = detections[:STATE_BUS_CONFIG['max_detections']]
+        parts = [_DETECTIONS_HEADER.pack(frame_id, timestamp or time.time(), len(rows))]
+        for det in rows:
+            x1, y1, x2, y2 = (max(0, min(65535, int(v))) for v in det.box)
+            parts.append(_DETECTION.pack(str(det.label).encode('utf-8')[:STATE_BUS_CONFIG['label_bytes']],
+                                         det.confidence, x1, y1, x2, y2, 1 if det.is_weapon else 0))
+        self._write('detections', b''.join(parts))
+
+    def read_detections(self) -> Optional[BusDetections]:
+        payload = self._read('detections')
+        if not payload:
+            return None
+        frame_id, timestamp, count = _DETECTIONS_HEADER.unpack_from(payload, 0)
+        rows = []
+        for i in range(count):
+            label, confidence, x1, y1, x2, y2, weapon = _DETECTION.unpack_from(
+                payload, _DETECTIONS_HEADER.size + i * _DETECTION.size)
+            rows.append((label.rstrip(b'\0').decode('utf-8', 'replace'), confidence, (x1, y1, x2, y2), bool(weapon)))
+        return BusDetections(frame_id, timestamp, rows)
+
+    def write_gps(self, fix):
+        """fix: L76X_gps.gps_service.GPSFix (or anything with the same fields)"""
+        self._write('gps', _GPS.pack(1 if fix.valid else 0, fix.latitude or 0.0, fix.longitude or 0.0,
+                                     min(fix.satellites, 255), min(fix.fix_quality, 255), fix.fix_time, fix.updated))
+
+    def read_gps(self) -> Optional[BusGPSFix]:
+        payload = self._read('gps')
+        if not payload:
+            return None
+        valid, *fields = _GPS.unpack(payload)
+        return BusGPSFix(bool(valid), *fields)
+
+    def write_switch(self, pressed: bool, press_count: int, changed_at: float, changed_mono: float):
+        self._write('switch', _SWITCH.pack(1 if pressed else 0, press_count, changed_at, changed_mono))
+
+    def read_switch(self) -> Optional[BusSwitchState]:
+        payload = self._read('switch')
+        if not payload:
+            return None
+        pressed, *fields = _SWITCH.unpack(payload)
+        return BusSwitchState(bool(pressed), *fields)
+
+    def close(self):
+        self.map.close()
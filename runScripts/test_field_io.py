@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test Script for the in-process panic switch / GPS wiring
+Uses stand-ins for the hardware services - no GPIO or serial port needed
+"""
+
+import os
+import time
+import tempfile
+from types import SimpleNamespace
+
+from field_io import FieldIO
+from state_bus import StateBus
+
+
+class FakeGPS:
+    def __init__(self, fix):
+        self.fix = fix
+
+    def latest(self):
+        return self.fix
+
+    def get_stats(self):
+        return {}
+
+
+def make_fix(valid=True, age=1.0):
+    return SimpleNamespace(valid=valid, latitude=32.05, longitude=34.77, satellites=8, fix_quality=1,
+                           fix_time=time.time() - age)
+
+
+def press(pressed=True):
+    return SimpleNamespace(pressed=pressed, timestamp=time.time(), monotonic=time.monotonic(), press_count=1)
+
+
+def test_gps_stamp_needs_a_fresh_valid_fix():
+    field_io = FieldIO()
+    assert field_io.gps_stamp(30.0) is None  # no GPS service
+
+    field_io.gps = FakeGPS(make_fix(age=2.0))
+    stamp = field_io.gps_stamp(30.0)
+    assert stamp['latitude'] == 32.05 and stamp['satellites'] == 8
+    assert 1.9 < stamp['fix_age_s'] < 3.0
+
+    field_io.gps = FakeGPS(make_fix(age=45.0))
+    assert field_io.gps_stamp(30.0) is None
+    field_io.gps = FakeGPS(make_fix(valid=False))
+    assert field_io.gps_stamp(30.0) is None
+
+
+def test_gps_stamp_from_sidecar_bus():
+    bus = StateBus(os.path.join(tempfile.mkdtemp(prefix='arcis_bus_'), 'state_bus'))
+    field_io = FieldIO(bus=bus)
+    assert field_io.gps_stamp(30.0) is None  # sidecar has not published yet
+
+    bus.write_gps(SimpleNamespace(**make_fix(age=2.0).__dict__, updated=time.time()))
+    stamp = field_io.gps_stamp(30.0)
+    assert stamp['latitude'] == 32.05 and stamp['satellites'] == 8
+    bus.close()
+
+
+def test_switch_events_are_published():
+    bus = StateBus(os.path.join(tempfile.mkdtemp(prefix='arcis_bus_'), 'state_bus'))
+    field_io = FieldIO(bus=bus)
+    field_io._handle_switch_event(press(True))
+    state = bus.read_switch()
+    assert state.pressed and state.press_count == 1
+    bus.close()
+
+
+def test_only_presses_reach_the_client():
+    presses = []
+    field_io = FieldIO(on_press=presses.append)
+    field_io._handle_switch_event(press(True))
+    field_io._handle_switch_event(press(False))
+    assert len(presses) == 1 and field_io.panic_presses == 1
+
+
+def test_press_to_upload_latency():
+    field_io = FieldIO()
+    pressed_at = time.monotonic() - 0.25
+    latency_ms = field_io.record_panic_latency(pressed_at)
+    assert 240.0 < latency_ms < 1000.0
+    stats = field_io.get_stats()
+    assert stats['panic_uploads'] == 1
+    assert stats['press_to_upload_ms_max'] == latency_ms
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_sidecar_switch_and_gps_reach_the_client():
+    path = os.path.join(tempfile.mkdtemp(prefix='arcis_bus_'), 'state_bus')
+    sidecar = StateBus(path)
+    sidecar.write_switch(False, 4, time.time(), time.monotonic())  # presses from before the client started
+
+    presses, fixes = [], []
+    field_io = FieldIO(on_press=presses.append, on_fix=lambda *fix: fixes.append(fix),
+                       bus=StateBus(path, create=False))
+    field_io.start()
+    try:
+        assert field_io.watch_switch and field_io.watch_gps
+        time.sleep(0.05)
+        assert presses == []
+
+        pressed_mono = time.monotonic()
+        sidecar.write_switch(True, 5, time.time(), pressed_mono)
+        assert wait_for(lambda: len(presses) == 1)
+        assert presses[0].press_count == 5 and presses[0].monotonic == pressed_mono
+        sidecar.write_switch(False, 5, time.time(), time.monotonic())  # release - no press
+
+        fix = make_fix(age=0.5)
+        sidecar.write_gps(SimpleNamespace(**fix.__dict__, updated=time.time()))
+        assert wait_for(lambda: len(fixes) == 1)
+        assert fixes[0] == (32.05, 34.77, fix.fix_time)
+        sidecar.write_gps(SimpleNamespace(**fix.__dict__, updated=time.time()))  # same fix again
+        time.sleep(0.1)
+        assert len(presses) == 1 and len(fixes) == 1
+        assert field_io.get_stats()['sidecar_presses'] == 1
+    finally:
+        field_io.stop()
+        field_io.bus.close()
+        sidecar.close()
+
+
+def test_owned_services_are_not_watched():
+    bus = StateBus(os.path.join(tempfile.mkdtemp(prefix='arcis_bus_'), 'state_bus'))
+    field_io = FieldIO(on_press=lambda event: None, bus=bus)
+    field_io.switch = object()  # as if the in-process switch had started
+    field_io.start()
+    assert not field_io.watch_switch and field_io.watch_thread is None
+    field_io.switch = None
+    field_io.stop()
+    bus.close()
+
+
+def run_tests():
+    print("🚀 FIELD IO TESTS")
+    test_gps_stamp_needs_a_fresh_valid_fix()
+    test_gps_stamp_from_sidecar_bus()
+    test_switch_events_are_published()
+    test_only_presses_reach_the_client()
+    test_press_to_upload_latency()
+    test_sidecar_switch_and_gps_reach_the_client()
+    test_owned_services_are_not_watched()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
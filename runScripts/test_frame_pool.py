@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test Script for the shared-memory frame pool
+Slot bookkeeping runs anywhere; the worker round trip needs OpenCV
+"""
+
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import frame_pool
+from frame_pool import FRAME_POOL_CONFIG, FramePool, encode_jpeg
+
+SHAPE = (48, 64, 3)
+
+
+def make_frame(value):
+    frame = np.zeros(SHAPE, dtype=np.uint8)
+    frame[8:40, 16:48] = value
+    return frame
+
+
+def test_slots_are_reused():
+    pool = FramePool(SHAPE, slots=2, workers=1)
+    try:
+        first = pool.write(make_frame(10))
+        second = pool.write(make_frame(20))
+        assert pool.slot_of(first) == 0 and pool.slot_of(second) == 1
+        assert first[10, 20, 0] == 10 and second[10, 20, 0] == 20
+
+        # Full pool - capture falls back to an ordinary copy
+        assert pool.write(make_frame(30)) is None
+        assert pool.get_stats()['slots_exhausted'] == 1
+
+        pool.release(first)
+        pool.release(first)          # double release is harmless
+        pool.release(make_frame(0))  # frames outside the pool are ignored
+        assert pool.get_stats()['slots_free'] == 1
+        assert pool.slot_of(pool.write(make_frame(40))) == 0
+
+        # Frames of another shape never go into a slot
+        assert pool.write(np.zeros((10, 10, 3), dtype=np.uint8)) is None
+        assert pool.slot_of(second[1:]) is None
+    finally:
+        pool.stop()
+
+
+def test_slot_is_freed_by_its_last_holder():
+    pool = FramePool(SHAPE, slots=1, workers=1)
+    try:
+        frame = pool.write(make_frame(10))
+        pool.retain(frame)           # e.g. an abandoned hedged call
+        pool.release(frame)          # detection_worker is done with it
+        assert pool.get_stats()['slots_free'] == 0
+        assert pool.write(make_frame(20)) is None
+        pool.release(frame)
+        assert pool.get_stats()['slots_free'] == 1
+    finally:
+        pool.stop()
+
+
+class StuckExecutor:
+    """Worker that has started on the slot and not finished"""
+
+    def __init__(self):
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+
+    def submit(self, *args):
+        return self.future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_timed_out_worker_keeps_its_slot(monkeypatch):
+    monkeypatch.setitem(FRAME_POOL_CONFIG, 'encode_timeout', 0.01)
+    monkeypatch.setattr(frame_pool, 'encode_jpeg', lambda frame, quality, max_width=None: (b'jpeg', 'hash'))
+    pool = FramePool(SHAPE, slots=2, workers=1)
+    pool.executor = StuckExecutor()
+    try:
+        # Borrowed slot for an ordinary frame - not reused while the worker may still read it
+        assert pool.encode(make_frame(10), 85) == (b'jpeg', 'hash')
+        assert pool.get_stats()['worker_errors'] == 1
+        assert pool.get_stats()['slots_free'] == 1
+
+        pool.executor.future.set_result((b'late', 'late'))
+        assert pool.get_stats()['slots_free'] == 2
+    finally:
+        pool.executor = None
+        pool.stop()
+
+
+def test_worker_encode_matches_in_process():
+    cv2 = pytest.importorskip("cv2")
+
+    pool = FramePool(SHAPE, slots=4, workers=2)
+    pool.start()
+    try:
+        frame = make_frame(200)
+        expected = encode_jpeg(frame, 85)
+
+        slot_frame = pool.write(frame)
+        assert pool.encode(slot_frame, 85) == expected
+        pool.release(slot_frame)
+
+        # An ordinary frame borrows a slot for the encode and gives it back
+        assert pool.encode(frame, 85) == expected
+        stats = pool.get_stats()
+        assert stats['worker_encodes'] == 2 and stats['inline_encodes'] == 0
+        assert stats['slots_free'] == 4
+
+        jpeg_bytes, _ = pool.encode(frame, 85, max_width=32)
+        assert cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR).shape == (24, 32, 3)
+    finally:
+        pool.stop()
+
+
+def run_tests():
+    print("🚀 FRAME POOL TESTS")
+    test_slots_are_reused()
+    test_slot_is_freed_by_its_last_holder()
+    test_worker_encode_matches_in_process()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
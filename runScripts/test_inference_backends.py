@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test Script for the inference circuit breakers, failover and hedging
+Backends are plain functions - no VM or Vision SDK needed
+"""
+
+import time
+import threading
+
+from inference_backends import (CLOSED, OPEN, HALF_OPEN, CircuitBreaker, InferenceBackend,
+                                InferenceBackendError, InferenceRouter)
+
+
+def failing(frame):
+    raise InferenceBackendError("down")
+
+
+def test_breaker_state_transitions():
+    breaker = CircuitBreaker('vm', failure_threshold=2, reset_timeout=0.05)
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+    breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN and breaker.times_opened == 1
+    assert not breaker.allow_request()
+
+    # Cooldown over - exactly one trial request
+    time.sleep(0.06)
+    assert breaker.allow_request() and breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    # Failed trial re-opens immediately
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+    assert breaker.latency_percentile(95) == 0.2
+
+
+def test_reset_does_not_touch_latency_window():
+    breaker = CircuitBreaker('vm', failure_threshold=1)
+    breaker.record_success(0.4)
+    breaker.record_failure("down")
+    assert breaker.state == OPEN
+
+    breaker.reset()
+    assert breaker.state == CLOSED
+    assert list(breaker.latencies) == [0.4]
+    assert breaker.successes == 1
+
+
+def test_probe_closes_open_backend():
+    breaker = CircuitBreaker('vm', failure_threshold=1, reset_timeout=60.0)
+    breaker.record_success(0.3)
+    breaker.record_failure("down")
+    router = InferenceRouter([InferenceBackend('vm', failing, breaker, probe_func=lambda: True)],
+                             probe_interval=0.01)
+    router.start()
+    try:
+        deadline = time.time() + 1.0
+        while breaker.state != CLOSED and time.time() < deadline:
+            time.sleep(0.01)
+        assert breaker.state == CLOSED
+        assert breaker.latency_percentile(50) == 0.3
+    finally:
+        router.stop()
+
+
+def test_failover_to_secondary():
+    router = InferenceRouter([
+        InferenceBackend('vm', failing, CircuitBreaker('vm', failure_threshold=1)),
+        InferenceBackend('vision_sdk', lambda frame: ['gun'], CircuitBreaker('vision_sdk'))
+    ])
+    assert router.detect('frame') == (['gun'], 'vision_sdk')
+    # Primary breaker is now open - skipped without being called
+    assert router.detect('frame') == (['gun'], 'vision_sdk')
+    stats = router.get_stats()
+    assert stats['skipped_open'] == 1 and stats['backends']['vm']['state'] == OPEN
+
+
+def test_all_backends_failed():
+    router = InferenceRouter([InferenceBackend('vm', failing, CircuitBreaker('vm'))])
+    assert router.detect('frame') == ([], None)
+    assert router.get_stats()['all_failed'] == 1
+
+
+def test_hedge_wins_when_primary_is_slow():
+    release = threading.Event()
+
+    def slow(frame):
+        release.wait(2.0)
+        return ['slow']
+
+    router = InferenceRouter([
+        InferenceBackend('vm', slow, CircuitBreaker('vm')),
+        InferenceBackend('vision_sdk', lambda frame: ['fast'], CircuitBreaker('vision_sdk'))
+    ], hedge_enabled=True, min_hedge_delay=0.05)
+    try:
+        started = time.time()
+        assert router.detect('frame') == (['fast'], 'vision_sdk')
+        assert time.time() - started < 1.0
+        stats = router.get_stats()
+        assert stats['hedges_sent'] == 1 and stats['hedge_wins'] == 1
+    finally:
+        release.set()
+        router.stop()
+
+
+def test_abandoned_call_holds_its_frame():
+    release = threading.Event()
+    holds = []
+
+    def slow(frame):
+        release.wait(2.0)
+        return ['slow']
+
+    router = InferenceRouter([
+        InferenceBackend('vm', slow, CircuitBreaker('vm')),
+        InferenceBackend('vision_sdk', lambda frame: ['fast'], CircuitBreaker('vision_sdk'))
+    ], hedge_enabled=True, min_hedge_delay=0.05,
+        retain_frame=lambda frame: holds.append(frame), release_frame=holds.remove)
+    try:
+        assert router.detect('frame') == (['fast'], 'vision_sdk')
+        # The hedge won, but the slow primary still has the frame
+        assert holds == ['frame']
+        release.set()
+        deadline = time.time() + 2.0
+        while holds and time.time() < deadline:
+            time.sleep(0.01)
+        assert holds == []
+    finally:
+        release.set()
+        router.stop()
+
+
+def test_no_hedge_when_primary_is_fast():
+    calls = []
+    router = InferenceRouter([
+        InferenceBackend('vm', lambda frame: ['vm'], CircuitBreaker('vm')),
+        InferenceBackend('vision_sdk', lambda frame: calls.append(frame) or ['sdk'], CircuitBreaker('vision_sdk'))
+    ], hedge_enabled=True, min_hedge_delay=0.5)
+    try:
+        assert router.detect('frame') == (['vm'], 'vm')
+        assert not calls and router.get_stats()['hedges_sent'] == 0
+    finally:
+        router.stop()
+
+
+def run_tests():
+    print("🚀 INFERENCE BACKEND TESTS")
+    test_breaker_state_transitions()
+    test_reset_does_not_touch_latency_window()
+    test_probe_closes_open_backend()
+    test_failover_to_secondary()
+    test_all_backends_failed()
+    test_hedge_wins_when_primary_is_slow()
+    test_abandoned_call_holds_its_frame()
+    test_no_hedge_when_primary_is_fast()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,207 @@
+"""
+Batching Google Vision Backend for ARCIS callers with concurrent frames
+Collects frames over a short window, sends them as one batch_annotate_images
+RPC on a reused client (one gRPC channel) and hands each frame's result back
+to its waiter through a future. The serial detection client calls Vision one
+frame at a time and only shares localized_objects_to_detections
+"""
+
+import time
+import logging
+import threading
+from queue import Queue, Empty
+from concurrent.futures import Future
+
+import numpy as np
+
+from detection_types import Detection
+from inference_backends import InferenceBackendError
+
+logger = logging.getLogger(__name__)
+
+# Vision API accepts at most 16 images per batch_annotate_images call
+MAX_VISION_BATCH = 16
+
+
+def encode_jpeg(frame, quality=85):
+    """Default frame encoder (cv2 imported lazily so tests can run without it)"""
+    import cv2
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
+
+
+def localized_objects_to_detections(objects, frame_shape):
+    """Convert localized_object_annotations to Detection records with vectorized box math"""
+    objects = [obj for obj in objects if len(obj.bounding_poly.normalized_vertices) > 0]
+    if not objects:
+        return []
+
+    h, w = frame_shape[:2]
+    counts = np.fromiter((len(obj.bounding_poly.normalized_vertices) for obj in objects),
+                         dtype=np.intp, count=len(objects))
+    total = int(counts.sum())
+    coords = np.fromiter(
+        (c for obj in objects for v in obj.bounding_poly.normalized_vertices for c in (v.x, v.y)),
+        dtype=np.float64, count=2 * total
+    ).reshape(total, 2)
+
+    # Normalized -> pixel coordinates for every vertex of every object at once
+    pixels = (coords * np.array([w, h], dtype=np.float64)).astype(np.int64)
+
+    # Per-object min/max over variable-length vertex runs
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    mins = np.minimum.reduceat(pixels, offsets, axis=0)
+    maxs = np.maximum.reduceat(pixels, offsets, axis=0)
+    boxes = np.hstack((mins, maxs)).tolist()
+
+    return [
+        Detection(obj.name.lower(), float(obj.score), tuple(box), 'google_vision_sdk')
+        for obj, box in zip(objects, boxes)
+    ]
+
+
+class VisionBatcher:
+    """Micro-batches object localization requests through one Vision client"""
+
+    def __init__(self, client, vision_module, max_batch=8, max_wait=0.02,
+                 encode_func=encode_jpeg, rpc_timeout=5.0, max_callers=None):
+        self.client = client                  # ImageAnnotatorClient, reused for every batch
+        self.vision = vision_module           # google.cloud.vision (or a stand-in)
+        self.max_batch = min(max_batch, MAX_VISION_BATCH)
+        self.max_wait = max_wait
+        self.encode_func = encode_func
+        self.rpc_timeout = rpc_timeout
+        # Callers that can wait at once - a batch that already holds that many is sent without
+        # waiting out the window. None = always wait
+        self.max_callers = max_callers
+
+        # Built once and shared by every request
+        self.features = [self.vision.Feature(type_=self.vision.Feature.Type.OBJECT_LOCALIZATION)]
+
+        self.pending = Queue()
+        self.state_lock = threading.Lock()  # running check + put in submit vs. drain in stop
+        self.running = False
+        self.thread = None
+
+        self.batches_sent = 0
+        self.frames_sent = 0
+        self.rpc_errors = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._batch_worker, daemon=True, name="VisionBatcher")
+        self.thread.start()
+
+    def stop(self):
+        with self.state_lock:
+            self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        # Fail whatever is still waiting
+        while True:
+            try:
+                _, _, future = self.pending.get_nowait()
+            except Empty:
+                break
+            future.set_exception(InferenceBackendError("Vision batcher stopped"))
+
+    def submit(self, frame):
+        """Encode on the caller's thread and queue; returns a Future resolving to its detections
+
+        Only the JPEG bytes and the frame shape are queued, so a caller that gives
+        up waiting can hand its frame (a shared-memory slot) back straight away.
+        """
+        future = Future()
+        with self.state_lock:
+            running = self.running
+        if not running:
+            future.set_exception(InferenceBackendError("Vision batcher not running"))
+            return future
+        try:
+            content = self.encode_func(frame)
+        except Exception as e:
+            future.set_exception(InferenceBackendError(f"Google Vision encode error: {e}"))
+            return future
+        with self.state_lock:
+            if self.running:
+                self.pending.put((content, frame.shape, future))
+                return future
+        future.set_exception(InferenceBackendError("Vision batcher not running"))
+        return future
+
+    def detect(self, frame, timeout=None):
+        """Blocking helper used by the inference router"""
+        future = self.submit(frame)
+        return future.result(timeout=timeout if timeout is not None else self.rpc_timeout + self.max_wait + 1.0)
+
+    def _collect_batch(self):
+        """Block for the first frame, then gather more until the window closes or the batch is full"""
+        try:
+            batch = [self.pending.get(timeout=0.5)]
+        except Empty:
+            return []
+
+        batch_limit = min(self.max_batch, self.max_callers or self.max_batch)
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < batch_limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _batch_worker(self):
+        while self.running:
+            batch = self._collect_batch()
+            if batch:
+                self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        """One RPC for the whole batch, results routed back by position"""
+        try:
+            requests = [
+                self.vision.AnnotateImageRequest(
+                    image=self.vision.Image(content=content),
+                    features=self.features
+                )
+                for content, _, _ in batch
+            ]
+            response = self.client.batch_annotate_images(requests=requests, timeout=self.rpc_timeout)
+        except Exception as e:
+            self.rpc_errors += 1
+            error = InferenceBackendError(f"Google Vision batch error: {e}")
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+
+        self.batches_sent += 1
+        self.frames_sent += len(batch)
+
+        for (_, frame_shape, future), image_response in zip(batch, response.responses):
+            if image_response.error.message:
+                future.set_exception(InferenceBackendError(f"Google Vision API error: {image_response.error.message}"))
+                continue
+            try:
+                future.set_result(localized_objects_to_detections(
+                    image_response.localized_object_annotations, frame_shape
+                ))
+            except Exception as e:
+                future.set_exception(InferenceBackendError(f"Google Vision response error: {e}"))
+
+        # A short response list must not leave waiters hanging
+        for _, _, future in batch[len(response.responses):]:
+            future.set_exception(InferenceBackendError("Google Vision returned no response for frame"))
+
+    def get_stats(self):
+        return {
+            'batches_sent': self.batches_sent,
+            'frames_sent': self.frames_sent,
+            'avg_batch_size': self.frames_sent / self.batches_sent if self.batches_sent else 0.0,
+            'rpc_errors': self.rpc_errors,
+            'queued': self.pending.qsize()
+        }
@@ -4,58 +4,51 @@ Debounced Switch Button for Jetson Nano
 Prevents false triggers from mechanical switch bounce
 """
 
-import Jetson.GPIO as GPIO
-import time
+import queue
 from datetime import datetime
 
+from switch_service import SwitchService, bcm_to_sysfs
+
 # GPIO Configuration
-SWITCH_PIN = 19  # Pin 35 (GPIO 19) - Working pin
+SWITCH_PIN = 19  # BCM 19 = pin 35 (Jetson.GPIO numbering, as before) - sysfs gpio76
 DEBOUNCE_TIME = 0.2  # 200ms debounce time
 
 class DebouncedSwitch:
+    """Debounced switch on the edge-triggered service - blocks until an event, no polling"""
+    
     def __init__(self, pin, debounce_time=0.2):
-        self.pin = pin
+        self.pin = pin  # BCM number
         self.debounce_time = debounce_time
-        self.last_state = None
-        self.last_change_time = 0
-        self.press_count = 0
+        self.events = queue.Queue()
         
-        # Setup GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        # The service addresses pins by sysfs number
+        self.service = SwitchService(bcm_to_sysfs(pin), debounce=debounce_time)
+        self.service.subscribe(self.events.put)
+        if not self.service.start():
+            raise RuntimeError(f"Switch setup failed on GPIO {pin} (sysfs gpio{self.service.gpio})")
         
-        # Initialize state
-        self.last_state = GPIO.input(self.pin)
-        print(f"✅ Switch initialized on GPIO {self.pin}")
-        print(f"Initial state: {'OPEN' if self.last_state else 'CLOSED'}")
+        print(f"✅ Switch initialized on GPIO {self.pin} (sysfs gpio{self.service.gpio})")
+        print(f"Initial state: {'CLOSED' if self.service.is_pressed() else 'OPEN'}")
     
-    def read_switch(self):
-        """Read switch with debouncing"""
-        current_time = time.time()
-        current_state = GPIO.input(self.pin)
-        
-        # Check if state changed and debounce time has passed
-        if (current_state != self.last_state and 
-            current_time - self.last_change_time > self.debounce_time):
-            
-            self.last_state = current_state
-            self.last_change_time = current_time
-            
-            if current_state == GPIO.LOW:  # Switch closed (pressed)
-                self.press_count += 1
-                return "PRESSED"
-            else:  # Switch open (released)
-                return "RELEASED"
-        
-        return None  # No state change or still in debounce period
+    @property
+    def press_count(self):
+        return self.service.press_count
+    
+    def read_switch(self, timeout=None):
+        """Wait for the next debounced change ("PRESSED"/"RELEASED"), None on timeout"""
+        try:
+            event = self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return "PRESSED" if event.pressed else "RELEASED"
     
     def is_pressed(self):
         """Check if switch is currently pressed"""
-        return GPIO.input(self.pin) == GPIO.LOW
+        return self.service.is_pressed()
     
     def cleanup(self):
-        """Clean up GPIO"""
-        GPIO.cleanup()
+        """Release the GPIO"""
+        self.service.stop()
 
 def main():
     print("🔘 Debounced Switch Test")
@@ -68,7 +61,8 @@ def main():
     
     try:
         while True:
-            switch_event = switch.read_switch()
+            # Short timeout keeps Ctrl+C responsive
+            switch_event = switch.read_switch(timeout=1.0)
             
             if switch_event == "PRESSED":
                 timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
@@ -78,8 +72,6 @@ def main():
                 timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
                 print(f"🟢 [{timestamp}] Switch RELEASED")
             
-            time.sleep(0.01)  # Small delay
-            
     except KeyboardInterrupt:
         print("\n🛑 Test stopped")
         print(f"Total button presses: {switch.press_count}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Edge-Triggered Switch Service for Jetson Nano
+Configures the sysfs GPIO 'edge' file and sleeps in poll() on the held-open
+value fd - no syscalls between edges. Bounce is filtered in software by time
+and press/release events go to subscribers on the watcher thread.
+
+Pins are kernel (sysfs) GPIO numbers, not BCM or header pin numbers - use
+bcm_to_sysfs() for pins that scripts address through Jetson.GPIO's BCM mode.
+"""
+
+import os
+import time
+import select
+import logging
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SWITCH_CONFIG = {
+    'gpio': 19,                    # sysfs gpio19 = header pin 24 on the Nano (the sysfs scripts' working pin)
+    'sysfs_root': '/sys/class/gpio',
+    'active_low': True,            # value 0 = pressed (switch to ground, pull-up)
+    'debounce': 0.05,              # seconds a new state must hold after an accepted change
+    'poll_timeout': 1.0            # seconds - only bounds how long stop() can take without the pipe
+}
+
+
+# Jetson Nano 40-pin header: BCM number -> sysfs GPIO number (header pin in the comment)
+JETSON_NANO_BCM_TO_SYSFS = {
+    4: 216,   # pin 7
+    17: 50,   # pin 11
+    18: 79,   # pin 12
+    27: 14,   # pin 13
+    22: 194,  # pin 15
+    23: 232,  # pin 16
+    24: 15,   # pin 18
+    10: 16,   # pin 19
+    9: 17,    # pin 21
+    25: 13,   # pin 22
+    11: 18,   # pin 23
+    8: 19,    # pin 24
+    7: 20,    # pin 26
+    5: 149,   # pin 29
+    6: 200,   # pin 31
+    12: 168,  # pin 32
+    13: 38,   # pin 33
+    19: 76,   # pin 35
+    16: 51,   # pin 36
+    26: 12,   # pin 37
+    20: 77,   # pin 38
+    21: 78    # pin 40
+}
+
+
+def bcm_to_sysfs(bcm: int) -> int:
+    """sysfs GPIO number for a BCM-numbered Jetson Nano header pin"""
+    try:
+        return JETSON_NANO_BCM_TO_SYSFS[bcm]
+    except KeyError:
+        raise ValueError(f"BCM {bcm} is not a GPIO on the Jetson Nano header") from None
+
+
+class SwitchEvent(NamedTuple):
+    pressed: bool
+    timestamp: float     # time.time() of the accepted edge
+    monotonic: float     # time.monotonic() - for latency measurements
+    press_count: int
+
+
+class SwitchService:
+    """Debounced press/release events from a sysfs GPIO, delivered to subscribers
+
+    gpio is the kernel/sysfs number (e.g. 76 for header pin 35), as written to
+    /sys/class/gpio/export.
+    """
+
+    # sysfs signals edges with POLLPRI|POLLERR; POLLIN is always set on attribute files
+    VALUE_EVENTS = select.POLLPRI | select.POLLERR
+
+    def __init__(self, gpio: Optional[int] = None, sysfs_root: Optional[str] = None,
+                 active_low: Optional[bool] = None, debounce: Optional[float] = None):
+        self.gpio = SWITCH_CONFIG['gpio'] if gpio is None else gpio
+        self.sysfs_root = sysfs_root or SWITCH_CONFIG['sysfs_root']
+        self.gpio_path = os.path.join(self.sysfs_root, f"gpio{self.gpio}")
+        self.active_low = SWITCH_CONFIG['active_low'] if active_low is None else active_low
+        self.debounce = SWITCH_CONFIG['debounce'] if debounce is None else debounce
+
+        self.value_fd = None
+        self.exported = False
+        self.running = False
+        self.thread = None
+        self._wake_read = self._wake_write = None  # stop() wakes the edge loop through this pipe
+
+        self.subscribers: List[Callable[[SwitchEvent], None]] = []
+        self.subscriber_lock = threading.Lock()
+
+        # Debounced state - read by is_pressed() without touching sysfs
+        self.pressed = False
+        self.last_change = 0.0
+        self.press_count = 0
+
+        self.stats = {'edges': 0, 'accepted': 0, 'bounces': 0}
+
+    # ---- setup ------------------------------------------------------------------
+
+    def _write_attribute(self, name: str, value: str):
+        with open(os.path.join(self.gpio_path, name), 'w') as f:
+            f.write(value)
+
+    def setup(self) -> bool:
+        """Export the pin, make it an input and enable interrupts on both edges"""
+        try:
+            if not os.path.exists(self.gpio_path):
+                with open(os.path.join(self.sysfs_root, 'export'), 'w') as f:
+                    f.write(str(self.gpio))
+                self.exported = True
+            self._write_attribute('direction', 'in')
+            self._write_attribute('edge', 'both')
+
+            self.value_fd = os.open(os.path.join(self.gpio_path, 'value'), os.O_RDONLY | os.O_NONBLOCK)
+            self.pressed = self._is_active(self._read_value())
+            logger.info(f"✅ Switch service on GPIO {self.gpio} "
+                        f"(initially {'PRESSED' if self.pressed else 'RELEASED'})")
+            return True
+        except OSError as e:
+            logger.error(f"❌ Switch setup failed on GPIO {self.gpio}: {e}")
+            return False
+
+    def _read_value(self) -> Optional[str]:
+        # sysfs needs a rewind before each read to report (and re-arm) the current value
+        os.lseek(self.value_fd, 0, os.SEEK_SET)
+        data = os.read(self.value_fd, 8).strip()
+        return data.decode()[-1:] if data else None
+
+    def _is_active(self, value: Optional[str]) -> bool:
+        if value is None:
+            return self.pressed
+        return (value == '0') if self.active_low else (value == '1')
+
+    # ---- subscribers --------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[SwitchEvent], None]) -> Callable[[SwitchEvent], None]:
+        with self.subscriber_lock:
+            self.subscribers = self.subscribers + [callback]
+        return callback
+
+    def unsubscribe(self, callback: Callable[[SwitchEvent], None]):
+        with self.subscriber_lock:
+            self.subscribers = [cb for cb in self.subscribers if cb is not callback]
+
+    def is_pressed(self) -> bool:
+        return self.pressed
+
+    # ---- lifecycle ----------------------------------------------------------------
+
+    def start(self) -> bool:
+        if self.running:
+            return True
+        if self.value_fd is None and not self.setup():
+            return False
+        if self._wake_read is None:
+            self._wake_read, self._wake_write = os.pipe()
+        self.running = True
+        self.thread = threading.Thread(target=self._watch, daemon=True, name=f"SwitchService-{self.gpio}")
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Safe to call more than once; start() sets the pin up again afterwards"""
+        self.running = False
+        if self._wake_write is not None:
+            os.write(self._wake_write, b'x')
+        if self.thread is not None:
+            self.thread.join(timeout=SWITCH_CONFIG['poll_timeout'] + 1.0)
+            self.thread = None
+        if self.value_fd is not None:
+            os.close(self.value_fd)
+            self.value_fd = None
+        if self._wake_read is not None:
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+            self._wake_read = self._wake_write = None
+        if self.exported:
+            self.exported = False
+            try:
+                with open(os.path.join(self.sysfs_root, 'unexport'), 'w') as f:
+                    f.write(str(self.gpio))
+            except OSError:
+                pass
+
+    # ---- edge loop ----------------------------------------------------------------
+
+    def _watch(self):
+        poller = select.poll()
+        poller.register(self.value_fd, self.VALUE_EVENTS)
+        poller.register(self._wake_read, select.POLLIN)
+        settle_at = None  # re-check time when an edge arrived inside the debounce window
+
+        while self.running:
+            if settle_at is None:
+                timeout = SWITCH_CONFIG['poll_timeout']
+            else:
+                timeout = max(0.0, settle_at - time.monotonic())
+
+            try:
+                events = poller.poll(timeout * 1000.0)
+            except InterruptedError:
+                continue
+            if any(fd == self._wake_read for fd, _ in events):
+                break
+            if events:
+                self.stats['edges'] += 1
+            elif settle_at is None:
+                continue
+
+            try:
+                active = self._is_active(self._read_value())
+            except OSError as e:
+                logger.error(f"Switch read error on GPIO {self.gpio}: {e}")
+                time.sleep(SWITCH_CONFIG['poll_timeout'])
+                continue
+
+            now = time.monotonic()
+            if active == self.pressed:
+                if events:
+                    self.stats['bounces'] += 1
+                settle_at = None
+            elif now - self.last_change >= self.debounce:
+                settle_at = None
+                self._accept(active, now)
+            else:
+                # Too soon after the last change - decide once the window has passed
+                self.stats['bounces'] += 1
+                settle_at = self.last_change + self.debounce
+
+    def _accept(self, pressed: bool, now: float):
+        self.pressed = pressed
+        self.last_change = now
+        self.stats['accepted'] += 1
+        if pressed:
+            self.press_count += 1
+
+        event = SwitchEvent(pressed, time.time(), now, self.press_count)
+        for callback in self.subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Switch subscriber error: {e}")
+
+    def get_stats(self):
+        return {**self.stats, 'pressed': self.pressed, 'press_count': self.press_count}
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Script for the edge-triggered switch service
+Uses a fake sysfs tree whose 'value' is a FIFO - writes to it stand in for edges
+"""
+
+import os
+import sys
+import time
+import select
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from switch_service import SwitchService, bcm_to_sysfs
+
+
+class FakeSysfsSwitch(SwitchService):
+    """A FIFO signals readability instead of POLLPRI; the last written value is the pin level"""
+
+    VALUE_EVENTS = select.POLLIN
+    level = None
+
+    def _read_value(self):
+        try:
+            data = os.read(self.value_fd, 64).split()
+        except BlockingIOError:
+            data = []
+        if data:
+            self.level = data[-1].decode()
+        return self.level
+
+
+def make_fake_sysfs(gpio=19):
+    root = tempfile.mkdtemp(prefix='arcis_gpio_')
+    gpio_path = os.path.join(root, f"gpio{gpio}")
+    os.mkdir(gpio_path)
+    for name in ('direction', 'edge'):
+        open(os.path.join(gpio_path, name), 'w').close()
+    os.mkfifo(os.path.join(gpio_path, 'value'))
+    return root, gpio_path
+
+
+def start_switch(debounce=0.05):
+    root, gpio_path = make_fake_sysfs()
+    switch = FakeSysfsSwitch(19, sysfs_root=root, debounce=debounce)
+    assert switch.setup()
+    # The writer end can only be opened once the service holds the read end
+    writer = os.open(os.path.join(gpio_path, 'value'), os.O_WRONLY | os.O_NONBLOCK)
+    events = []
+    switch.subscribe(events.append)
+    assert switch.start()
+    return switch, writer, events, gpio_path
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_setup_configures_edge():
+    switch, writer, _, gpio_path = start_switch()
+    try:
+        with open(os.path.join(gpio_path, 'edge')) as f:
+            assert f.read() == 'both'
+        with open(os.path.join(gpio_path, 'direction')) as f:
+            assert f.read() == 'in'
+    finally:
+        switch.stop()
+        os.close(writer)
+
+
+def test_press_and_release_events():
+    switch, writer, events, _ = start_switch()
+    try:
+        os.write(writer, b'0\n')
+        assert wait_for(lambda: len(events) == 1)
+        assert events[0].pressed and events[0].press_count == 1
+        assert switch.is_pressed()
+
+        time.sleep(0.06)
+        os.write(writer, b'1\n')
+        assert wait_for(lambda: len(events) == 2)
+        assert not events[1].pressed and not switch.is_pressed()
+    finally:
+        switch.stop()
+        os.close(writer)
+
+
+def test_bounce_is_filtered():
+    switch, writer, events, _ = start_switch(debounce=0.05)
+    try:
+        # Contact bounce on press: 0/1/0 within a few ms ends pressed
+        for value in (b'0\n', b'1\n', b'0\n', b'1\n', b'0\n'):
+            os.write(writer, value)
+            time.sleep(0.003)
+        assert wait_for(lambda: len(events) >= 1)
+        time.sleep(0.1)
+        assert [event.pressed for event in events] == [True]
+        assert switch.press_count == 1
+        assert switch.get_stats()['bounces'] >= 1
+    finally:
+        switch.stop()
+        os.close(writer)
+
+
+def test_short_tap_release_is_not_lost():
+    switch, writer, events, _ = start_switch(debounce=0.05)
+    try:
+        # Released again inside the debounce window - reported once the window passes
+        os.write(writer, b'0\n')
+        assert wait_for(lambda: len(events) == 1)
+        os.write(writer, b'1\n')
+        assert wait_for(lambda: len(events) == 2)
+        assert events[1].monotonic - events[0].monotonic >= 0.05
+        assert not switch.is_pressed()
+    finally:
+        switch.stop()
+        os.close(writer)
+
+
+def test_stop_twice_and_restart():
+    switch, writer, events, _ = start_switch()
+    try:
+        switch.stop()
+        switch.stop()                # shutdown paths may call it again
+        assert switch.start()        # sets the pin up again with a fresh wake pipe
+        os.write(writer, b'0\n')
+        assert wait_for(lambda: len(events) == 1)
+    finally:
+        switch.stop()
+        os.close(writer)
+
+
+def test_bcm_pins_map_to_sysfs_numbers():
+    assert bcm_to_sysfs(19) == 76   # header pin 35 - the Jetson.GPIO scripts' switch pin
+    assert bcm_to_sysfs(8) == 19    # header pin 24 - sysfs gpio19
+    try:
+        bcm_to_sysfs(2)             # I2C SDA, not a GPIO on the Nano header
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def run_tests():
+    print("🚀 SWITCH SERVICE TESTS")
+    test_setup_configures_edge()
+    test_press_and_release_events()
+    test_bounce_is_filtered()
+    test_short_tap_release_is_not_lost()
+    test_stop_twice_and_restart()
+    test_bcm_pins_map_to_sysfs_numbers()
+    print("✅ TESTS COMPLETED")
+
+
+if __name__ == "__main__":
+    run_tests()